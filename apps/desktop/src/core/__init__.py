@@ -2,12 +2,11 @@
 import os
 from flask import Flask, session, render_template, current_app
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_htmx import HTMX
 from dotenv import load_dotenv
 from pathlib import Path
 from werkzeug.exceptions import HTTPException
-from . import config
+from . import config, database, routing
 
 # Determine the base directory for the desktop app.
 # This __init__.py is at apps/desktop/src/core/__init__.py, so:
@@ -15,6 +14,7 @@ from . import config
 #   .parent.parent    → apps/desktop/src/
 #   .parent.parent.parent → apps/desktop/   ← BASE_DIR (desktop app root)
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
+PROJECT_ROOT = BASE_DIR.parent.parent  # Relative DATABASE_URL paths start here
 DATA_DIR = BASE_DIR / "data"
 MIGRATIONS_DIR = BASE_DIR / "migrations"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -25,8 +25,7 @@ dotenv_path = DATA_DIR / ".env"
 load_dotenv(dotenv_path=dotenv_path, override=True)
 
 # Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={"class_": routing.RoutingSession})
 htmx = HTMX()
 
 
@@ -40,8 +39,12 @@ def get_validated_theme(session_data) -> str:
     return theme
 
 
-def create_app():
-    """Create and configure an instance of the Flask application."""
+def create_app(config_overrides=None):
+    """
+    Create and configure an instance of the Flask application. Settings come
+    from config.py, then .env and the environment (SECRET_KEY, DATABASE_URL
+    and the database.ENV_SETTINGS), then config_overrides, if given.
+    """
     app = Flask(
         __name__,
         instance_relative_config=True,
@@ -54,23 +57,47 @@ def create_app():
     app.config.from_mapping(
         SECRET_KEY=os.environ.get("SECRET_KEY", "dev-secret-key-insecure"),
         SQLALCHEMY_DATABASE_URI=f"sqlite:///{DATA_DIR / 'database.db'}",
+        # Uploads waiting to be imported and finished exports
+        JOBS_DIR=str(DATA_DIR / "jobs"),
+        # Flask-Migrate is only loaded when needed, see schema_version
+        MIGRATIONS_DIR=str(MIGRATIONS_DIR),
         # Override DEBUG from .env if present
         DEBUG=os.environ.get("FLASK_DEBUG", "False").lower() == "true",
     )
+    app.config.from_mapping(database.settings_from_env(os.environ))
+    if config_overrides:
+        app.config.from_mapping(config_overrides)
 
     # Initialize Extensions with App Context
+    database.configure(app, PROJECT_ROOT)
+    routing.configure(app)  # Separate reader and writer pools
     db.init_app(app)
-    migrate.init_app(app, db, directory=str(MIGRATIONS_DIR))
     htmx.init_app(app)
 
     # Import and Register Blueprints
     with app.app_context():
         from . import models  # noqa: F401
+        from . import fragment_cache, jobs, pragmas, schema, schema_version, suggest
+        from .search import search_cli
+        from .snapshot import snapshot_cli
         from .routes import main_bp, items_bp, settings_bp
 
+        # Before anything connects, so every connection gets the profile
+        pragmas.init_app(app)
+        routing.init_app(app, db)
+        fragment_cache.init_app(app)
+        suggest.init_app(app)
+        jobs.init_app(app)
         app.register_blueprint(main_bp)
         app.register_blueprint(items_bp)
         app.register_blueprint(settings_bp)
+        app.cli.add_command(search_cli)
+        app.cli.add_command(snapshot_cli)
+        app.cli.add_command(schema_version.LazyMigrateGroup())
+
+        # Create search/facet tables, triggers and sort indexes missing from
+        # databases made before they existed
+        schema.ensure_auxiliary_schema()
 
     # Context Processors
     @app.context_processor
@@ -0,0 +1,302 @@
+# apps/desktop/src/core/backup.py
+import codecs
+import csv
+import gzip
+import io
+import itertools
+import json
+import re
+import zlib
+from sqlalchemy import select
+from . import db
+from .models import WatchlistItem
+
+# Fields of a backup record, in the order they are written
+EXPORT_FIELDS = [
+    "title",
+    "type",
+    "year",
+    "tmdb_id",
+    "imdb_id",
+    "boxd_id",
+    "overview",
+    "poster_url",
+    "status",
+    "rating",
+    "notes",
+    "date_added",
+    "date_watched",
+]
+
+# Rows fetched from the database per round trip while exporting
+EXPORT_BATCH_SIZE = 500
+
+# Records written per executemany() while importing
+IMPORT_BATCH_SIZE = 1000
+
+# Bytes read from an uploaded backup at a time
+IMPORT_READ_SIZE = 64 * 1024
+
+# Backup file extensions and the format each is read as; any of them may
+# also be gzip-compressed, with ".gz" appended
+IMPORT_EXTENSIONS = {
+    "json": "json",
+    "ndjson": "ndjson",
+    "jsonl": "ndjson",
+    "csv": "csv",
+}
+
+FORMAT_LABELS = {"json": "JSON", "ndjson": "NDJSON", "csv": "CSV"}
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class InvalidBackupError(ValueError):
+    """Raised while reading a backup file that is malformed for its format."""
+
+
+def export_record(row):
+    """Converts a watchlist row (or item) into a JSON-ready backup record."""
+    record = {field: getattr(row, field) for field in EXPORT_FIELDS}
+    for field in ("date_added", "date_watched"):
+        if record[field] is not None:
+            record[field] = record[field].isoformat()
+    return record
+
+
+def iter_export_rows():
+    """
+    Yields batches of watchlist rows in id order, streamed from the database
+    as plain rows rather than ORM objects, so nothing accumulates in memory.
+    """
+    columns = [getattr(WatchlistItem, field) for field in EXPORT_FIELDS]
+    result = db.session.execute(
+        select(*columns)
+        .order_by(WatchlistItem.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    yield from result.partitions()
+
+
+def _encode_record(record):
+    # Same text json.dumps(records, indent=2) writes for one list element
+    return "  " + json.dumps(record, indent=2).replace("\n", "\n  ")
+
+
+def iter_export_json(batches, to_record=export_record):
+    """
+    Encodes batches of rows as a JSON array, one chunk per batch, producing
+    exactly the bytes of json.dumps([...], indent=2).encode("utf-8").
+    Each row is converted with to_record.
+    """
+    first = True
+    for batch in batches:
+        chunk = ",\n".join(_encode_record(to_record(row)) for row in batch)
+        if not chunk:
+            continue
+        yield (("[\n" if first else ",\n") + chunk).encode("utf-8")
+        first = False
+    yield b"[]" if first else b"\n]"
+
+
+def iter_export_ndjson(batches, to_record=export_record):
+    """Encodes batches of rows as NDJSON, one compact record per line."""
+    for batch in batches:
+        if batch:
+            yield "".join(json.dumps(to_record(row)) + "\n" for row in batch).encode(
+                "utf-8"
+            )
+
+
+def iter_export_csv(batches, to_record=export_record):
+    """Encodes batches of rows as CSV with a header row, NULLs as empty cells."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in batches:
+        for row in batch:
+            record = to_record(row)
+            writer.writerow(record[field] for field in EXPORT_FIELDS)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # Only the header, nothing was exported
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks):
+    """Compresses a stream of byte chunks into a gzip stream, chunk by chunk."""
+    compressor = zlib.compressobj(wbits=31)  # 16 + 15: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# Export formats: name -> (encoder, mimetype, file extension)
+EXPORT_FORMATS = {
+    "json": (iter_export_json, "application/json", ".json"),
+    "ndjson": (iter_export_ndjson, "application/x-ndjson", ".ndjson"),
+    "csv": (iter_export_csv, "text/csv", ".csv"),
+}
+
+
+def iter_export(export_format, batches, compress=False, to_record=export_record):
+    """
+    Encodes batches of rows in one of EXPORT_FORMATS, gzip-compressed if
+    compress is set, yielding the file's bytes as they are produced.
+    """
+    chunks = EXPORT_FORMATS[export_format][0](batches, to_record)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(stem, export_format, compress=False):
+    extension = EXPORT_FORMATS[export_format][2]
+    return f"{stem}{extension}.gz" if compress else f"{stem}{extension}"
+
+
+class _JsonArrayReader:
+    """Incrementally decodes the elements of a JSON array from a byte stream."""
+
+    def __init__(self, stream, read_size):
+        self._stream = stream
+        self._read_size = read_size
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Appends the next chunk of the stream to the unread part of the buffer."""
+        chunk = self._stream.read(self._read_size)
+        self._eof = not chunk
+        self._buffer = self._buffer[self._pos :] + self._utf8.decode(
+            chunk, final=self._eof
+        )
+        self._pos = 0
+
+    def _peek(self):
+        """Skips whitespace and returns the next character, or "" at the end."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos : self._pos + 1]
+            self._fill()
+
+    def _expect(self, characters, message):
+        character = self._peek()
+        if not character or character not in characters:
+            raise json.JSONDecodeError(message, self._buffer, self._pos)
+        self._pos += 1
+        return character
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill()  # Most likely cut off at the end of the chunk
+                continue
+            # A number cut off at the end of the chunk ("12" of "123", "1." of
+            # "1.5") still decodes, so only trust values followed by , or ]
+            following = _WHITESPACE.match(self._buffer, end).end()
+            next_character = self._buffer[following : following + 1]
+            if not self._eof and next_character not in (",", "]"):
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        self._expect("[", "Expecting '['")
+        if self._peek() == "]":
+            self._pos += 1
+        else:
+            while True:
+                yield self._value()
+                if self._expect(",]", "Expecting ',' delimiter") == "]":
+                    break
+        if self._peek():
+            raise json.JSONDecodeError("Extra data", self._buffer, self._pos)
+
+
+def iter_json_array(stream, read_size=None):
+    """
+    Yields the elements of the top-level JSON array in a UTF-8 byte stream,
+    reading it in chunks of read_size bytes (IMPORT_READ_SIZE by default)
+    rather than all at once. Malformed input raises json.JSONDecodeError,
+    like json.loads would.
+    """
+    return iter(_JsonArrayReader(stream, read_size or IMPORT_READ_SIZE))
+
+
+def batched(iterable, size):
+    """Splits iterable into lists of at most size elements."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def iter_ndjson(stream):
+    """Yields the records of an NDJSON byte stream, skipping blank lines."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_csv(stream):
+    """
+    Yields the rows of a CSV byte stream with a header row as dicts. Empty
+    cells are left out, so they read like missing keys in a JSON record.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(text_stream, strict=True):
+        if None in row:
+            raise csv.Error("More cells than header fields")
+        yield {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def backup_format(filename):
+    """
+    Returns (format, gzipped) for the name of a backup file, such as
+    ("csv", True) for "watchlist.csv.gz", or None if it is not one.
+    """
+    name = filename.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[: -len(".gz")]
+    stem, _, extension = name.rpartition(".")
+    if not stem or extension not in IMPORT_EXTENSIONS:
+        return None
+    return IMPORT_EXTENSIONS[extension], compressed
+
+
+def iter_backup_records(stream, filename):
+    """
+    Yields the records of a backup file in any supported format, read
+    incrementally from its byte stream. Malformed files raise
+    InvalidBackupError.
+    """
+    backup_file_format, compressed = backup_format(filename)
+    if compressed:
+        stream = gzip.GzipFile(fileobj=stream, mode="rb")
+    readers = {"json": iter_json_array, "ndjson": iter_ndjson, "csv": iter_csv}
+    try:
+        yield from readers[backup_file_format](stream)
+    except (
+        json.JSONDecodeError,
+        UnicodeDecodeError,
+        csv.Error,
+        gzip.BadGzipFile,
+        EOFError,
+        zlib.error,
+    ) as e:
+        label = FORMAT_LABELS[backup_file_format]
+        raise InvalidBackupError(
+            f"Invalid {label} file. Please upload a valid backup."
+        ) from e
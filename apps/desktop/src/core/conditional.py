@@ -0,0 +1,30 @@
+# apps/desktop/src/core/conditional.py
+import hashlib
+from flask import current_app, request
+
+
+def make_etag(*parts):
+    """Derives a strong ETag value from the repr of parts."""
+    return hashlib.sha1(repr(parts).encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def with_etag(response, etag):
+    """
+    Attaches etag to response and asks the browser to revalidate it on every
+    use, so repeated HTMX fetches become conditional requests.
+    """
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    # Full page and HTMX fragment responses share URLs
+    response.vary.add("HX-Request")
+    return response
+
+
+def not_modified(etag):
+    """
+    Returns an empty 304 response if the request's If-None-Match already
+    holds etag, otherwise None.
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+    return with_etag(current_app.response_class(status=304), etag)
@@ -13,6 +13,65 @@ VALID_PAGINATION_SIZES = [10, 15, 20, 30, 40, 50]
 DEFAULT_SORT_COLUMN = "date_watched"
 DEFAULT_SORT_ORDER = "desc"
 
+# "keyset" pages with Prev/Next cursors that seek past the last row shown, so
+# deep pages cost the same as the first and no COUNT(*) is needed.
+# "offset" uses LIMIT/OFFSET with a total page count and jump-to-page input.
+PAGINATION_MODE = "keyset"
+
+# When a search has no exact or prefix matches, titles containing at least this
+# share (0 to 1) of the search term's trigrams are shown instead
+FUZZY_SEARCH_THRESHOLD = 0.5
+
+# Number of titles suggested while typing in the search box
+SEARCH_SUGGESTION_LIMIT = 8
+
+# Upper bound on the memory used by cached, rendered watchlist fragments
+FRAGMENT_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+# Threads running background imports and exports
+JOB_WORKERS = 2
+
+# Hours finished jobs, their exports and import reports are kept for before
+# they are deleted. 0 keeps them forever.
+JOB_RETENTION_HOURS = 24
+
+# Processes validating the records of large imports. 1 validates them in the
+# importing thread only. Can be set in .env, e.g. IMPORT_WORKERS=1.
+IMPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Days deleted items are remembered for delta exports. Export tokens and
+# timestamps older than this need a full export instead.
+TOMBSTONE_RETENTION_DAYS = 90
+
+# PRAGMAs run on every new SQLite connection, in this order. Each can be
+# overridden in .env as SQLITE_<NAME>, e.g. SQLITE_CACHE_SIZE=-131072.
+# WAL lets pages be read while an import writes, and with synchronous=NORMAL
+# a commit no longer fsyncs the database file, only checkpoints do.
+SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,  # Milliseconds to wait for a lock before failing
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32768,  # Negative means KiB, so 32 MiB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Database engine options. Like DATABASE_URL, each can also be set in .env.
+# Connections serving reads, next to the single connection all writes share
+# (see routing.py). 0 sends reads through the writer too.
+READ_POOL_SIZE = 4
+# Connections of the engine when reads are not split off (READ_POOL_SIZE = 0
+# or a database other than a SQLite file)
+DATABASE_POOL_SIZE = 5
+# Seconds after which a pooled connection is replaced, -1 for never
+DATABASE_POOL_RECYCLE = -1
+# Prepared statements SQLite keeps per connection
+DATABASE_STATEMENT_CACHE_SIZE = 128
+# Seconds a request waits for a free connection. Writes queue for the single
+# writer, which an import holds until it commits; one still waiting after this
+# long fails, and the user is told the database is busy.
+DATABASE_POOL_TIMEOUT = 30
+
 # Placeholder values for achieving "nulls last" sorting via coalesce
 NULL_SORT_PLACEHOLDER = {
     "date_asc": date(9999, 12, 31),
@@ -0,0 +1,145 @@
+# apps/desktop/src/core/database.py
+import os
+import sqlite3
+from pathlib import Path
+from sqlalchemy.engine import make_url
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Settings that can be set in .env, besides DATABASE_URL. All are whole
+# numbers; see config.py for what each does.
+ENV_SETTINGS = [
+    "DATABASE_POOL_SIZE",
+    "DATABASE_POOL_RECYCLE",
+    "DATABASE_STATEMENT_CACHE_SIZE",
+    "DATABASE_POOL_TIMEOUT",
+    "READ_POOL_SIZE",
+    "IMPORT_WORKERS",
+]
+
+# What DATABASE_URL=sqlite:///:memory: becomes: one in-memory database that
+# every connection of the app shares, rather than a new one per connection
+MEMORY_DATABASE_URL = "sqlite:///file:seriesscape?mode=memory&cache=shared&uri=true"
+
+# Bind key of the database job status is kept in (see jobs.py)
+JOBS_BIND = "jobs"
+
+# Shown when a write gave up waiting for its turn (see DATABASE_POOL_TIMEOUT)
+BUSY_MESSAGE = (
+    "The database is busy with another write, such as an import. "
+    "Please try again in a moment."
+)
+
+
+def settings_from_env(environ):
+    """
+    The app config set by DATABASE_URL and ENV_SETTINGS in environ. Raises
+    ValueError for a setting that is not a whole number.
+    """
+    settings = {}
+    if environ.get("DATABASE_URL"):
+        settings["SQLALCHEMY_DATABASE_URI"] = environ["DATABASE_URL"]
+    for key in ENV_SETTINGS:
+        value = environ.get(key)
+        if value is None or value.strip() == "":
+            continue
+        try:
+            settings[key] = int(value)
+        except ValueError:
+            raise ValueError(f"{key} must be a whole number, got {value!r}.") from None
+    return settings
+
+
+def is_memory_database(url):
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def resolve_url(url, root):
+    """
+    url with a relative SQLite file path made absolute against root (the
+    directory scripts run from), and :memory: turned into MEMORY_DATABASE_URL.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return url
+    if parsed.database in (None, "", ":memory:"):
+        return MEMORY_DATABASE_URL
+    if parsed.query.get("uri"):  # Already a file: URI, left as it is
+        return url
+    path = Path(parsed.database)
+    if path.is_absolute():
+        return url
+    return parsed.set(database=str((Path(root) / path).resolve())).render_as_string(
+        hide_password=False
+    )
+
+
+def is_busy(error):
+    """Whether a database error means the write timed out waiting for a lock."""
+    if isinstance(error, exc.TimeoutError):
+        return True
+    locked = (exc.OperationalError, sqlite3.OperationalError)
+    return isinstance(error, locked) and "database is locked" in str(error)
+
+
+def jobs_url(url):
+    """
+    URL of the jobs database: for SQLite, a second database named after the
+    main one (database.db → database-jobs.db), so job status writes never
+    wait for the main database's writer. Other backends keep jobs in the
+    main database.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return url
+    base, extension = os.path.splitext(parsed.database)
+    return parsed.set(database=f"{base}-jobs{extension}").render_as_string(
+        hide_password=False
+    )
+
+
+def configure(app, root):
+    """
+    Resolves SQLALCHEMY_DATABASE_URI (see resolve_url) and builds the engine
+    options from the DATABASE_* settings, before db.init_app(app). Options
+    already in SQLALCHEMY_ENGINE_OPTIONS take precedence. Also adds the
+    JOBS_BIND engine, unless SQLALCHEMY_BINDS already has one.
+    """
+    url = resolve_url(app.config["SQLALCHEMY_DATABASE_URI"], root)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    options = {
+        "pool_recycle": app.config["DATABASE_POOL_RECYCLE"],
+        "pool_timeout": app.config["DATABASE_POOL_TIMEOUT"],
+    }
+    if is_memory_database(url):
+        # A single connection, kept open: the database lives only as long as
+        # one is, and shared-cache connections lock each other out by table
+        options = {
+            "poolclass": QueuePool,
+            "pool_size": 1,
+            "max_overflow": 0,
+            "pool_timeout": app.config["DATABASE_POOL_TIMEOUT"],
+            "connect_args": {"check_same_thread": False},
+        }
+    else:
+        options["pool_size"] = app.config["DATABASE_POOL_SIZE"]
+    if make_url(url).get_backend_name() == "sqlite":
+        options.setdefault("connect_args", {})["cached_statements"] = app.config[
+            "DATABASE_STATEMENT_CACHE_SIZE"
+        ]
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **options,
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+    binds = app.config.get("SQLALCHEMY_BINDS") or {}
+    if JOBS_BIND not in binds:
+        app.config["SQLALCHEMY_BINDS"] = {
+            **binds,
+            JOBS_BIND: {
+                **app.config["SQLALCHEMY_ENGINE_OPTIONS"],
+                "url": jobs_url(url),
+            },
+        }
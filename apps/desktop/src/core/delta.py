@@ -0,0 +1,205 @@
+# apps/desktop/src/core/delta.py
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import DateTime, Integer, column, delete, func, select, table
+from . import db
+from .backup import EXPORT_BATCH_SIZE, EXPORT_FIELDS, export_record
+from .models import WatchlistItem
+
+TOMBSTONES_TABLE = "watchlist_item_tombstones"
+
+DELTA_SALT = "export-token"
+
+# What a tombstone remembers of a deleted item: enough for a merge import
+# to find the item it stands for (see ImportMerger)
+TOMBSTONE_FIELDS = ["title", "type", "year", "tmdb_id", "imdb_id", "boxd_id"]
+
+# Tombstones record every deleted item, whatever deleted it, through a trigger.
+# seq is AUTOINCREMENT so numbers are never reused once tombstones are pruned.
+# The date_modified index turns "changed since" into a range scan.
+SCHEMA_OBJECTS = [
+    (
+        "table",
+        TOMBSTONES_TABLE,
+        f"""
+        CREATE TABLE IF NOT EXISTS {TOMBSTONES_TABLE} (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            type VARCHAR(10) NOT NULL,
+            year INTEGER,
+            tmdb_id VARCHAR(50),
+            imdb_id VARCHAR(50),
+            boxd_id VARCHAR(50),
+            deleted_at DATETIME NOT NULL
+        )
+        """,
+    ),
+    (
+        "index",
+        f"ix_{TOMBSTONES_TABLE}_deleted_at",
+        f"""
+        CREATE INDEX IF NOT EXISTS ix_{TOMBSTONES_TABLE}_deleted_at
+        ON {TOMBSTONES_TABLE} (deleted_at)
+        """,
+    ),
+    (
+        "trigger",
+        f"{TOMBSTONES_TABLE}_ad",
+        # deleted_at in the format SQLAlchemy stores DateTime columns in
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {TOMBSTONES_TABLE}_ad
+        AFTER DELETE ON watchlist_items BEGIN
+            INSERT INTO {TOMBSTONES_TABLE}(
+                item_id, {", ".join(TOMBSTONE_FIELDS)}, deleted_at
+            )
+            VALUES (
+                old.id, {", ".join(f"old.{f}" for f in TOMBSTONE_FIELDS)},
+                strftime('%Y-%m-%d %H:%M:%f000', 'now')
+            );
+        END
+        """,
+    ),
+    (
+        "index",
+        "ix_watchlist_items_date_modified",
+        """
+        CREATE INDEX IF NOT EXISTS ix_watchlist_items_date_modified
+        ON watchlist_items (date_modified)
+        """,
+    ),
+]
+
+DROP_STATEMENTS = [f"DROP TABLE IF EXISTS {TOMBSTONES_TABLE}"]
+
+_tombstones = table(
+    TOMBSTONES_TABLE,
+    column("seq", Integer),
+    column("deleted_at", DateTime),
+    *[column(field) for field in TOMBSTONE_FIELDS],
+)
+
+
+class ExportTokenError(ValueError):
+    """Raised for an export token or timestamp a delta cannot be made from."""
+
+
+class ExportTokenExpired(ExportTokenError):
+    """Raised when tombstones a delta would need have already been pruned."""
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt=DELTA_SALT)
+
+
+def _utc_naive(moment):
+    # date_modified is stored as naive UTC
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def high_water_mark():
+    """
+    The (latest date_modified, latest tombstone seq) of the database, the
+    point a delta export runs up to and the next one starts from.
+    """
+    modified = db.session.execute(select(func.max(WatchlistItem.date_modified)))
+    seq = db.session.execute(select(func.max(_tombstones.c.seq)))
+    return modified.scalar(), seq.scalar() or 0
+
+
+def encode_token(mark):
+    """Packs a high water mark into an opaque, signed export token."""
+    modified, seq = mark
+    return _serializer().dumps(
+        {
+            "m": modified.isoformat() if modified else None,
+            "s": seq,
+            "i": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+
+
+def _check_retention(issued):
+    retention = timedelta(days=current_app.config["TOMBSTONE_RETENTION_DAYS"])
+    if _utc_naive(issued) < _utc_naive(datetime.now(timezone.utc)) - retention:
+        raise ExportTokenExpired(
+            "Deletions that old are no longer tracked, make a full export instead."
+        )
+
+
+def decode_token(token):
+    """Unpacks an export token into the mark it was issued at."""
+    try:
+        data = _serializer().loads(token)
+        modified = datetime.fromisoformat(data["m"]) if data["m"] else None
+        seq = int(data["s"])
+        issued = datetime.fromisoformat(data["i"])
+    except (BadSignature, KeyError, TypeError, ValueError) as e:
+        raise ExportTokenError("Invalid export token.") from e
+    _check_retention(issued)
+    return modified, seq
+
+
+def mark_at(since):
+    """The mark of the database as it was at the moment since, an aware datetime."""
+    if since.tzinfo is None:
+        raise ExportTokenError("The since timestamp needs a timezone, such as Z.")
+    since = _utc_naive(since)
+    _check_retention(since)
+    seq = db.session.execute(
+        select(func.max(_tombstones.c.seq)).where(_tombstones.c.deleted_at <= since)
+    ).scalar()
+    return since, seq or 0
+
+
+def prune_tombstones():
+    """Deletes tombstones older than TOMBSTONE_RETENTION_DAYS."""
+    retention = timedelta(days=current_app.config["TOMBSTONE_RETENTION_DAYS"])
+    cutoff = _utc_naive(datetime.now(timezone.utc)) - retention
+    # Not a change to the watchlist, so not through db.session
+    with db.engine.begin() as connection:
+        connection.execute(delete(_tombstones).where(_tombstones.c.deleted_at < cutoff))
+
+
+def iter_delta_rows(since, until):
+    """
+    Yields batches of the tombstones, then the items, that changed after the
+    mark since and up to the mark until, each as a range scan on its index.
+    """
+    since_modified, since_seq = since
+    until_modified, until_seq = until
+    tombstones = db.session.execute(
+        select(_tombstones)
+        .where(_tombstones.c.seq > since_seq, _tombstones.c.seq <= until_seq)
+        .order_by(_tombstones.c.seq)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    yield from tombstones.partitions()
+
+    if until_modified is None:
+        return  # The watchlist is empty
+    modified = WatchlistItem.date_modified
+    query = select(*[getattr(WatchlistItem, field) for field in EXPORT_FIELDS]).where(
+        modified <= until_modified
+    )
+    if since_modified is not None:
+        query = query.where(modified > since_modified)
+    items = db.session.execute(
+        query.order_by(modified, WatchlistItem.id).execution_options(
+            yield_per=EXPORT_BATCH_SIZE
+        )
+    )
+    yield from items.partitions()
+
+
+def delta_record(row):
+    """Converts a delta row into a backup record, tombstones marked "deleted"."""
+    if "seq" not in row._mapping:
+        return export_record(row)
+    record = {field: getattr(row, field) for field in TOMBSTONE_FIELDS}
+    record["deleted"] = True
+    record["deleted_at"] = row.deleted_at.isoformat()
+    return record
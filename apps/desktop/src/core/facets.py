@@ -0,0 +1,166 @@
+# apps/desktop/src/core/facets.py
+from sqlalchemy import column, func, select, table, text
+from . import db
+from .models import WatchlistItem
+
+FACETS_TABLE = "watchlist_facets"
+
+# Columns of watchlist_items rolled up into facet counts. NULLs are skipped.
+FACET_DIMENSIONS = ["status", "type", "year", "rating"]
+
+
+def _increment_sql(row):
+    return "\n".join(
+        f"""
+            INSERT INTO {FACETS_TABLE}(dimension, value, count)
+            SELECT '{dimension}', {row}.{dimension}, 1
+            WHERE {row}.{dimension} IS NOT NULL
+            ON CONFLICT(dimension, value) DO UPDATE SET count = count + 1;"""
+        for dimension in FACET_DIMENSIONS
+    )
+
+
+def _decrement_sql(row):
+    return "\n".join(
+        f"""
+            UPDATE {FACETS_TABLE} SET count = count - 1
+            WHERE dimension = '{dimension}' AND value = {row}.{dimension};"""
+        for dimension in FACET_DIMENSIONS
+    ) + (f"\n            DELETE FROM {FACETS_TABLE} WHERE count <= 0;")
+
+
+# Rollup of item counts per (dimension, value), maintained incrementally by
+# triggers so every write path (forms, imports, bulk deletes) keeps it exact.
+# The covering index below lets count_facets() group filtered results without
+# touching the table.
+SCHEMA_OBJECTS = [
+    (
+        "table",
+        FACETS_TABLE,
+        f"""
+        CREATE TABLE IF NOT EXISTS {FACETS_TABLE} (
+            dimension TEXT NOT NULL,
+            value NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+        """,
+    ),
+    (
+        "trigger",
+        f"{FACETS_TABLE}_ai",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FACETS_TABLE}_ai
+        AFTER INSERT ON watchlist_items BEGIN{_increment_sql("new")}
+        END
+        """,
+    ),
+    (
+        "trigger",
+        f"{FACETS_TABLE}_ad",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FACETS_TABLE}_ad
+        AFTER DELETE ON watchlist_items BEGIN{_decrement_sql("old")}
+        END
+        """,
+    ),
+    (
+        "trigger",
+        f"{FACETS_TABLE}_au",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FACETS_TABLE}_au
+        AFTER UPDATE OF {", ".join(FACET_DIMENSIONS)} ON watchlist_items
+        BEGIN{_decrement_sql("old")}{_increment_sql("new")}
+        END
+        """,
+    ),
+]
+
+SCHEMA_OBJECTS.append(
+    (
+        "index",
+        "ix_watchlist_items_facets",
+        f"""
+        CREATE INDEX IF NOT EXISTS ix_watchlist_items_facets
+        ON watchlist_items ({", ".join(FACET_DIMENSIONS)})
+        """,
+    )
+)
+
+DROP_STATEMENTS = [f"DROP TABLE IF EXISTS {FACETS_TABLE}"]
+
+_facets = table(FACETS_TABLE, column("dimension"), column("value"), column("count"))
+
+
+def rebuild_facets(connection):
+    """Recomputes every facet count from watchlist_items."""
+    connection.execute(text(f"DELETE FROM {FACETS_TABLE}"))
+    for dimension in FACET_DIMENSIONS:
+        connection.execute(
+            text(
+                f"""
+                INSERT INTO {FACETS_TABLE}(dimension, value, count)
+                SELECT '{dimension}', {dimension}, count(*) FROM watchlist_items
+                WHERE {dimension} IS NOT NULL GROUP BY {dimension}
+                """
+            )
+        )
+
+
+def get_facets():
+    """
+    Returns the precomputed facet counts as {dimension: {value: count}}.
+    Years and ratings are ordered highest first, other values alphabetically.
+    """
+    rows = db.session.execute(
+        select(_facets).order_by(_facets.c.dimension, _facets.c.value)
+    )
+    facets = {dimension: {} for dimension in FACET_DIMENSIONS}
+    for dimension, value, count in rows:
+        facets[dimension][value] = count
+    for dimension in ("year", "rating"):
+        facets[dimension] = dict(reversed(facets[dimension].items()))
+    return facets
+
+
+def _passes(dimension, value, filters):
+    """Whether value satisfies the filter on dimension (see _parse_filter_args)."""
+    if dimension in ("status", "type"):
+        return filters[dimension] == "all" or value == filters[dimension]
+    if dimension == "year":
+        return not filters["years"] or value in filters["years"]
+    if filters["rating_min"] is None and filters["rating_max"] is None:
+        return True
+    return (
+        value is not None
+        and (filters["rating_min"] is None or value >= filters["rating_min"])
+        and (filters["rating_max"] is None or value <= filters["rating_max"])
+    )
+
+
+def count_facets(query, filters):
+    """
+    Counts items per facet value among the rows of query (the unfiltered
+    search results), shaped like get_facets(). Each dimension applies every
+    active filter but its own, from a single grouped scan.
+    """
+    columns = [getattr(WatchlistItem, dimension) for dimension in FACET_DIMENSIONS]
+    groups = query.with_entities(*columns, func.count()).group_by(*columns).all()
+
+    facets = {dimension: {} for dimension in FACET_DIMENSIONS}
+    for *values, count in groups:
+        passes = [
+            _passes(dimension, value, filters)
+            for dimension, value in zip(FACET_DIMENSIONS, values, strict=True)
+        ]
+        for i, (dimension, value) in enumerate(
+            zip(FACET_DIMENSIONS, values, strict=True)
+        ):
+            if value is None or not all(passes[:i] + passes[i + 1 :]):
+                continue
+            facets[dimension][value] = facets[dimension].get(value, 0) + count
+
+    for dimension in FACET_DIMENSIONS:
+        descending = dimension in ("year", "rating")
+        facets[dimension] = dict(sorted(facets[dimension].items(), reverse=descending))
+    return facets
@@ -0,0 +1,121 @@
+# apps/desktop/src/core/fragment_cache.py
+import threading
+import uuid
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Session.info flag set when a transaction has written data
+_DIRTY_FLAG = "fragment_cache_dirty"
+
+
+class FragmentCache:
+    """
+    In-process LRU cache of rendered HTML fragments, bounded by the total
+    encoded size of the entries rather than their number.
+
+    Keys include a data generation number that is bumped after every commit
+    that changed data, so a fragment rendered before a write is never served
+    after it.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        # Generations restart at 0 with the process, the epoch tells them apart
+        self.epoch = uuid.uuid4().hex
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the cached fragment for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, html):
+        """Stores html under key, evicting least recently used entries."""
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (html, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def bump_generation(self):
+        """Marks every cached fragment as stale after a data change."""
+        with self._lock:
+            self.generation += 1
+            # Old keys can never match again, so free their memory right away
+            self._entries.clear()
+            self._size = 0
+
+    def data_version(self):
+        """Identifies the current state of the data within this process."""
+        return f"{self.epoch}-{self.generation}"
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def init_app(app):
+    app.extensions["fragment_cache"] = FragmentCache(
+        app.config["FRAGMENT_CACHE_MAX_BYTES"]
+    )
+
+
+def get_fragment_cache():
+    return current_app.extensions["fragment_cache"]
+
+
+# Writes are detected on the session rather than in each route, so that
+# save_item, delete_item, import_data_json and anything added later all
+# invalidate the cache, including bulk Query.delete() and Core DML.
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_writes(session, flush_context):
+    session.info[_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_generation_on_commit(session):
+    if session.info.pop(_DIRTY_FLAG, False) and has_app_context():
+        cache = current_app.extensions.get("fragment_cache")
+        if cache is not None:
+            cache.bump_generation()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_writes(session):
+    session.info.pop(_DIRTY_FLAG, None)
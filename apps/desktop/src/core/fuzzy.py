@@ -0,0 +1,160 @@
+# apps/desktop/src/core/fuzzy.py
+from sqlalchemy import column, func, select, table, text
+from . import config
+
+TRIGRAMS_TABLE = "watchlist_items_trigrams"
+POSITIONS_VIEW = f"{TRIGRAMS_TABLE}_positions"
+_ITEM_ID_INDEX = f"ix_{TRIGRAMS_TABLE}_item_id"
+_CREATE_ITEM_ID_INDEX = f"""
+        CREATE INDEX IF NOT EXISTS {_ITEM_ID_INDEX}
+        ON {TRIGRAMS_TABLE} (item_id)
+        """
+
+# Titles are String(255); padding adds three characters
+MAX_TITLE_LENGTH = 255
+
+# Mirrors _trigrams() below: two spaces before the lowercased title and one
+# after, so word starts weigh more than word ends, as in PostgreSQL's pg_trgm.
+_PADDED_TITLE = "'  ' || lower({row}.title) || ' '"
+
+
+def _insert_trigrams_sql(row):
+    padded = _PADDED_TITLE.format(row=row)
+    return f"""
+            INSERT OR IGNORE INTO {TRIGRAMS_TABLE}(trigram, item_id)
+            SELECT substr({padded}, n, 3), {row}.id FROM {POSITIONS_VIEW}
+            WHERE n <= length({padded}) - 2;"""
+
+
+def _delete_trigrams_sql(row):
+    return f"""
+            DELETE FROM {TRIGRAMS_TABLE} WHERE item_id = {row}.id;"""
+
+
+# Inverted index from each three-character substring of a title to the items
+# containing it, kept in sync by triggers. Triggers cannot use CTEs directly,
+# so the character positions come from a view over a recursive CTE.
+SCHEMA_OBJECTS = [
+    (
+        "table",
+        TRIGRAMS_TABLE,
+        f"""
+        CREATE TABLE IF NOT EXISTS {TRIGRAMS_TABLE} (
+            trigram TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            PRIMARY KEY (trigram, item_id)
+        ) WITHOUT ROWID
+        """,
+    ),
+    ("index", _ITEM_ID_INDEX, _CREATE_ITEM_ID_INDEX),
+    (
+        "view",
+        POSITIONS_VIEW,
+        f"""
+        CREATE VIEW IF NOT EXISTS {POSITIONS_VIEW}(n) AS
+        WITH RECURSIVE positions(n) AS (
+            SELECT 1 UNION ALL SELECT n + 1 FROM positions
+            WHERE n < {MAX_TITLE_LENGTH + 1}
+        )
+        SELECT n FROM positions
+        """,
+    ),
+    (
+        "trigger",
+        f"{TRIGRAMS_TABLE}_ai",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {TRIGRAMS_TABLE}_ai
+        AFTER INSERT ON watchlist_items BEGIN{_insert_trigrams_sql("new")}
+        END
+        """,
+    ),
+    (
+        "trigger",
+        f"{TRIGRAMS_TABLE}_ad",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {TRIGRAMS_TABLE}_ad
+        AFTER DELETE ON watchlist_items BEGIN{_delete_trigrams_sql("old")}
+        END
+        """,
+    ),
+    (
+        "trigger",
+        f"{TRIGRAMS_TABLE}_au",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {TRIGRAMS_TABLE}_au
+        AFTER UPDATE OF title ON watchlist_items
+        BEGIN{_delete_trigrams_sql("old")}{_insert_trigrams_sql("new")}
+        END
+        """,
+    ),
+]
+
+DROP_STATEMENTS = [
+    f"DROP VIEW IF EXISTS {POSITIONS_VIEW}",
+    f"DROP TABLE IF EXISTS {TRIGRAMS_TABLE}",
+]
+
+_trigrams_table = table(TRIGRAMS_TABLE, column("trigram"), column("item_id"))
+
+
+def _trigrams(title):
+    """The distinct trigrams of title, computed the way the triggers do."""
+    # SQLite's lower() only folds ASCII letters
+    lowered = "".join(c.lower() if c.isascii() else c for c in title)
+    padded = f"  {lowered} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def rebuild_trigrams(connection):
+    """
+    Re-indexes the trigrams of every title in watchlist_items, computed here
+    and inserted in key order: several times faster than the triggers' SQL.
+    """
+    connection.execute(text(f"DELETE FROM {TRIGRAMS_TABLE}"))
+    titles = connection.execute(text("SELECT id, title FROM watchlist_items"))
+    rows = sorted(
+        (trigram, item_id) for item_id, title in titles for trigram in _trigrams(title)
+    )
+    connection.execute(text(f"DROP INDEX IF EXISTS {_ITEM_ID_INDEX}"))
+    if rows:  # Plain tuples: hundreds of thousands of rows for a big watchlist
+        connection.exec_driver_sql(
+            f"INSERT INTO {TRIGRAMS_TABLE}(trigram, item_id) VALUES (?, ?)", rows
+        )
+    connection.execute(text(_CREATE_ITEM_ID_INDEX))  # One pass, cheaper than per row
+
+
+def match_subquery(search_term):
+    """
+    Returns a subquery of (item_id, rank) for items whose title shares enough
+    of the search term's trigrams, or None if the term is blank. Lower rank
+    (closer title overall) is better, as with the full-text rank.
+    """
+    search_term = search_term.strip()
+    if not search_term:
+        return None
+    term_trigrams = _trigrams(search_term)
+
+    shared = (
+        select(
+            _trigrams_table.c.item_id,
+            func.count().label("shared"),
+        )
+        .where(_trigrams_table.c.trigram.in_(sorted(term_trigrams)))
+        .group_by(_trigrams_table.c.item_id)
+        .subquery("shared_trigrams")
+    )
+    item_trigrams = _trigrams_table.alias("item_trigrams")
+    item_total = (
+        select(func.count())
+        .where(item_trigrams.c.item_id == shared.c.item_id)
+        .scalar_subquery()
+    )
+    coverage = shared.c.shared * 1.0 / len(term_trigrams)
+    jaccard = (
+        shared.c.shared * 1.0 / (len(term_trigrams) + item_total - shared.c.shared)
+    )
+    return (
+        select(shared.c.item_id.label("item_id"), (-(coverage + jaccard)).label("rank"))
+        .where(coverage >= config.FUZZY_SEARCH_THRESHOLD)
+        .subquery("search_matches")
+    )
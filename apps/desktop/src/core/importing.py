@@ -0,0 +1,255 @@
+# apps/desktop/src/core/importing.py
+import itertools
+import logging
+from collections import deque
+from datetime import date, datetime, timezone
+from .backup import IMPORT_BATCH_SIZE, batched
+
+# Batches validated in this process before a worker pool is started, so
+# small imports never pay for starting one
+SERIAL_IMPORT_BATCHES = 10
+
+# Workers are spawned rather than forked: imports run on job threads, and
+# forking a threaded process can copy locks held by the other threads
+_MP_START_METHOD = "spawn"
+
+# A child of the app's logger, which is named after the src.core package
+_logger = logging.getLogger(__name__)
+
+# Problems found in imported records, as described in an import report.
+# Records with a "skip" problem are left out, the others are imported with
+# the bad value replaced.
+PROBLEMS = {
+    "missing_title_or_type": "Skipped, missing title or type",
+    "rating_out_of_range": "Rating out of range (1-10), set to none",
+    "rating_invalid": "Invalid rating, set to none",
+    "year_out_of_range": "Year out of range (1800-2050), set to none",
+    "year_invalid": "Invalid year, set to none",
+    "date_added_invalid": "Invalid date added, set to the time of import",
+    "date_watched_invalid": "Invalid date watched, set to none",
+}
+
+SKIP_PROBLEMS = {"missing_title_or_type"}
+
+# Titles kept per problem as examples, however many records have it
+REPORT_SAMPLE_SIZE = 10
+
+
+class ImportReport:
+    """
+    Counts the records of an import and their problems by kind, keeping the
+    titles of the first few records with each. Filled in worker processes
+    per batch and combined with update(), so it stays picklable and small.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.problems = dict.fromkeys(PROBLEMS, 0)
+        self.samples = {problem: [] for problem in PROBLEMS}
+
+    def add(self, problem, title):
+        self.problems[problem] += 1
+        if len(self.samples[problem]) < REPORT_SAMPLE_SIZE:
+            self.samples[problem].append(title)
+
+    def update(self, other):
+        """Adds the counts and samples of another report to this one."""
+        self.records += other.records
+        for problem, count in other.problems.items():
+            self.problems[problem] += count
+            room = REPORT_SAMPLE_SIZE - len(self.samples[problem])
+            self.samples[problem].extend(other.samples[problem][:room])
+
+    @property
+    def skipped(self):
+        return sum(self.problems[problem] for problem in SKIP_PROBLEMS)
+
+    @property
+    def has_problems(self):
+        return any(self.problems.values())
+
+    def summary(self):
+        """A few lines of text listing each problem found, with examples."""
+        lines = [f"{self.records} records read, {self.skipped} skipped."]
+        for problem, count in self.problems.items():
+            if count:
+                lines.append(f"{PROBLEMS[problem]}: {count}")
+                examples = ", ".join(f"'{title}'" for title in self.samples[problem])
+                more = " ..." if count > len(self.samples[problem]) else ""
+                lines.append(f"  e.g. {examples}{more}")
+        return "\n".join(lines)
+
+
+# Validation below runs in worker processes without an application context,
+# so it never logs itself. Problems are added to an ImportReport instead.
+
+
+def parse_rating(raw_rating, item_title_for_log, report):
+    """Parses and validates rating from imported item."""
+    if raw_rating is None:
+        return None
+    try:
+        item_rating_int = int(raw_rating)
+        if 1 <= item_rating_int <= 10:
+            return item_rating_int
+        else:
+            report.add("rating_out_of_range", item_title_for_log)
+            return None
+    except ValueError:
+        report.add("rating_invalid", item_title_for_log)
+        return None
+
+
+def parse_year(raw_year, item_title_for_log, report):
+    """Parses and validates year from imported item."""
+    if raw_year is None:
+        return None
+    try:
+        item_year_int = int(raw_year)
+        if 1800 <= item_year_int <= 2050:
+            return item_year_int
+        else:
+            report.add("year_out_of_range", item_title_for_log)
+            return None
+    except ValueError:
+        report.add("year_invalid", item_title_for_log)
+        return None
+
+
+def process_record(raw_item, report):
+    """
+    Processes a single raw item from an imported backup.
+    Returns a dict of watchlist_items column values or None if skipped.
+    """
+    item_title_for_log = raw_item.get("title", "N/A")
+
+    if not raw_item.get("title") or not raw_item.get("type"):
+        report.add("missing_title_or_type", item_title_for_log)
+        return None
+
+    item_rating = parse_rating(raw_item.get("rating"), item_title_for_log, report)
+    item_year = parse_year(raw_item.get("year"), item_title_for_log, report)
+
+    if raw_item.get("deleted") is True:  # Tombstone from a delta export
+        return {
+            "deleted": True,
+            "title": raw_item.get("title"),
+            "type": raw_item.get("type"),
+            "year": item_year,
+            "tmdb_id": raw_item.get("tmdb_id"),
+            "imdb_id": raw_item.get("imdb_id"),
+            "boxd_id": raw_item.get("boxd_id"),
+        }
+
+    new_item = {
+        "title": raw_item.get("title"),
+        "type": raw_item.get("type"),
+        "year": item_year,
+        "tmdb_id": raw_item.get("tmdb_id"),
+        "imdb_id": raw_item.get("imdb_id"),
+        "boxd_id": raw_item.get("boxd_id"),
+        "overview": raw_item.get("overview"),
+        "poster_url": raw_item.get("poster_url"),
+        "status": raw_item.get("status", "Watched"),  # Default to Watched
+        "rating": item_rating,
+        "notes": raw_item.get("notes"),
+    }
+
+    # Date Added
+    raw_date_added = raw_item.get("date_added")
+    if raw_date_added:
+        try:
+            new_item["date_added"] = datetime.fromisoformat(raw_date_added)
+        except ValueError:
+            report.add("date_added_invalid", item_title_for_log)
+            new_item["date_added"] = datetime.now(timezone.utc)
+    else:
+        new_item["date_added"] = datetime.now(timezone.utc)
+
+    # Date Watched
+    raw_date_watched = raw_item.get("date_watched")
+    if raw_date_watched:
+        try:
+            new_item["date_watched"] = date.fromisoformat(raw_date_watched)
+        except ValueError:
+            report.add("date_watched_invalid", item_title_for_log)
+            new_item["date_watched"] = None  # Explicitly set to None on error
+    else:
+        new_item["date_watched"] = None
+
+    return new_item
+
+
+def process_batch(batch):
+    """
+    Processes a batch of raw items. Returns the processed rows and an
+    ImportReport of the batch, both picklable for a worker to return.
+    """
+    rows = []
+    report = ImportReport()
+    report.records = len(batch)
+    for raw_item in batch:
+        row = process_record(raw_item, report)
+        if row is not None:
+            rows.append(row)
+    return rows, report
+
+
+def iter_processed_batches(records, workers):
+    """
+    Yields process_batch() results for records in IMPORT_BATCH_SIZE batches,
+    in the order of the records. The first SERIAL_IMPORT_BATCHES batches are
+    processed here; with workers > 1, any after that are processed by a pool
+    of that many processes, while this one keeps reading ahead. At most two
+    batches per worker are in flight, so memory stays bounded whatever the
+    size of the import.
+    """
+    batches = batched(records, IMPORT_BATCH_SIZE)
+    for batch in itertools.islice(batches, SERIAL_IMPORT_BATCHES):
+        yield process_batch(batch)
+    if workers <= 1:
+        yield from map(process_batch, batches)
+        return
+
+    first = next(batches, None)
+    if first is None:
+        return  # Small enough to never need the pool
+    # Only large imports get this far, so the app starts without loading these
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    executor = ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context(_MP_START_METHOD)
+    )
+    # Batches handed to the pool and their futures, in order. A batch leaves
+    # pending only once its result is in, so none is lost if the pool breaks.
+    pending = deque()
+    futures = deque()
+    try:
+        for batch in itertools.chain([first], batches):
+            pending.append(batch)
+            futures.append(executor.submit(process_batch, batch))
+            if len(futures) >= 2 * workers:
+                result = futures[0].result()
+                pending.popleft()
+                futures.popleft()
+                yield result
+        while futures:
+            result = futures[0].result()
+            pending.popleft()
+            futures.popleft()
+            yield result
+    except BrokenProcessPool:
+        # A worker died, e.g. because the script that started the app has no
+        # __main__ guard and the spawned worker ran it again on import
+        _logger.warning(
+            "Import worker pool stopped unexpectedly, validating the rest of "
+            "the import in this process."
+        )
+        yield from map(process_batch, pending)
+        yield from map(process_batch, batches)
+    finally:
+        # Also reached when the import fails or its reader stops early
+        executor.shutdown(cancel_futures=True)
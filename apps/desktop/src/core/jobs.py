@@ -0,0 +1,230 @@
+# apps/desktop/src/core/jobs.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from flask import current_app
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from . import db
+from .database import JOBS_BIND
+from .models import Job
+
+_UNFINISHED = ("queued", "running")
+
+# Tries at recording how a job ended, the waits between them doubling from 0.5 s
+_FINISH_ATTEMPTS = 4
+
+
+class JobError(Exception):
+    """Raised by a job function to fail the job with a message for the user."""
+
+
+class JobProgress:
+    """Handed to a running job function to report the rows it has processed."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.rows_processed = 0
+        self._started = time.perf_counter()
+
+    def add(self, rows):
+        self.rows_processed += rows
+
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self._started
+        return self.rows_processed / elapsed if elapsed > 0 else 0.0
+
+
+class JobRunner:
+    """
+    Runs imports and exports on a small thread pool instead of the request
+    threads. Every job has a row in the jobs database recording its status
+    and result. Progress while it runs is only kept in memory.
+    """
+
+    def __init__(self, app, max_workers):
+        self.app = app
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self._running = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, func, *args):
+        """
+        Queues func(progress, *args) as a job of the given kind and returns
+        the job id. func returns a message for the user and the path of the
+        file it produced, or None.
+        """
+        prune_finished_jobs()
+        job_id = uuid.uuid4().hex
+        _write(insert(Job.__table__).values(id=job_id, kind=kind, status="queued"))
+        with self._lock:
+            self._futures = {k: f for k, f in self._futures.items() if not f.done()}
+            self._futures[job_id] = self._executor.submit(self._run, job_id, func, args)
+        return job_id
+
+    def wait(self, job_id, timeout=None):
+        """Blocks until the job has finished, if it is still running."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout)
+
+    def progress(self, job_id):
+        """Returns the JobProgress of a running job, or None."""
+        with self._lock:
+            return self._running.get(job_id)
+
+    def _run(self, job_id, func, args):
+        with self.app.app_context():
+            progress = JobProgress(job_id)
+            with self._lock:
+                self._running[job_id] = progress
+            try:
+                _set(job_id, status="running", started_at=_now())
+                message, artifact_path = func(progress, *args)
+            except JobError as e:
+                db.session.rollback()
+                _finish(job_id, "failed", progress, str(e))
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+                _finish(
+                    job_id,
+                    "failed",
+                    progress,
+                    "An unexpected error occurred. Please check logs.",
+                )
+            else:
+                _finish(job_id, "succeeded", progress, message, artifact_path)
+            finally:
+                with self._lock:
+                    self._running.pop(job_id, None)
+                db.session.remove()
+
+
+# Job rows live in a database of their own and are written outside db.session,
+# so bookkeeping never waits for an import holding the main database's writer,
+# joins the job's own transaction, or counts as a data change for the fragment
+# cache and title index.
+def _write(statement):
+    with db.engines[JOBS_BIND].begin() as connection:
+        connection.execute(statement)
+
+
+def _set(job_id, **values):
+    _write(update(Job.__table__).where(Job.id == job_id).values(**values))
+
+
+def _finish(job_id, status, progress, message, artifact_path=None):
+    for attempt in range(_FINISH_ATTEMPTS):
+        try:
+            _set(
+                job_id,
+                status=status,
+                rows_processed=progress.rows_processed,
+                message=message,
+                artifact_path=artifact_path,
+                finished_at=_now(),
+            )
+            return
+        except SQLAlchemyError as e:
+            error = e
+            if attempt + 1 < _FINISH_ATTEMPTS:
+                time.sleep(0.5 * 2**attempt)
+    # Left running until recover_interrupted_jobs fails it at the next start
+    current_app.logger.error(f"Could not record the end of job {job_id}: {error}")
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def rows_per_second(job):
+    """Average throughput of a finished job."""
+    if job.started_at is None or job.finished_at is None:
+        return 0.0
+    elapsed = (job.finished_at - job.started_at).total_seconds()
+    return job.rows_processed / elapsed if elapsed > 0 else 0.0
+
+
+def job_file(job_id, suffix):
+    """Path for a file belonging to a job, in the JOBS_DIR directory."""
+    jobs_dir = Path(current_app.config["JOBS_DIR"])
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    return jobs_dir / f"{job_id}{suffix}"
+
+
+def recover_interrupted_jobs():
+    """
+    Creates the jobs table if it is missing, and fails jobs that were still
+    queued or running when the application last stopped.
+    """
+    try:
+        with db.engines[JOBS_BIND].begin() as connection:
+            Job.__table__.create(connection, checkfirst=True)
+            connection.execute(
+                update(Job.__table__)
+                .where(Job.status.in_(_UNFINISHED))
+                .values(
+                    status="failed",
+                    message="Interrupted by an application restart.",
+                    finished_at=_now(),
+                )
+            )
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Could not recover interrupted jobs: {e}")
+        return
+    prune_finished_jobs()
+
+
+def prune_finished_jobs():
+    """
+    Deletes jobs that finished more than JOB_RETENTION_HOURS ago, with the
+    files they produced, and any other file in JOBS_DIR last written before
+    then, such as the reports of imports run without a job. Runs at startup
+    and whenever a job is submitted.
+    """
+    hours = current_app.config["JOB_RETENTION_HOURS"]
+    if hours <= 0:
+        return
+    cutoff = _now() - timedelta(hours=hours)
+    try:
+        with db.engines[JOBS_BIND].begin() as connection:
+            expired = connection.execute(
+                select(Job.id, Job.artifact_path).where(Job.finished_at < cutoff)
+            ).all()
+            connection.execute(
+                delete(Job.__table__).where(Job.id.in_([job.id for job in expired]))
+            )
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Could not prune finished jobs: {e}")
+        return
+
+    paths = [Path(job.artifact_path) for job in expired if job.artifact_path]
+    jobs_dir = Path(current_app.config["JOBS_DIR"])
+    if jobs_dir.is_dir():
+        paths += [
+            path
+            for path in jobs_dir.iterdir()
+            if path.is_file() and path.stat().st_mtime < cutoff.timestamp()
+        ]
+    for path in paths:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:  # e.g. still open for a download on Windows
+            current_app.logger.warning(f"Could not delete job file {path}: {e}")
+
+
+def init_app(app):
+    app.extensions["jobs"] = JobRunner(app, app.config["JOB_WORKERS"])
+    recover_interrupted_jobs()
+
+
+def get_job_runner():
+    return current_app.extensions["jobs"]
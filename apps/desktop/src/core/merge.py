@@ -0,0 +1,187 @@
+# apps/desktop/src/core/merge.py
+import string
+from datetime import datetime, timezone
+from sqlalchemy import delete, func, insert, select, update
+from . import db
+from .models import WatchlistItem
+
+# Columns a merge import compares and updates on items it matched. date_added
+# is left alone, it records when the item first entered this watchlist.
+MERGED_FIELDS = [
+    "title",
+    "type",
+    "year",
+    "tmdb_id",
+    "imdb_id",
+    "boxd_id",
+    "overview",
+    "poster_url",
+    "status",
+    "rating",
+    "notes",
+    "date_watched",
+]
+
+# Must stay identical to the expression in ix_watchlist_items_title_key
+_TITLE_KEY = func.lower(func.trim(WatchlistItem.title))
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Lookup indexes for matching imported records to existing items. They are
+# not UNIQUE: replace-mode imports never deduplicated, so existing watchlists
+# may hold duplicates, and a unique index would fail to build on them.
+# The ID indexes are partial, most items have no IDs set. TMDb IDs are only
+# unique per media type, hence (tmdb_id, type).
+SCHEMA_OBJECTS = [
+    (
+        "index",
+        "ix_watchlist_items_imdb_id",
+        "CREATE INDEX IF NOT EXISTS ix_watchlist_items_imdb_id "
+        "ON watchlist_items (imdb_id) WHERE imdb_id IS NOT NULL",
+    ),
+    (
+        "index",
+        "ix_watchlist_items_tmdb_id",
+        "CREATE INDEX IF NOT EXISTS ix_watchlist_items_tmdb_id "
+        "ON watchlist_items (tmdb_id, type) WHERE tmdb_id IS NOT NULL",
+    ),
+    (
+        "index",
+        "ix_watchlist_items_boxd_id",
+        "CREATE INDEX IF NOT EXISTS ix_watchlist_items_boxd_id "
+        "ON watchlist_items (boxd_id) WHERE boxd_id IS NOT NULL",
+    ),
+    (
+        "index",
+        "ix_watchlist_items_title_key",
+        "CREATE INDEX IF NOT EXISTS ix_watchlist_items_title_key "
+        "ON watchlist_items (lower(trim(title)), type, year)",
+    ),
+]
+
+# Dropped together with watchlist_items
+DROP_STATEMENTS = []
+
+
+def title_key(title):
+    """lower(trim(title)) as SQLite computes it: spaces trimmed, ASCII folded."""
+    return title.strip(" ").translate(_ASCII_LOWER)
+
+
+def match_keys(row):
+    """The keys a record or item can be matched on, strongest first."""
+    keys = []
+    if row["imdb_id"]:
+        keys.append(("imdb", row["imdb_id"]))
+    if row["tmdb_id"]:
+        keys.append(("tmdb", row["tmdb_id"], row["type"]))
+    if row["boxd_id"]:
+        keys.append(("boxd", row["boxd_id"]))
+    keys.append(("title", title_key(row["title"]), row["type"], row["year"]))
+    return keys
+
+
+class ImportMerger:
+    """
+    Merges batches of imported rows into the existing watchlist. A row that
+    matches an item on any of its keys updates that item, but only if some
+    value differs; rows without a match are inserted. Later rows also match
+    rows inserted earlier in the same import, so duplicates in a backup
+    collapse into one item. Tombstones from a delta export (rows with
+    "deleted" set) delete the item they match.
+    """
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+
+    def _existing_items(self, rows):
+        """Maps the match keys of every existing item a row could match to it."""
+        lookups = [
+            (WatchlistItem.imdb_id, {r["imdb_id"] for r in rows if r["imdb_id"]}),
+            (WatchlistItem.tmdb_id, {r["tmdb_id"] for r in rows if r["tmdb_id"]}),
+            (WatchlistItem.boxd_id, {r["boxd_id"] for r in rows if r["boxd_id"]}),
+            (_TITLE_KEY, {title_key(r["title"]) for r in rows}),
+        ]
+        columns = [WatchlistItem.id] + [
+            getattr(WatchlistItem, field) for field in MERGED_FIELDS
+        ]
+        items = {}
+        # One IN lookup per key, each answered from its own index
+        for expression, values in lookups:
+            if values:
+                result = db.session.execute(
+                    select(*columns).where(expression.in_(values))
+                )
+                for row in result.mappings():
+                    items[row["id"]] = dict(row)
+
+        by_key = {}
+        for item_id in sorted(items):  # The oldest of any duplicates wins
+            for key in match_keys(items[item_id]):
+                by_key.setdefault(key, items[item_id])
+        return by_key
+
+    def _delete(self, tombstones):
+        by_key = self._existing_items(tombstones)
+        item_ids = set()
+        for tombstone in tombstones:
+            target = next(
+                (by_key[k] for k in match_keys(tombstone) if k in by_key), None
+            )
+            if target is not None:
+                item_ids.add(target["id"])
+        if item_ids:
+            db.session.execute(
+                delete(WatchlistItem).where(WatchlistItem.id.in_(item_ids))
+            )
+            self.deleted += len(item_ids)
+
+    def merge(self, rows):
+        """Merges one batch of processed rows (dicts of column values)."""
+        # A delta export lists its tombstones before any item, so deleting
+        # first keeps the order of the file
+        tombstones = [row for row in rows if row.get("deleted")]
+        if tombstones:
+            self._delete(tombstones)
+            rows = [row for row in rows if not row.get("deleted")]
+        by_key = self._existing_items(rows)
+        new_rows = []
+        changed = {}
+        for row in rows:
+            target = next((by_key[k] for k in match_keys(row) if k in by_key), None)
+            if target is None:
+                new_rows.append(row)
+                self.inserted += 1
+                for key in match_keys(row):
+                    by_key.setdefault(key, row)
+                continue
+
+            changes = {
+                field: row[field]
+                for field in MERGED_FIELDS
+                if row[field] != target[field]
+            }
+            if not changes:
+                self.unchanged += 1
+                continue
+            target.update(changes)
+            self.updated += 1
+            for key in match_keys(target):
+                by_key.setdefault(key, target)
+            if "id" in target:  # Not a row inserted by this batch
+                changed.setdefault(target["id"], {}).update(changes)
+
+        if new_rows:
+            db.session.execute(insert(WatchlistItem.__table__), new_rows)
+        if changed:
+            now = datetime.now(timezone.utc)
+            db.session.execute(
+                update(WatchlistItem),
+                [
+                    {"id": item_id, "date_modified": now, **changes}
+                    for item_id, changes in changed.items()
+                ],
+            )
@@ -1,2 +1,3 @@
 # apps/desktop/src/core/models/__init__.py
 from .watchlist_item import WatchlistItem  # noqa: F401
+from .job import Job  # noqa: F401
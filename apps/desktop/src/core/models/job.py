@@ -0,0 +1,34 @@
+# apps/desktop/src/core/models/job.py
+from datetime import datetime, timezone
+from .. import db
+from ..database import JOBS_BIND
+
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+    __bind_key__ = JOBS_BIND
+
+    # Random hex id, so job URLs cannot be guessed from one another
+    id = db.Column(db.String(32), primary_key=True)
+    # Kind: 'import' or 'export'
+    kind = db.Column(db.String(20), nullable=False)
+    # Status: 'queued', 'running', 'succeeded' or 'failed'
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)
+    # Result or error shown to the user once the job has finished
+    message = db.Column(db.Text, nullable=True)
+    # File produced by an export, served by the download route
+    artifact_path = db.Column(db.String(500), nullable=True)
+
+    created_at = db.Column(
+        db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.id}: {self.kind} ({self.status})>"
+
+    @property
+    def is_finished(self):
+        return self.status in ("succeeded", "failed")
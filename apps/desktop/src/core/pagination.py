@@ -0,0 +1,152 @@
+# apps/desktop/src/core/pagination.py
+from datetime import date, datetime
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import or_
+from .models import WatchlistItem
+
+CURSOR_SALT = "watchlist-cursor"
+
+
+class KeysetPagination:
+    """
+    One page of results fetched by seeking past the (sort key, id) of the
+    previous page's boundary row, so every page costs the same as the first.
+    Mirrors the parts of Flask-SQLAlchemy's Pagination the templates use.
+    """
+
+    def __init__(self, items, page, has_prev, has_next, prev_cursor, next_cursor):
+        self.items = items
+        self.page = page
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt=CURSOR_SALT)
+
+
+def _to_json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json_value(value, sort_by):
+    if value is None:
+        return None
+    if sort_by == "date_added":
+        return datetime.fromisoformat(value)
+    if sort_by == "date_watched":
+        return date.fromisoformat(value)
+    return value
+
+
+def encode_cursor(sort_by, sort_order, key, direction, page):
+    """Packs a boundary row key into an opaque, signed, URL-safe token."""
+    sort_value, item_id = key
+    return _serializer().dumps(
+        {
+            "s": sort_by,
+            "o": sort_order,
+            "k": [_to_json_value(sort_value), item_id],
+            "d": direction,
+            "p": page,
+        }
+    )
+
+
+def decode_cursor(token, sort_by, sort_order):
+    """
+    Unpacks a cursor token. Returns (key, direction, page), or None if the
+    token is malformed, tampered with, or belongs to a different sort.
+    """
+    if not token:
+        return None
+    try:
+        data = _serializer().loads(token)
+        if data["s"] != sort_by or data["o"] != sort_order:
+            return None
+        if data["d"] not in ("next", "prev"):
+            return None
+        sort_value, item_id = data["k"]
+        key = (_from_json_value(sort_value, sort_by), int(item_id))
+        page = max(int(data["p"]), 1)
+    except (BadSignature, KeyError, TypeError, ValueError):
+        return None
+    return key, data["d"], page
+
+
+def seek_query(query, sort_expression, descending, key=None):
+    """
+    Orders query by (sort_expression, id) and, given the key of a boundary
+    row, keeps only the rows that come after it in that order. Rows carry
+    their sort key as an extra "sort_key" column.
+    """
+    item_id = WatchlistItem.id
+    query = query.add_columns(sort_expression.label("sort_key"))
+    if key is not None:
+        sort_value, boundary_id = key
+        # Equivalent to (sort_expression, id) < key, but spelled out so that
+        # SQLite can turn the leading term into a range seek on the sort index
+        if descending:
+            query = query.filter(
+                sort_expression <= sort_value,
+                or_(sort_expression < sort_value, item_id < boundary_id),
+            )
+        else:
+            query = query.filter(
+                sort_expression >= sort_value,
+                or_(sort_expression > sort_value, item_id > boundary_id),
+            )
+    if descending:
+        return query.order_by(sort_expression.desc(), item_id.desc())
+    return query.order_by(sort_expression.asc(), item_id.asc())
+
+
+def keyset_paginate(
+    query, sort_expression, descending, sort_by, sort_order, per_page, cursor=None
+):
+    """
+    Fetches one page of query ordered by (sort_expression, id), both in the
+    same direction. cursor is the decoded (key, direction, page) of the
+    boundary row to seek from, or None for the first page.
+    """
+    key, direction, page = cursor if cursor else (None, "next", 1)
+    forwards = direction == "next"
+    # Walking backwards means scanning the same order reversed, then flipping
+    scan_descending = descending if forwards else not descending
+
+    # One extra row tells whether there is anything beyond this page
+    query = seek_query(query, sort_expression, scan_descending, key)
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if forwards:
+        has_prev, has_next = key is not None, has_more
+    else:
+        rows.reverse()
+        has_prev, has_next = has_more, True
+
+    prev_cursor = next_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if has_prev:
+            prev_cursor = encode_cursor(
+                sort_by, sort_order, (first.sort_key, first[0].id), "prev", page - 1
+            )
+        if has_next:
+            next_cursor = encode_cursor(
+                sort_by, sort_order, (last.sort_key, last[0].id), "next", page + 1
+            )
+
+    return KeysetPagination(
+        items=[row[0] for row in rows],
+        page=page,
+        has_prev=has_prev,
+        has_next=has_next,
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,47 @@
+# apps/desktop/src/core/pragmas.py
+import os
+import re
+from functools import partial
+from sqlalchemy import event
+from . import db
+
+# What a PRAGMA value may look like, so values from .env are safe to inline
+_VALUE = re.compile(r"-?\d+|[A-Za-z_]+")
+
+
+def pragmas_from_env(defaults, environ=os.environ):
+    """
+    The PRAGMA profile defaults, with each value overridden by the environment
+    variable SQLITE_<NAME> if set, e.g. SQLITE_CACHE_SIZE=-131072. Raises
+    ValueError for a value that is not a plain number or keyword.
+    """
+    pragmas = {}
+    for name, value in defaults.items():
+        value = str(environ.get(f"SQLITE_{name.upper()}", value)).strip()
+        if not _VALUE.fullmatch(value):
+            raise ValueError(f"Invalid value {value!r} for SQLite PRAGMA {name}.")
+        pragmas[name] = value
+    return pragmas
+
+
+def apply_pragmas(dbapi_connection, connection_record=None, *, pragmas):
+    """Runs the PRAGMAs of a profile on a new DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def init_app(app):
+    """
+    Applies the SQLITE_PRAGMAS profile, with .env overrides, to every
+    connection the app's engines open. Must run before their first
+    connection, as pooled connections keep the settings they were opened with.
+    """
+    pragmas = pragmas_from_env(app.config["SQLITE_PRAGMAS"])
+    app.config["SQLITE_PRAGMAS"] = pragmas
+    for engine in db.engines.values():
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", partial(apply_pragmas, pragmas=pragmas))
@@ -8,7 +8,9 @@ from flask import (
 )
 import unicodedata
 from ..models import WatchlistItem
-from .. import db
+from .. import config, db
+from ..conditional import make_etag, not_modified, with_etag
+from ..database import BUSY_MESSAGE, is_busy
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import date
 
@@ -35,10 +37,21 @@ def add_item_form():
 @items_bp.route("/items/edit/form/<int:item_id>", methods=["GET"])
 def edit_item_form(item_id):
     """Return the HTML form for editing an existing item (for modal)."""
-    item = db.session.get(WatchlistItem, item_id)
-    if not item:
+    date_modified = db.session.scalar(
+        db.select(WatchlistItem.date_modified).filter_by(id=item_id)
+    )
+    if date_modified is None:
         return "<p class='text-error'>Item not found.</p>", 404
-    return render_template("_add_edit_item_form.html", item=item)
+
+    # Every save bumps date_modified, so it versions the whole form
+    etag = make_etag(config.APP_VERSION, item_id, date_modified.isoformat())
+    response = not_modified(etag)
+    if response is not None:
+        return response
+
+    item = db.session.get(WatchlistItem, item_id)
+    response = make_response(render_template("_add_edit_item_form.html", item=item))
+    return with_etag(response, etag)
 
 
 def _get_or_create_item(item_id_str):
@@ -208,6 +221,8 @@ def _prepare_exception_response(
         if status_code == 500
         else "Invalid data in form."
     )
+    if status_code == 503:
+        alert_message = BUSY_MESSAGE
     if "unexpected server error" in str(exception_message).lower():
         alert_message = "An unexpected server error occurred."
 
@@ -257,6 +272,10 @@ def save_item():
 
     except SQLAlchemyError as e:
         db.session.rollback()
+        if is_busy(e):
+            return _prepare_exception_response(
+                form_data, item_id_str, BUSY_MESSAGE, 503, is_new_item
+            )
         return _prepare_exception_response(
             form_data, item_id_str, f"Database error saving item: {e}", 500, is_new_item
         )
@@ -306,9 +325,12 @@ def delete_item(item_id):
     except SQLAlchemyError as e:
         db.session.rollback()
         current_app.logger.error(f"Database error deleting item {item_id}: {e}")
-        resp = make_response(
-            "<p class='text-error'>Database error deleting item.</p>", 500
-        )
+        if is_busy(e):
+            resp = make_response(f"<p class='text-error'>{BUSY_MESSAGE}</p>", 503)
+        else:
+            resp = make_response(
+                "<p class='text-error'>Database error deleting item.</p>", 500
+            )
         resp.headers["HX-Retarget"] = "#messages"
         resp.headers["HX-Reswap"] = "innerHTML"
         return resp
@@ -1,13 +1,53 @@
 # apps/desktop/src/core/routes/main.py
 import os
-from flask import Blueprint, render_template, request, current_app, session
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    current_app,
+    session,
+    make_response,
+)
 from ..models import WatchlistItem
-from .. import db
-from sqlalchemy import desc, asc, func
-from .. import config
+from sqlalchemy import desc, asc
+from sqlalchemy.orm import load_only
+from .. import config, fuzzy, get_validated_theme, search
+from ..conditional import make_etag, not_modified, with_etag
+from ..facets import count_facets, get_facets
+from ..fragment_cache import get_fragment_cache
+from ..pagination import decode_cursor, keyset_paginate
+from ..sorting import SORT_COLUMNS, get_sort_expression
+from ..suggest import get_title_index
 
 main_bp = Blueprint("main", __name__)
 
+# Columns the watchlist rows render. overview and notes are unbounded Text that
+# only the edit form shows, so the list leaves them unloaded.
+LIST_COLUMNS = (
+    WatchlistItem.id,
+    WatchlistItem.title,
+    WatchlistItem.type,
+    WatchlistItem.year,
+    WatchlistItem.status,
+    WatchlistItem.rating,
+    WatchlistItem.poster_url,
+    WatchlistItem.tmdb_id,
+    WatchlistItem.imdb_id,
+    WatchlistItem.boxd_id,
+    WatchlistItem.date_added,
+    WatchlistItem.date_watched,
+)
+
+
+# What _parse_filter_args returns when no filter is set
+NO_FILTERS = {
+    "status": "all",
+    "type": "all",
+    "years": [],
+    "rating_min": None,
+    "rating_max": None,
+}
+
 
 def _parse_filter_args(args):
     """Parses and validates filter arguments from the request."""
@@ -52,13 +92,22 @@ def _parse_filter_args(args):
     }
 
 
-def _parse_sort_args(args):
-    """Parses and validates sorting arguments."""
-    sort_by = args.get("sort", config.DEFAULT_SORT_COLUMN)
+def _parse_sort_args(args, searching=False):
+    """
+    Parses and validates sorting arguments.
+    While searching, results default to relevance order.
+    """
+    valid_sort_columns = list(SORT_COLUMNS)
+    default_sort = config.DEFAULT_SORT_COLUMN
+    if searching:
+        valid_sort_columns.append("relevance")
+        default_sort = "relevance"
+
+    sort_by = args.get("sort", default_sort)
     sort_order = args.get("order", config.DEFAULT_SORT_ORDER)
     if sort_order not in ["asc", "desc"]:
         sort_order = config.DEFAULT_SORT_ORDER
-    if sort_by not in ["date_watched", "date_added", "title", "year", "rating"]:
+    if sort_by not in valid_sort_columns:
         sort_by = config.DEFAULT_SORT_COLUMN
     return sort_by, sort_order
 
@@ -73,8 +122,11 @@ def _get_pagination_params(args):
     return page, items_per_page
 
 
-def _apply_filters_to_query(query, filters, search_term):
-    """Applies parsed filters and search term to the SQLAlchemy query."""
+def _apply_filters_to_query(query, filters, search_term, search_matches=None):
+    """
+    Applies parsed filters and search term to the SQLAlchemy query.
+    search_matches is the full-text match subquery for search_term, if any.
+    """
     if filters["status"] != "all":
         query = query.filter(WatchlistItem.status == filters["status"])
     if filters["type"] != "all":
@@ -89,83 +141,140 @@ def _apply_filters_to_query(query, filters, search_term):
         if filters["rating_max"] is not None:
             query = query.filter(WatchlistItem.rating <= filters["rating_max"])
 
-    if search_term:
+    if search_matches is not None:
+        query = query.join(search_matches, search_matches.c.item_id == WatchlistItem.id)
+    elif search_term:
+        # Nothing tokenizable (e.g. only punctuation), fall back to substring match
         query = query.filter(WatchlistItem.title.ilike(f"%{search_term}%"))
     return query
 
 
-def _apply_sorting_to_query(query, sort_by, sort_order):
-    """Applies sorting logic to the SQLAlchemy query."""
-    order_func = desc if sort_order == "desc" else asc
-    sort_column_expression = None
-
-    if sort_by == "title":
-        sort_column_expression = func.lower(WatchlistItem.title)
-    elif sort_by == "year":
-        placeholder = (
-            config.NULL_SORT_PLACEHOLDER["num_asc"]
-            if sort_order == "asc"
-            else config.NULL_SORT_PLACEHOLDER["num_desc"]
-        )
-        sort_column_expression = func.coalesce(WatchlistItem.year, placeholder)
-    elif sort_by == "rating":
-        placeholder = (
-            config.NULL_SORT_PLACEHOLDER["rating_asc"]
-            if sort_order == "asc"
-            else config.NULL_SORT_PLACEHOLDER["rating_desc"]
-        )
-        sort_column_expression = func.coalesce(WatchlistItem.rating, placeholder)
-    elif sort_by == "date_added":
-        sort_column_expression = WatchlistItem.date_added
-    elif sort_by == "date_watched":
-        placeholder = (
-            config.NULL_SORT_PLACEHOLDER["date_asc"]
-            if sort_order == "asc"
-            else config.NULL_SORT_PLACEHOLDER["date_desc"]
-        )
-        sort_column_expression = func.coalesce(WatchlistItem.date_watched, placeholder)
-
-    # Fallback if sort_by is somehow invalid
-    if sort_column_expression is None:
-        placeholder = (
-            config.NULL_SORT_PLACEHOLDER["date_asc"]
-            if sort_order == "asc"
-            else config.NULL_SORT_PLACEHOLDER["date_desc"]
-        )
-        sort_column_expression = func.coalesce(WatchlistItem.date_watched, placeholder)
-
-    final_sort_column = order_func(sort_column_expression)
-    return query.order_by(final_sort_column, desc(WatchlistItem.id))
-
-
-def _get_distinct_years():
-    """Fetches distinct years from watchlist items for filter dropdown."""
-    distinct_years_query = (
-        db.session.query(WatchlistItem.year)
-        .filter(WatchlistItem.year.isnot(None))
-        .distinct()
-        .order_by(desc(WatchlistItem.year))
+def _apply_sorting_to_query(query, sort_by, sort_order, search_matches=None):
+    """
+    Applies sorting logic to the SQLAlchemy query.
+    Ties are broken by id in the same direction, giving a total order.
+    """
+    sort_expression, descending = get_sort_expression(
+        sort_by, sort_order, search_matches
     )
-    return [y[0] for y in distinct_years_query.all()]
+    order_func = desc if descending else asc
+    return query.order_by(order_func(sort_expression), order_func(WatchlistItem.id))
 
 
-def get_watchlist_data(args):
-    """Helper function to query watchlist data based on request args."""
+def _parse_view_args(args):
+    """
+    Parses everything that decides what the watchlist view shows. The result
+    is plain, hashable data, so it doubles as the fragment cache key.
+    """
     search_term = args.get("search", "").strip()
+    searching = search.build_match_expression(search_term) is not None
     filters = _parse_filter_args(args)
-    sort_by, sort_order = _parse_sort_args(args)
+    sort_by, sort_order = _parse_sort_args(args, searching=searching)
     page, items_per_page = _get_pagination_params(args)
+    cursor = decode_cursor(args.get("cursor"), sort_by, sort_order)
+    return (
+        ("search", search_term),
+        ("status", filters["status"]),
+        ("type", filters["type"]),
+        ("years", tuple(filters["years"])),
+        ("rating_min", filters["rating_min"]),
+        ("rating_max", filters["rating_max"]),
+        ("sort", sort_by),
+        ("order", sort_order),
+        ("page", page),
+        ("per_page", items_per_page),
+        ("cursor", cursor),
+    )
 
-    query = WatchlistItem.query
-    query = _apply_filters_to_query(query, filters, search_term)
-    query = _apply_sorting_to_query(query, sort_by, sort_order)
 
+def _has_search_matches(search_term, search_matches):
+    """Whether anything matches the search term, whatever the filters."""
+    query = _apply_filters_to_query(
+        WatchlistItem.query, NO_FILTERS, search_term, search_matches
+    )
+    return query.with_entities(WatchlistItem.id).first() is not None
+
+
+def _paginate(query, view, search_matches):
+    """
+    Sorts and paginates query for the parsed view arguments. Returns the
+    pagination, the page number and the pagination mode used.
+    """
+    sort_by, sort_order = view["sort"], view["order"]
+    page, items_per_page = view["page"], view["per_page"]
+    # Keyset mode serves the first page and anything reached through a cursor;
+    # a bare ?page=N (e.g. the jump-to-page input) still uses OFFSET.
+    cursor = view["cursor"]
+    if config.PAGINATION_MODE == "keyset" and (cursor or page == 1):
+        sort_expression, descending = get_sort_expression(
+            sort_by, sort_order, search_matches
+        )
+        pagination = keyset_paginate(
+            query,
+            sort_expression,
+            descending,
+            sort_by,
+            sort_order,
+            items_per_page,
+            cursor,
+        )
+        return pagination, pagination.page, "keyset"
+    query = _apply_sorting_to_query(query, sort_by, sort_order, search_matches)
     pagination = query.paginate(page=page, per_page=items_per_page, error_out=False)
-    distinct_years = _get_distinct_years()
+    return pagination, page, "offset"
+
+
+def _query_watchlist(view_args):
+    """Queries watchlist data for the parsed view arguments."""
+    view = dict(view_args)
+    search_term = view["search"]
+    search_matches = search.match_subquery(search_term) if search_term else None
+    filters = {
+        "status": view["status"],
+        "type": view["type"],
+        "years": list(view["years"]),
+        "rating_min": view["rating_min"],
+        "rating_max": view["rating_max"],
+    }
+    sort_by, sort_order = view["sort"], view["order"]
+    items_per_page = view["per_page"]
+
+    base_query = WatchlistItem.query.options(load_only(*LIST_COLUMNS))
+    query = _apply_filters_to_query(base_query, filters, search_term, search_matches)
+    pagination, page, pagination_mode = _paginate(query, view, search_matches)
+
+    # Likely a typo: fall back to titles that look like the search term. Only
+    # asked when the page is empty, and without the filters, so a search whose
+    # matches are all filtered out is not taken for one.
+    fuzzy_results = False
+    if (
+        search_term
+        and not pagination.items
+        and not _has_search_matches(search_term, search_matches)
+    ):
+        fuzzy_matches = fuzzy.match_subquery(search_term)
+        if fuzzy_matches is not None:
+            fuzzy_results = True
+            search_matches = fuzzy_matches
+            query = _apply_filters_to_query(
+                base_query, filters, search_term, search_matches
+            )
+            pagination, page, pagination_mode = _paginate(query, view, search_matches)
+
+    # The rollup already holds the answer for the unfiltered watchlist
+    all_facets = get_facets()
+    if search_term or filters != NO_FILTERS:
+        searched = _apply_filters_to_query(
+            WatchlistItem.query, NO_FILTERS, search_term, search_matches
+        )
+        facet_counts = count_facets(searched, filters)
+    else:
+        facet_counts = all_facets
 
     return {
         "items": pagination.items,
         "pagination": pagination,
+        "pagination_mode": pagination_mode,
         "current_page": page,
         "items_per_page": items_per_page,
         "current_sort": sort_by,
@@ -176,25 +285,59 @@ def get_watchlist_data(args):
         "current_filter_rating_min": filters["rating_min"],
         "current_filter_rating_max": filters["rating_max"],
         "current_search": search_term,
-        "distinct_years": distinct_years,
+        "fuzzy_results": fuzzy_results,
+        # Every year stays listed, so a selected one can always be unticked
+        "distinct_years": list(all_facets["year"]),
+        "facet_counts": facet_counts,
     }
 
 
+def get_watchlist_data(args):
+    """Helper function to query watchlist data based on request args."""
+    return _query_watchlist(_parse_view_args(args))
+
+
 @main_bp.route("/load_watchlist")
 def load_watchlist():
     """HTMX route OR full page reload handler for the watchlist."""
-    context = get_watchlist_data(request.args)
-    if request.headers.get("HX-Request"):
+    if not request.headers.get("HX-Request"):
+        return render_template("index.html", **get_watchlist_data(request.args))
+
+    view_args = _parse_view_args(request.args)
+    cache = get_fragment_cache()
+    theme = get_validated_theme(session)
+    # Answered before any query or rendering when the browser's copy is current
+    etag = make_etag(cache.data_version(), theme, view_args)
+    response = not_modified(etag)
+    if response is not None:
+        return response
+
+    cache_key = (cache.generation, theme, view_args)
+    fragment = cache.get(cache_key)
+    if fragment is None:
+        context = _query_watchlist(view_args)
         watchlist_html = render_template("_watchlist_items.html", **context)
         controls_html = render_template("_controls_bar_oob.html", **context)
-        return watchlist_html + controls_html
-    else:
-        return render_template("index.html", **context)
+        fragment = watchlist_html + controls_html
+        cache.put(cache_key, fragment)
+    return with_etag(make_response(fragment), etag)
+
+
+@main_bp.route("/search/suggest")
+def search_suggest():
+    """HTMX route returning title suggestions for the search box."""
+    suggestions = get_title_index().suggest(
+        request.args.get("search", ""), config.SEARCH_SUGGESTION_LIMIT
+    )
+    return render_template("_search_suggestions.html", suggestions=suggestions)
 
 
 @main_bp.route("/")
 def index():
-    """Renders the main page structure. Initial data loaded via HTMX."""
+    """
+    Renders the main page with the first page of the watchlist inline,
+    so a cold page view runs the list query once.
+    """
     context = get_watchlist_data(request.args)
     return render_template("index.html", **context)
 
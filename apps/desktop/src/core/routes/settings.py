@@ -8,28 +8,71 @@ from flask import (
     current_app,
     url_for,
     redirect,
-    send_file,
     flash,
+    Response,
+    stream_with_context,
+    abort,
+    send_file,
+)
+from .. import config, db, schema
+from ..backup import (
+    EXPORT_FORMATS,
+    IMPORT_EXTENSIONS,
+    IMPORT_BATCH_SIZE,
+    InvalidBackupError,
+    backup_format,
+    export_filename,
+    export_record,
+    iter_backup_records,
+    iter_export,
+    iter_export_rows,
+)
+from ..database import BUSY_MESSAGE, is_busy
+from ..delta import (
+    ExportTokenError,
+    ExportTokenExpired,
+    decode_token,
+    delta_record,
+    encode_token,
+    high_water_mark,
+    iter_delta_rows,
+    mark_at,
+    prune_tombstones,
 )
-from .. import config, db
+from ..importing import ImportReport, iter_processed_batches
+from ..merge import ImportMerger
+from ..jobs import JobError, get_job_runner, job_file, rows_per_second
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
-from ..models import WatchlistItem
-import json
-from datetime import datetime, date, timezone
-import io
+from ..models import Job, WatchlistItem
+from ..snapshot import (
+    SNAPSHOT_EXTENSIONS,
+    InvalidSnapshotError,
+    create_snapshot,
+    database_path,
+    restore_snapshot,
+)
+import itertools
+import os
+import re
+import time
+import uuid
+from datetime import datetime
 
 settings_bp = Blueprint("settings", __name__, url_prefix="/settings")
 
-ALLOWED_EXTENSIONS = {"json"}
+ALLOWED_EXTENSIONS = set(IMPORT_EXTENSIONS)
+
+IMPORT_REPORT_SUFFIX = "-import-report.txt"
+
+# Import reports are named by a job id or another uuid4 hex
+_REPORT_ID = re.compile(r"[0-9a-f]{32}")
 
 
 # --- Helper Functions ---
 def allowed_file(filename):
-    return (
-        "." in filename
-        and filename.rsplit(".", 1)[0] != ""
-        and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
-    )
+    """Accepts the ALLOWED_EXTENSIONS, plain or gzipped (e.g. "backup.csv.gz")."""
+    return backup_format(filename) is not None
 
 
 def _validate_uploaded_file(request_files):
@@ -42,104 +85,150 @@ def _validate_uploaded_file(request_files):
         flash("No file selected for uploading.", "warning")
         return None
     if not file or not allowed_file(file.filename):
-        flash("Invalid file type. Please upload a .json file.", "error")
+        flash(
+            "Invalid file type. Please upload a .json, .ndjson or .csv file, "
+            "optionally gzipped (.gz).",
+            "error",
+        )
         return None
     return file
 
 
-def _parse_imported_rating(raw_rating, item_title_for_log):
-    """Parses and validates rating from imported item."""
-    if raw_rating is None:
-        return None
-    try:
-        item_rating_int = int(raw_rating)
-        if 1 <= item_rating_int <= 10:
-            return item_rating_int
-        else:
-            current_app.logger.warning(
-                f"Rating {raw_rating} out of range for item '{item_title_for_log}'. Setting to None."
-            )
-            return None
-    except ValueError:
-        current_app.logger.warning(
-            f"Invalid rating format '{raw_rating}' for item '{item_title_for_log}'. Setting to None."
+def _import_backup(stream, filename, on_batch=None, merge=False):
+    """
+    Imports a backup file's records, replacing all items or, with merge=True,
+    merging into them, and commits. Returns the counts per outcome and the
+    ImportReport as "report". on_batch(n) is called after each batch.
+    """
+    # Replacing rewrites everything, so the search, trigram and facet tables
+    # are rebuilt once at the end rather than row by row through triggers
+    suspended = not merge
+    if not merge:
+        schema.suspend_derived_triggers(db.session.connection())
+        db.session.query(WatchlistItem).delete()  # CRITICAL: Delete existing items
+    merger = ImportMerger()
+    report = ImportReport()
+
+    # The upload is parsed as it is read and written in fixed-size batches,
+    # so neither the file nor the items are ever held in memory at once.
+    # Validation of large uploads is spread over IMPORT_WORKERS processes;
+    # the batches come back in order and are written here, one at a time.
+    records = iter_backup_records(stream, filename)
+    workers = current_app.config["IMPORT_WORKERS"]
+    for rows, batch_report in iter_processed_batches(records, workers):
+        report.update(batch_report)
+        if not merge:  # After the delete-all, tombstones have nothing to delete
+            rows = [row for row in rows if "deleted" not in row]
+        if rows and merge:
+            merger.merge(rows)
+            # Once a batch's worth has changed, a rebuild beats the triggers
+            changed = merger.inserted + merger.updated + merger.deleted
+            if not suspended and changed >= IMPORT_BATCH_SIZE:
+                schema.suspend_derived_triggers(db.session.connection())
+                suspended = True
+        elif rows:  # Only insert if there are rows, executemany needs some
+            db.session.execute(insert(WatchlistItem.__table__), rows)
+            merger.inserted += len(rows)
+        if on_batch:
+            on_batch(batch_report.records)
+    if suspended:
+        schema.resume_derived_triggers(db.session.connection())
+    db.session.commit()
+    if report.has_problems:  # Logged once, however many records had problems
+        current_app.logger.warning(f"Import had problems:\n{report.summary()}")
+    return {
+        "inserted": merger.inserted,
+        "updated": merger.updated,
+        "unchanged": merger.unchanged,
+        "deleted": merger.deleted,
+        "skipped": report.skipped,
+        "report": report,
+    }
+
+
+def _import_summary(counts, merge=False):
+    if merge:
+        message = (
+            f"{counts['inserted']} items added, {counts['updated']} updated "
+            f"and {counts['unchanged']} unchanged."
         )
-        return None
-
-
-def _parse_imported_year(raw_year, item_title_for_log):
-    """Parses and validates year from imported item."""
-    if raw_year is None:
-        return None
-    try:
-        item_year_int = int(raw_year)
-        if 1800 <= item_year_int <= 2050:
-            return item_year_int
-        else:
-            current_app.logger.warning(
-                f"Year {raw_year} out of range for item '{item_title_for_log}'. Setting to None."
-            )
-            return None
-    except ValueError:
-        current_app.logger.warning(
-            f"Invalid year format '{raw_year}' for item '{item_title_for_log}'. Setting to None."
+        if counts["deleted"] > 0:
+            message += f" {counts['deleted']} items were deleted."
+    else:
+        message = f"{counts['inserted']} items imported successfully."
+    if counts["skipped"] > 0:
+        message += (
+            f" {counts['skipped']} items were skipped due to missing/invalid data."
         )
-        return None
+    return message
 
 
-def _process_imported_item(raw_item: dict, items_skipped_list: list):
+def _save_import_report(report, report_id):
     """
-    Processes a single raw item from the imported JSON data.
-    Returns a WatchlistItem instance or None if skipped.
-    Modifies items_skipped_list by reference if an item is skipped.
+    Writes the report of an import with problems to a file for download as
+    report_id, returning its path. Imports without problems get no report.
     """
-    item_title_for_log = raw_item.get("title", "N/A")
+    if not report.has_problems:
+        return None
+    path = job_file(report_id, IMPORT_REPORT_SUFFIX)
+    path.write_text(report.summary() + "\n", encoding="utf-8")
+    return path
 
-    if not raw_item.get("title") or not raw_item.get("type"):
-        items_skipped_list[0] += 1
-        current_app.logger.warning(
-            f"Skipping item due to missing title or type: {item_title_for_log}"
-        )
+
+def _import_report_path(report_id):
+    """Path of the saved import report report_id, or None if there is none."""
+    if not report_id or not _REPORT_ID.fullmatch(report_id):
         return None
+    path = job_file(report_id, IMPORT_REPORT_SUFFIX)
+    return path if path.exists() else None
 
-    item_rating = _parse_imported_rating(raw_item.get("rating"), item_title_for_log)
-    item_year = _parse_imported_year(raw_item.get("year"), item_title_for_log)
-
-    new_item = WatchlistItem(
-        title=raw_item.get("title"),
-        type=raw_item.get("type"),
-        year=item_year,
-        tmdb_id=raw_item.get("tmdb_id"),
-        imdb_id=raw_item.get("imdb_id"),
-        boxd_id=raw_item.get("boxd_id"),
-        overview=raw_item.get("overview"),
-        poster_url=raw_item.get("poster_url"),
-        status=raw_item.get("status", "Watched"),  # Default to Watched
-        rating=item_rating,
-        notes=raw_item.get("notes"),
-    )
 
-    # Date Added
-    raw_date_added = raw_item.get("date_added")
-    if raw_date_added:
-        try:
-            new_item.date_added = datetime.fromisoformat(raw_date_added)
-        except ValueError:
-            new_item.date_added = datetime.now(timezone.utc)
-    else:
-        new_item.date_added = datetime.now(timezone.utc)
-
-    # Date Watched
-    raw_date_watched = raw_item.get("date_watched")
-    if raw_date_watched:
-        try:
-            new_item.date_watched = date.fromisoformat(raw_date_watched)
-        except ValueError:
-            new_item.date_watched = None  # Explicitly set to None on error
-    else:
-        new_item.date_watched = None
+def _run_export_job(progress, export_format, compress):
+    """Job function writing the export to a file for later download."""
+
+    def counted(batches):
+        for batch in batches:
+            yield batch
+            progress.add(len(batch))
+
+    path = job_file(progress.job_id, export_filename("", export_format, compress))
+    with open(path, "wb") as f:
+        for chunk in iter_export(export_format, counted(iter_export_rows()), compress):
+            f.write(chunk)
+    return f"{progress.rows_processed} items exported.", str(path)
 
-    return new_item
+
+def _run_import_job(progress, upload_path, merge):
+    """Job function importing a saved upload, which it deletes afterwards."""
+    try:
+        with open(upload_path, "rb") as f:
+            counts = _import_backup(f, upload_path, progress.add, merge)
+    except InvalidBackupError as e:
+        raise JobError(str(e)) from e
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Database error during import: {e}", exc_info=True)
+        if is_busy(e):
+            raise JobError(BUSY_MESSAGE) from e
+        raise JobError("Database error during import. Data rolled back.") from e
+    finally:
+        os.remove(upload_path)
+    report_path = _save_import_report(counts["report"], progress.job_id)
+    return _import_summary(counts, merge), report_path and str(report_path)
+
+
+def _render_job_status(job):
+    progress = get_job_runner().progress(job.id)
+    if progress is not None:  # Live numbers, the row is only written at the end
+        rows, rate = progress.rows_processed, progress.rows_per_second()
+    else:
+        rows, rate = job.rows_processed, rows_per_second(job)
+    return render_template(
+        "_job_status.html",
+        job=job,
+        running=progress is not None or not job.is_finished,
+        rows_processed=rows,
+        rows_per_second=rate,
+    )
 
 
 # --- Routes ---
@@ -151,8 +240,15 @@ def show_settings():
     current_pagination_size = session.get(
         "pagination_size", config.DEFAULT_ITEMS_PER_PAGE
     )
+    # Set after starting a job, so its progress is shown on the page
+    job_id = request.args.get("job")
+    job = db.session.get(Job, job_id) if job_id else None
+    # Set after an import with problems, so its report can be downloaded
+    report_id = request.args.get("report")
     return render_template(
         "settings.html",
+        job_status=_render_job_status(job) if job else None,
+        import_report_id=report_id if _import_report_path(report_id) else None,
         valid_themes=config.VALID_THEMES,
         valid_pagination_sizes=config.VALID_PAGINATION_SIZES,
         current_pagination_size=current_pagination_size,
@@ -201,98 +297,276 @@ def set_pagination_size():
         return resp
 
 
-@settings_bp.route("/export_data", methods=["GET"])
-def export_data_json():
-    """Exports all watchlist items as a JSON file."""
+def _export_response(export_format, compress, since=None):
+    """
+    Streams all items, or the changes after the delta mark since, with the
+    token for the next delta export in the X-Export-Token header.
+    """
     try:
-        items = WatchlistItem.query.all()
-        data_to_export = []
-        for item in items:
-            item_dict = {
-                "title": item.title,
-                "type": item.type,
-                "year": item.year,
-                "tmdb_id": item.tmdb_id,
-                "imdb_id": item.imdb_id,
-                "boxd_id": item.boxd_id,
-                "overview": item.overview,
-                "poster_url": item.poster_url,
-                "status": item.status,
-                "rating": item.rating,
-                "notes": item.notes,
-                "date_added": item.date_added.isoformat() if item.date_added else None,
-                "date_watched": (
-                    item.date_watched.isoformat() if item.date_watched else None
-                ),
-            }
-            data_to_export.append(item_dict)
-
-        json_data = json.dumps(data_to_export, indent=2)
-
-        # Create a string IO buffer
-        str_io = io.StringIO()
-        str_io.write(json_data)
-        str_io.seek(0)
-
-        # Create a BytesIO buffer for send_file
-        bytes_io = io.BytesIO(str_io.read().encode("utf-8"))
-        bytes_io.seek(0)
+        # Start the query here, so database errors can still redirect
+        until = high_water_mark()
+        if since is None:
+            batches = iter_export_rows()
+            to_record = export_record
+            stem = "seriesscape_backup"
+        else:
+            prune_tombstones()
+            batches = iter_delta_rows(since, until)
+            to_record = delta_record
+            stem = "seriesscape_delta"
+        first_batch = next(batches, [])
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"seriesscape_backup_{timestamp}.json"
-
-        return send_file(
-            bytes_io,
-            mimetype="application/json",
-            as_attachment=True,
-            download_name=filename,
+        filename = export_filename(f"{stem}_{timestamp}", export_format, compress)
+
+        return Response(
+            stream_with_context(
+                iter_export(
+                    export_format,
+                    itertools.chain([first_batch], batches),
+                    compress,
+                    to_record,
+                )
+            ),
+            mimetype=_export_mimetype(export_format, compress),
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "X-Export-Token": encode_token(until),
+            },
         )
 
     except Exception as e:
         current_app.logger.error(f"Error during data export: {e}", exc_info=True)
-        flash("Error exporting data. Please check logs.", "error")
+        if is_busy(e):
+            flash(BUSY_MESSAGE, "error")
+        else:
+            flash("Error exporting data. Please check logs.", "error")
         return redirect(url_for("settings.show_settings"))
 
 
-@settings_bp.route("/import_data", methods=["POST"])
-def import_data_json():
-    """Imports watchlist items from an uploaded JSON file, replacing existing data."""
-    file = _validate_uploaded_file(request.files)
-    if not file:
-        return redirect(url_for("settings.show_settings"))
+def _export_mimetype(export_format, compress):
+    return "application/gzip" if compress else EXPORT_FORMATS[export_format][1]
 
-    try:
-        json_data = file.read().decode("utf-8")
-        imported_items_raw = json.loads(json_data)
 
-        db.session.query(WatchlistItem).delete()  # CRITICAL: Delete existing items
+def _parse_export_format(value):
+    """Parses an export format name such as "csv" or "ndjson.gz", or None."""
+    parsed = backup_format(f"export.{value}")
+    if parsed is None or parsed[0] not in EXPORT_FORMATS:
+        return None
+    return parsed
+
+
+@settings_bp.route("/export_data", methods=["GET"])
+def export_data_json():
+    """Streams all watchlist items as a JSON file."""
+    return _export_response("json", False)
 
-        new_items_to_add = []
-        items_skipped_list = [0]
 
-        for raw_item in imported_items_raw:
-            processed_item = _process_imported_item(raw_item, items_skipped_list)
-            if processed_item:
-                new_items_to_add.append(processed_item)
+@settings_bp.route("/export_data/<export_format>", methods=["GET"])
+def export_data(export_format):
+    """Streams all watchlist items as JSON, NDJSON or CSV, optionally gzipped."""
+    parsed = _parse_export_format(export_format)
+    if parsed is None:
+        abort(404)
+    return _export_response(*parsed)
+
+
+@settings_bp.route("/export_delta/<export_format>", methods=["GET"])
+def export_delta(export_format):
+    """
+    Streams the changes since the export that returned ?token=, or since the
+    ISO 8601 ?since= timestamp, which must have a timezone (400 otherwise).
+    JSON and NDJSON only, CSV has no tombstones.
+    """
+    parsed = _parse_export_format(export_format)
+    if parsed is None or parsed[0] == "csv":
+        abort(404)
+    try:
+        if request.args.get("token"):
+            since = decode_token(request.args["token"])
+        elif request.args.get("since"):
+            since = mark_at(datetime.fromisoformat(request.args["since"]))
+        else:
+            abort(400, description="Pass a token or since argument.")
+    except ExportTokenExpired as e:
+        abort(410, description=str(e))
+    except ExportTokenError as e:
+        abort(400, description=str(e))
+    except ValueError:
+        abort(400, description="Invalid since timestamp, expected ISO 8601.")
+    return _export_response(*parsed, since=since)
 
-        if new_items_to_add:  # Only add if there are items, to avoid empty add_all call
-            db.session.add_all(new_items_to_add)
-        db.session.commit()
 
-        success_msg = f"{len(new_items_to_add)} items imported successfully."
-        if items_skipped_list[0] > 0:
-            success_msg += f" {items_skipped_list[0]} items were skipped due to missing/invalid data."
-        flash(success_msg, "success")
+@settings_bp.route("/import_data", methods=["POST"])
+def import_data_json():
+    """
+    Imports watchlist items from an uploaded JSON file, replacing existing data,
+    or merging into it when the form's mode is "merge".
+    """
+    file = _validate_uploaded_file(request.files)
+    if not file:
+        return redirect(url_for("settings.show_settings"))
 
-    except json.JSONDecodeError:
-        flash("Invalid JSON file. Please upload a valid backup.", "error")
+    try:
+        started = time.perf_counter()
+        merge = request.form.get("mode") == "merge"
+        counts = _import_backup(file.stream, file.filename, merge=merge)
+
+        elapsed = time.perf_counter() - started
+        written = counts["inserted"] + counts["updated"]
+        current_app.logger.info(
+            f"Imported {written} items in {elapsed:.2f}s "
+            f"({written / elapsed if elapsed else 0:,.0f} rows/s)."
+        )
+        flash(_import_summary(counts, merge), "success")
+        report_id = uuid.uuid4().hex
+        if _save_import_report(counts["report"], report_id):
+            return redirect(url_for("settings.show_settings", report=report_id))
+
+    except InvalidBackupError as e:
+        db.session.rollback()  # The file may break after some batches went in
+        flash(str(e), "error")
     except SQLAlchemyError as e:
         db.session.rollback()
         current_app.logger.error(f"Database error during import: {e}", exc_info=True)
-        flash("Database error during import. Data rolled back.", "error")
+        if is_busy(e):
+            flash(BUSY_MESSAGE, "error")
+        else:
+            flash("Database error during import. Data rolled back.", "error")
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error during data import: {e}", exc_info=True)
         flash(f"An unexpected error occurred during import: {str(e)}", "error")
 
     return redirect(url_for("settings.show_settings"))
+
+
+@settings_bp.route("/jobs/export", methods=["POST"])
+def start_export_job():
+    """Starts exporting the watchlist in the background."""
+    parsed = _parse_export_format(request.form.get("format", "json"))
+    if parsed is None:
+        flash("Invalid export format.", "error")
+        return redirect(url_for("settings.show_settings"))
+    job_id = get_job_runner().submit("export", _run_export_job, *parsed)
+    return redirect(url_for("settings.show_settings", job=job_id))
+
+
+@settings_bp.route("/jobs/import", methods=["POST"])
+def start_import_job():
+    """Saves an uploaded backup and starts importing it in the background."""
+    file = _validate_uploaded_file(request.files)
+    if not file:
+        return redirect(url_for("settings.show_settings"))
+
+    # Named by its format, which the job reads it as
+    upload_path = job_file(
+        uuid.uuid4().hex, export_filename("", *backup_format(file.filename))
+    )
+    file.save(upload_path)
+    merge = request.form.get("mode") == "merge"
+    job_id = get_job_runner().submit("import", _run_import_job, str(upload_path), merge)
+    return redirect(url_for("settings.show_settings", job=job_id))
+
+
+@settings_bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """Job progress partial, polled by HTMX until the job has finished."""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        abort(404)
+    return _render_job_status(job)
+
+
+@settings_bp.route("/jobs/<job_id>/download", methods=["GET"])
+def download_job_artifact(job_id):
+    """Serves the file produced by a finished export job."""
+    job = db.session.get(Job, job_id)
+    if (
+        job is None
+        or job.kind != "export"
+        or job.status != "succeeded"
+        or not job.artifact_path
+        or not os.path.exists(job.artifact_path)
+    ):
+        abort(404)
+    export_format, compress = backup_format(job.artifact_path)
+    timestamp = job.finished_at.strftime("%Y%m%d_%H%M%S")
+    return send_file(
+        job.artifact_path,
+        mimetype=_export_mimetype(export_format, compress),
+        as_attachment=True,
+        download_name=export_filename(
+            f"seriesscape_backup_{timestamp}", export_format, compress
+        ),
+    )
+
+
+@settings_bp.route("/import_reports/<report_id>", methods=["GET"])
+def download_import_report(report_id):
+    """Serves the report of the problems found by an import."""
+    path = _import_report_path(report_id)
+    if path is None:
+        abort(404)
+    return send_file(
+        path,
+        mimetype="text/plain",
+        as_attachment=True,
+        download_name=f"seriesscape_import_report_{report_id[:8]}.txt",
+    )
+
+
+@settings_bp.route("/snapshot", methods=["GET"])
+def download_snapshot():
+    """Serves a binary snapshot of the whole database file."""
+    path = database_path().with_name(f".download-{uuid.uuid4().hex}.db")
+    try:
+        create_snapshot(path)
+    except Exception as e:
+        current_app.logger.error(f"Error creating snapshot: {e}", exc_info=True)
+        flash("Error creating database snapshot. Please check logs.", "error")
+        return redirect(url_for("settings.show_settings"))
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    response = send_file(
+        path,
+        mimetype="application/vnd.sqlite3",
+        as_attachment=True,
+        download_name=f"seriesscape_snapshot_{timestamp}.db",
+    )
+    # A passthrough body is handed to the server as is, and the callbacks
+    # below would never run. Without it, closing the response closes the
+    # file first, so it can also be removed on Windows.
+    response.direct_passthrough = False
+    response.call_on_close(lambda: os.remove(path))
+    return response
+
+
+@settings_bp.route("/snapshot/restore", methods=["POST"])
+def restore_snapshot_upload():
+    """Replaces the database with an uploaded snapshot, after validating it."""
+    file = request.files.get("snapshot_file")
+    if not file or file.filename == "":
+        flash("No snapshot file selected for uploading.", "warning")
+        return redirect(url_for("settings.show_settings"))
+    if file.filename.rsplit(".", 1)[-1].lower() not in SNAPSHOT_EXTENSIONS:
+        flash("Invalid file type. Please upload a .db snapshot.", "error")
+        return redirect(url_for("settings.show_settings"))
+
+    path = database_path().with_name(f".restore-{uuid.uuid4().hex}.db")
+    try:
+        file.save(path)
+        restore_snapshot(path)
+        flash("Database restored from snapshot.", "success")
+    except InvalidSnapshotError as e:
+        flash(f"Snapshot not restored: {e}", "error")
+    except Exception as e:
+        current_app.logger.error(f"Error restoring snapshot: {e}", exc_info=True)
+        if is_busy(e):
+            flash(BUSY_MESSAGE, "error")
+        else:
+            flash("Error restoring snapshot. Please check logs.", "error")
+    finally:
+        if path.exists():
+            os.remove(path)
+    return redirect(url_for("settings.show_settings"))
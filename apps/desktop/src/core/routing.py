@@ -0,0 +1,84 @@
+# apps/desktop/src/core/routing.py
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from .database import is_memory_database
+
+# Bind key of the read-only engine, a second pool on the same database file
+READ_BIND = "read"
+
+# Set in Session.info once a transaction has written
+_WROTE_FLAG = "routing_wrote"
+
+
+def configure(app):
+    """
+    Splits the database engine in two before db.init_app(app), after
+    database.configure(app): the default engine becomes a single, serialized
+    writer connection, and a READ_BIND engine with the same options and
+    READ_POOL_SIZE connections serves reads. SQLite in WAL mode
+    lets those readers go on while the writer is busy. In-memory databases,
+    other backends and READ_POOL_SIZE = 0 keep the single default engine.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    if (
+        make_url(uri).get_backend_name() != "sqlite"
+        or is_memory_database(uri)
+        or app.config["READ_POOL_SIZE"] < 1
+    ):
+        return
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **options,
+        "pool_size": 1,
+        "max_overflow": 0,
+    }
+    app.config["SQLALCHEMY_BINDS"] = {
+        **(app.config.get("SQLALCHEMY_BINDS") or {}),
+        READ_BIND: {**options, "url": uri, "pool_size": app.config["READ_POOL_SIZE"]},
+    }
+
+
+def read_engine(db):
+    """The engine reads are routed to, the default engine if there is none."""
+    return db.engines.get(READ_BIND, db.engine)
+
+
+def _query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only = ON")
+    finally:
+        cursor.close()
+
+
+def init_app(app, db):
+    """Makes every connection of the read engine refuse to write."""
+    if READ_BIND in db.engines:
+        event.listen(db.engines[READ_BIND], "connect", _query_only)
+
+
+class RoutingSession(Session):
+    """
+    Sends SELECTs to the read engine until the session writes in the current
+    transaction. Writes, statements it cannot tell are reads (such as text()),
+    and everything after them until the transaction ends go to the writer, so
+    a transaction always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        engines = self._db.engines
+        if bind is not None or READ_BIND not in engines or engine is not engines[None]:
+            return engine
+        if self._flushing or not getattr(clause, "is_select", False):
+            self.info[_WROTE_FLAG] = True
+        if self.info.get(_WROTE_FLAG):
+            return engine
+        return engines[READ_BIND]
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _end_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WROTE_FLAG, None)
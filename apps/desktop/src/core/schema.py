@@ -0,0 +1,137 @@
+# apps/desktop/src/core/schema.py
+from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from . import db, delta, facets, fuzzy, merge, search, sorting
+from .models import WatchlistItem
+
+# Schema objects that cannot be expressed through the models (FTS5 virtual
+# tables, trigger-maintained rollups and trigram indexes, expression indexes)
+# and are therefore managed with raw SQLite DDL. Each entry pairs a module's
+# SCHEMA_OBJECTS, (object type, name, CREATE statement) tuples, and its
+# DROP_STATEMENTS with a callable that repopulates the objects from
+# watchlist_items when they are (re)created on an existing database, or None
+# if there is nothing to fill.
+AUXILIARY_SCHEMA = [
+    (search.SCHEMA_OBJECTS, search.DROP_STATEMENTS, search.rebuild_search_index),
+    (fuzzy.SCHEMA_OBJECTS, fuzzy.DROP_STATEMENTS, fuzzy.rebuild_trigrams),
+    (facets.SCHEMA_OBJECTS, facets.DROP_STATEMENTS, facets.rebuild_facets),
+    (sorting.SCHEMA_OBJECTS, sorting.DROP_STATEMENTS, None),
+    (merge.SCHEMA_OBJECTS, merge.DROP_STATEMENTS, None),
+    (delta.SCHEMA_OBJECTS, delta.DROP_STATEMENTS, None),
+]
+
+# Tables Alembic autogenerate must leave alone (including FTS5 shadow tables).
+_MANAGED_TABLE_PREFIXES = tuple(
+    name
+    for objects, _, _ in AUXILIARY_SCHEMA
+    for object_type, name, _ in objects
+    if object_type == "table"
+)
+_MANAGED_INDEXES = {
+    name
+    for objects, _, _ in AUXILIARY_SCHEMA
+    for object_type, name, _ in objects
+    if object_type == "index"
+}
+
+
+def include_name(name, type_, parent_names):
+    """Alembic hook that hides the auxiliary tables and indexes from autogenerate."""
+    if name is None:
+        return True
+    if type_ == "table":
+        return not name.startswith(_MANAGED_TABLE_PREFIXES)
+    if type_ == "index":
+        return name not in _MANAGED_INDEXES
+    return True
+
+
+def _existing_objects(connection):
+    rows = connection.execute(
+        text(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE type IN ('table', 'view', 'trigger', 'index')"
+        )
+    )
+    return {(row.type, row.name) for row in rows}
+
+
+def install_auxiliary_schema(connection):
+    """Creates any missing auxiliary schema objects."""
+    for objects, _, _ in AUXILIARY_SCHEMA:
+        for _, _, create_sql in objects:
+            connection.execute(text(create_sql))
+
+
+def ensure_auxiliary_schema():
+    """
+    Brings an existing database up to date with the auxiliary schema.
+    Objects that are missing (a database created before they existed, or a
+    batch migration that recreated watchlist_items and dropped its triggers
+    and indexes)
+    are created and rebuilt from the current rows.
+    """
+    try:
+        with db.engine.begin() as connection:
+            existing = _existing_objects(connection)
+            if ("table", WatchlistItem.__tablename__) not in existing:
+                return  # Fresh database, migrations have not run yet
+            for objects, _, populate_func in AUXILIARY_SCHEMA:
+                if all((o_type, name) in existing for o_type, name, _ in objects):
+                    continue
+                current_app.logger.info("Installing auxiliary database schema.")
+                for _, _, create_sql in objects:
+                    connection.execute(text(create_sql))
+                if populate_func is not None:
+                    populate_func(connection)
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Could not install auxiliary schema: {e}")
+
+
+def _rebuildable_triggers():
+    for objects, _, populate_func in AUXILIARY_SCHEMA:
+        if populate_func is not None:
+            for object_type, name, create_sql in objects:
+                if object_type == "trigger":
+                    yield name, create_sql
+
+
+def suspend_derived_triggers(connection):
+    """
+    Drops the triggers keeping the search index, trigram index and facet
+    counts in step with watchlist_items, and the sort indexes, ahead of a bulk
+    write. Must be followed by resume_derived_triggers() in the same
+    transaction.
+    """
+    # The sqlite3 driver only begins a transaction before DML, and would
+    # commit the DROPs at once if nothing had been written yet
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+    for name, _ in _rebuildable_triggers():
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    for _, name, _ in sorting.SCHEMA_OBJECTS:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def resume_derived_triggers(connection):
+    """Recreates the suspended triggers and indexes, rebuilding each once."""
+    for _, create_sql in _rebuildable_triggers():
+        connection.execute(text(create_sql))
+    for _, _, create_sql in sorting.SCHEMA_OBJECTS:
+        connection.execute(text(create_sql))
+    for _, _, populate_func in AUXILIARY_SCHEMA:
+        if populate_func is not None:
+            populate_func(connection)
+
+
+@event.listens_for(WatchlistItem.__table__, "after_create")
+def _create_auxiliary_schema(target, connection, **kw):
+    install_auxiliary_schema(connection)
+
+
+@event.listens_for(WatchlistItem.__table__, "before_drop")
+def _drop_auxiliary_schema(target, connection, **kw):
+    for _, drop_statements, _ in AUXILIARY_SCHEMA:
+        for drop_sql in drop_statements:
+            connection.execute(text(drop_sql))
@@ -0,0 +1,100 @@
+# apps/desktop/src/core/schema_version.py
+import re
+from pathlib import Path
+import click
+from flask import current_app
+from flask.cli import ScriptInfo
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from . import db, jobs, schema
+
+# "revision = 'abc'" and "down_revision: Union[str, None] = 'abc'", as
+# written by Alembic's script templates, old and new
+_REVISION = re.compile(r"^revision\b[^=\n]*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\b[^=\n]*=(.*)$", re.MULTILINE)
+_QUOTED = re.compile(r"['\"]([^'\"]+)['\"]")
+
+
+def init_migrate(app):
+    """
+    Sets up Flask-Migrate on app, and with it Alembic, then returns its config
+    (app.extensions["migrate"]). Left out of create_app, as only the "flask db"
+    commands and upgrades need it and importing Alembic slows every start.
+    """
+    if "migrate" not in app.extensions:
+        from flask_migrate import Migrate
+
+        Migrate().init_app(
+            app,
+            db,
+            directory=app.config["MIGRATIONS_DIR"],
+            include_name=schema.include_name,
+        )
+    return app.extensions["migrate"]
+
+
+class LazyMigrateGroup(click.Group):
+    """
+    Stands in for Flask-Migrate's "flask db" group in the command list, and
+    loads it with init_migrate only once "flask db" is run, handing it the
+    arguments.
+    """
+
+    def __init__(self):
+        super().__init__("db", help="Perform database migrations.")
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        init_migrate(parent.ensure_object(ScriptInfo).load_app())
+        from flask_migrate.cli import db as db_cli_group
+
+        return db_cli_group.make_context(info_name, args, parent=parent, **extra)
+
+
+def stored_revisions():
+    """The revisions recorded in the database's alembic_version table."""
+    try:
+        rows = db.session.execute(text("SELECT version_num FROM alembic_version"))
+        revisions = set(rows.scalars())
+    except OperationalError:  # No such table, the database was never migrated
+        revisions = set()
+    db.session.rollback()
+    return revisions
+
+
+def head_revisions(migrations_dir):
+    """
+    The head revisions of the migration scripts in migrations_dir, read from
+    the scripts' text without importing Alembic or the scripts themselves.
+    Returns None when a script cannot be read this way.
+    """
+    revisions = set()
+    down_revisions = set()
+    for script in sorted(Path(migrations_dir, "versions").glob("*.py")):
+        source = script.read_text(encoding="utf-8")
+        revision = _REVISION.search(source)
+        down_revision = _DOWN_REVISION.search(source)
+        if revision is None or down_revision is None:
+            return None
+        revisions.add(revision.group(1))
+        down_revisions.update(_QUOTED.findall(down_revision.group(1)))
+    return revisions - down_revisions
+
+
+def upgrade_if_needed():
+    """
+    Runs the migrations if the database is not at the head revision, and
+    returns whether it did. Otherwise costs one SELECT and reading the
+    scripts' text. Must run inside an application context.
+    """
+    directory = current_app.config["MIGRATIONS_DIR"]
+    if stored_revisions() == head_revisions(directory):
+        return False
+
+    init_migrate(current_app._get_current_object())  # Only when there is work
+    from flask_migrate import upgrade
+
+    upgrade(directory=directory)
+    # Migrations create tables without the DDL events that add these
+    schema.ensure_auxiliary_schema()
+    jobs.recover_interrupted_jobs()
+    return True
@@ -0,0 +1,118 @@
+# apps/desktop/src/core/search.py
+import re
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, literal_column, select, table, text
+from . import db, fuzzy
+
+FTS_TABLE = "watchlist_items_fts"
+
+# Column weights passed to bm25(): a hit in the title outranks one in the
+# overview, which in turn outranks one in the notes.
+BM25_WEIGHTS = (10.0, 2.0, 1.0)
+
+# External-content FTS5 index over watchlist_items, kept in sync by triggers.
+SCHEMA_OBJECTS = [
+    (
+        "table",
+        FTS_TABLE,
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            title, overview, notes,
+            content='watchlist_items',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+    ),
+    (
+        "trigger",
+        f"{FTS_TABLE}_ai",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+        AFTER INSERT ON watchlist_items BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, overview, notes)
+            VALUES (new.id, new.title, new.overview, new.notes);
+        END
+        """,
+    ),
+    (
+        "trigger",
+        f"{FTS_TABLE}_ad",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+        AFTER DELETE ON watchlist_items BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, overview, notes)
+            VALUES ('delete', old.id, old.title, old.overview, old.notes);
+        END
+        """,
+    ),
+    (
+        "trigger",
+        f"{FTS_TABLE}_au",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF title, overview, notes ON watchlist_items BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, overview, notes)
+            VALUES ('delete', old.id, old.title, old.overview, old.notes);
+            INSERT INTO {FTS_TABLE}(rowid, title, overview, notes)
+            VALUES (new.id, new.title, new.overview, new.notes);
+        END
+        """,
+    ),
+]
+
+DROP_STATEMENTS = [f"DROP TABLE IF EXISTS {FTS_TABLE}"]
+
+search_cli = AppGroup("search", help="Manage the full-text search index.")
+
+
+def build_match_expression(search_term):
+    """Turns free-form user input into an FTS5 prefix query, or None if empty."""
+    tokens = re.findall(r"\w+", search_term.lower())
+    if not tokens:
+        return None
+    # Quote every token so FTS5 operators typed by the user are treated as text
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def match_subquery(search_term):
+    """
+    Returns a subquery of (item_id, rank) for items matching the search term,
+    or None if the term contains nothing searchable. Lower rank is better.
+    """
+    expression = build_match_expression(search_term)
+    if expression is None:
+        return None
+    fts = literal_column(FTS_TABLE)
+    return (
+        select(
+            literal_column("rowid").label("item_id"),
+            func.bm25(fts, *BM25_WEIGHTS).label("rank"),
+        )
+        .select_from(table(FTS_TABLE))
+        .where(fts.op("MATCH")(expression))
+        .subquery("search_matches")
+    )
+
+
+def rebuild_search_index(connection):
+    """Re-indexes every row of watchlist_items from scratch."""
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    connection.execute(
+        text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    )
+
+
+@search_cli.command("rebuild")
+def rebuild_command():
+    """Rebuild the full-text and fuzzy title search indexes."""
+    with db.engine.begin() as connection:
+        for _, _, create_sql in SCHEMA_OBJECTS + fuzzy.SCHEMA_OBJECTS:
+            connection.execute(text(create_sql))
+        rebuild_search_index(connection)
+        fuzzy.rebuild_trigrams(connection)
+        indexed = connection.execute(
+            text(f"SELECT count(*) FROM {FTS_TABLE}_docsize")
+        ).scalar()
+    click.echo(f"Search index rebuilt ({indexed} items indexed).")
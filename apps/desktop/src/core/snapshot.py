@@ -0,0 +1,143 @@
+# apps/desktop/src/core/snapshot.py
+import os
+import sqlite3
+import tempfile
+import click
+from contextlib import closing
+from pathlib import Path
+from flask import current_app
+from flask.cli import AppGroup
+from . import db, schema
+from .fragment_cache import get_fragment_cache
+from .models import WatchlistItem
+from .suggest import get_title_index
+
+snapshot_cli = AppGroup("snapshot", help="Back up and restore the database file.")
+
+SNAPSHOT_EXTENSIONS = {"db", "sqlite", "sqlite3"}
+
+
+class InvalidSnapshotError(ValueError):
+    """Raised when a file is not a usable snapshot of this application's database."""
+
+
+def database_path():
+    """Path of the live SQLite database file."""
+    return Path(db.engine.url.database)
+
+
+def create_snapshot(destination):
+    """
+    Writes a consistent, compacted copy of the live database to destination
+    with VACUUM INTO. It reads inside a single read transaction, so readers
+    and the live file are never blocked or touched. The copy is written next
+    to destination and renamed over it once complete.
+    """
+    destination = Path(destination)
+    fd, partial_path = tempfile.mkstemp(
+        dir=destination.parent, prefix=".snapshot-", suffix=".db"
+    )
+    os.close(fd)
+    os.remove(partial_path)  # VACUUM INTO refuses to overwrite a file
+    try:
+        # Not through the engine's pools: VACUUM INTO is refused by the
+        # query-only readers, and would hold up writes on the writer
+        with closing(sqlite3.connect(database_path())) as connection:
+            connection.execute("VACUUM INTO ?", (partial_path,))
+        os.replace(partial_path, destination)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return destination
+
+
+def _read_version(connection):
+    try:
+        row = connection.execute("SELECT version_num FROM alembic_version").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def validate_snapshot(path):
+    """
+    Checks that path is an intact SQLite database with this application's
+    schema, at the same migration revision as the live database, and that it
+    can be copied into it. Raises InvalidSnapshotError otherwise.
+    """
+    try:
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as snapshot:
+            if snapshot.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                raise InvalidSnapshotError("The snapshot file is corrupted.")
+            columns = {
+                row[1]
+                for row in snapshot.execute(
+                    f"PRAGMA table_info({WatchlistItem.__tablename__})"
+                )
+            }
+            snapshot_version = _read_version(snapshot)
+            page_size = snapshot.execute("PRAGMA page_size").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        raise InvalidSnapshotError("The file is not a SQLite database.") from e
+
+    missing = {column.name for column in WatchlistItem.__table__.columns} - columns
+    if missing:
+        raise InvalidSnapshotError(
+            "The snapshot is not a SeriesScape database "
+            f"(missing {', '.join(sorted(missing))})."
+        )
+    with closing(sqlite3.connect(database_path())) as live:
+        live_version = _read_version(live)
+        live_page_size = live.execute("PRAGMA page_size").fetchone()[0]
+        journal_mode = live.execute("PRAGMA journal_mode").fetchone()[0]
+    if snapshot_version != live_version:
+        raise InvalidSnapshotError(
+            "The snapshot was made with a different database version "
+            f"({snapshot_version or 'none'}, expected {live_version or 'none'})."
+        )
+    # The backup API cannot change the page size of a WAL database
+    if journal_mode == "wal" and page_size != live_page_size:
+        raise InvalidSnapshotError(
+            f"The snapshot has a page size of {page_size} bytes, "
+            f"expected {live_page_size}."
+        )
+
+
+def restore_snapshot(path):
+    """
+    Validates the snapshot at path and copies it over the live database with
+    SQLite's online backup API, which swaps the pages atomically.
+    """
+    validate_snapshot(path)
+    db.session.remove()
+    with closing(sqlite3.connect(path)) as snapshot:
+        live = db.engine.raw_connection()
+        try:
+            snapshot.backup(live.driver_connection)
+        finally:
+            live.close()
+
+    # Everything cached from the old database is stale now
+    get_fragment_cache().bump_generation()
+    get_title_index().reset()
+    schema.ensure_auxiliary_schema()
+    current_app.logger.info(f"Database restored from snapshot {path}.")
+
+
+@snapshot_cli.command("create")
+@click.argument("destination", type=click.Path(dir_okay=False))
+def create_command(destination):
+    """Write a snapshot of the live database to DESTINATION."""
+    path = create_snapshot(destination)
+    click.echo(f"Snapshot written to {path} ({path.stat().st_size:,} bytes).")
+
+
+@snapshot_cli.command("restore")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+def restore_command(source):
+    """Replace the live database with the snapshot at SOURCE."""
+    try:
+        restore_snapshot(source)
+    except InvalidSnapshotError as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(f"Database restored from {source}.")
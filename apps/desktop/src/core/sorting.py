@@ -0,0 +1,119 @@
+# apps/desktop/src/core/sorting.py
+from sqlalchemy import func, literal
+from sqlalchemy.dialects import sqlite
+from . import config
+from .models import WatchlistItem
+
+SORT_COLUMNS = ["date_watched", "date_added", "title", "year", "rating"]
+
+
+def _nulls_last(column, placeholder):
+    """
+    Coalesces NULLs to a placeholder that sorts after every real value.
+    The placeholder is rendered inline rather than as a bound parameter so
+    SQLite can match the expression against the sort indexes below.
+    """
+    return func.coalesce(column, literal(placeholder, literal_execute=True))
+
+
+def get_sort_expression(sort_by, sort_order, search_matches=None):
+    """Returns the (expression, descending) pair the watchlist is ordered by."""
+    if sort_by == "relevance" and search_matches is not None:
+        # bm25() scores are negative, lower means a better match
+        return search_matches.c.rank, False
+
+    sort_column_expression = None
+
+    if sort_by == "title":
+        sort_column_expression = func.lower(WatchlistItem.title)
+    elif sort_by == "year":
+        placeholder = (
+            config.NULL_SORT_PLACEHOLDER["num_asc"]
+            if sort_order == "asc"
+            else config.NULL_SORT_PLACEHOLDER["num_desc"]
+        )
+        sort_column_expression = _nulls_last(WatchlistItem.year, placeholder)
+    elif sort_by == "rating":
+        placeholder = (
+            config.NULL_SORT_PLACEHOLDER["rating_asc"]
+            if sort_order == "asc"
+            else config.NULL_SORT_PLACEHOLDER["rating_desc"]
+        )
+        sort_column_expression = _nulls_last(WatchlistItem.rating, placeholder)
+    elif sort_by == "date_added":
+        sort_column_expression = WatchlistItem.date_added
+    elif sort_by == "date_watched":
+        placeholder = (
+            config.NULL_SORT_PLACEHOLDER["date_asc"]
+            if sort_order == "asc"
+            else config.NULL_SORT_PLACEHOLDER["date_desc"]
+        )
+        sort_column_expression = _nulls_last(WatchlistItem.date_watched, placeholder)
+
+    # Fallback if sort_by is somehow invalid
+    if sort_column_expression is None:
+        placeholder = (
+            config.NULL_SORT_PLACEHOLDER["date_asc"]
+            if sort_order == "asc"
+            else config.NULL_SORT_PLACEHOLDER["date_desc"]
+        )
+        sort_column_expression = _nulls_last(WatchlistItem.date_watched, placeholder)
+
+    return sort_column_expression, sort_order == "desc"
+
+
+def _index_sql(expression):
+    return str(
+        expression.compile(
+            dialect=sqlite.dialect(),
+            compile_kwargs={"literal_binds": True, "include_table": False},
+        )
+    )
+
+
+# Equality filters the list view can combine with any sort, each prefixing its
+# own copy of the sort indexes
+_FILTER_PREFIXES = [(), ("status",), ("type",), ("status", "type")]
+
+
+def _sort_index_objects():
+    """
+    Builds one index per distinct sort expression, plus one prefixed with
+    each combination of the status and type filters. Every SQLite index
+    implicitly ends with the rowid, so (expression) already orders rows by
+    (expression, id).
+    """
+    objects = []
+    for sort_by in SORT_COLUMNS:
+        expressions = {
+            sort_order: _index_sql(get_sort_expression(sort_by, sort_order)[0])
+            for sort_order in ("desc", "asc")
+        }
+        if expressions["desc"] == expressions["asc"]:
+            expressions = {"": expressions["desc"]}
+
+        for sort_order, expression_sql in expressions.items():
+            suffix = f"{sort_by}_{sort_order}" if sort_order else sort_by
+            for prefix in _FILTER_PREFIXES:
+                # A bare column already has its own index on the model
+                if not prefix and expression_sql == sort_by:
+                    continue
+                name = "_".join(["ix_watchlist_items", *prefix, "sort", suffix])
+                columns = ", ".join([*prefix, expression_sql])
+                objects.append(
+                    (
+                        "index",
+                        name,
+                        f"CREATE INDEX IF NOT EXISTS {name} "
+                        f"ON watchlist_items ({columns})",
+                    )
+                )
+    return objects
+
+
+# Indexes whose keys match the ORDER BY expressions above exactly, letting the
+# list query walk an index instead of sorting the filtered set in a temp B-tree.
+SCHEMA_OBJECTS = _sort_index_objects()
+
+# Dropped together with watchlist_items
+DROP_STATEMENTS = []
@@ -0,0 +1,149 @@
+# apps/desktop/src/core/suggest.py
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from . import db
+from .models import WatchlistItem
+
+# Session.info keys for title changes waiting on the transaction to commit
+_PENDING_KEY = "title_index_pending"
+_RESET_KEY = "title_index_reset"
+
+
+def normalize_title(title):
+    """Case-folds, strips accents and collapses whitespace."""
+    decomposed = unicodedata.normalize("NFKD", title.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+
+def _index_keys(title):
+    """One key per word start, so "sha" finds "The Shawshank Redemption"."""
+    words = normalize_title(title).split(" ")
+    return {" ".join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+class TitleIndex:
+    """
+    Sorted array of (normalized title suffix, item id, title) entries that
+    answers prefix lookups with a binary search. Built lazily from the
+    database on first use, then patched as items are saved and deleted.
+    """
+
+    def __init__(self):
+        self._entries = None
+        self._titles = {}
+        self._lock = threading.Lock()
+
+    def _build(self):
+        rows = db.session.execute(select(WatchlistItem.id, WatchlistItem.title))
+        self._titles = {row.id: row.title for row in rows}
+        self._entries = sorted(
+            (key, item_id, title)
+            for item_id, title in self._titles.items()
+            for key in _index_keys(title)
+        )
+
+    def suggest(self, prefix, limit):
+        """Returns up to limit distinct titles with a word starting with prefix."""
+        prefix = normalize_title(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            if self._entries is None:
+                self._build()
+            suggestions = []
+            seen = set()
+            i = bisect_left(self._entries, (prefix,))
+            while i < len(self._entries) and len(suggestions) < limit:
+                key, item_id, title = self._entries[i]
+                if not key.startswith(prefix):
+                    break
+                if item_id not in seen:
+                    seen.add(item_id)
+                    suggestions.append(title)
+                i += 1
+            return suggestions
+
+    def _remove(self, item_id):
+        title = self._titles.pop(item_id, None)
+        if title is None:
+            return
+        for key in _index_keys(title):
+            i = bisect_left(self._entries, (key, item_id))
+            if i < len(self._entries) and self._entries[i][:2] == (key, item_id):
+                del self._entries[i]
+
+    def apply(self, changes):
+        """Patches the index with (item id, title or None if deleted) pairs."""
+        with self._lock:
+            if self._entries is None:
+                return  # Not built yet, it will read the new titles anyway
+            for item_id, title in changes:
+                self._remove(item_id)
+                if title is not None:
+                    self._titles[item_id] = title
+                    for key in _index_keys(title):
+                        insort(self._entries, (key, item_id, title))
+
+    def reset(self):
+        """Drops the index so the next lookup rebuilds it."""
+        with self._lock:
+            self._entries = None
+            self._titles = {}
+
+
+def init_app(app):
+    app.extensions["title_index"] = TitleIndex()
+
+
+def get_title_index():
+    return current_app.extensions["title_index"]
+
+
+# Item saves and deletes patch the index once their transaction commits.
+# Bulk statements (e.g. the import's delete-all) cannot be patched row by row,
+# so they make the index rebuild on next use instead.
+@event.listens_for(Session, "after_flush")
+def _collect_title_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, WatchlistItem):
+            pending.append((obj.id, obj.title))
+    for obj in session.deleted:
+        if isinstance(obj, WatchlistItem):
+            pending.append((obj.id, None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[_RESET_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_title_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    reset = session.info.pop(_RESET_KEY, False)
+    if not has_app_context():
+        return
+    title_index = current_app.extensions.get("title_index")
+    if title_index is None:
+        return
+    if reset:
+        title_index.reset()
+    elif pending:
+        title_index.apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_title_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_RESET_KEY, False)
@@ -18,7 +18,7 @@ TEST_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
 @pytest.fixture(scope="session")
-def app():
+def app(tmp_path_factory):
     """Create and configure a new app instance for each test session."""
     db_file_name = f"test_seriesscape_{os.urandom(4).hex()}.db"
     db_path = TEST_DATA_DIR / db_file_name
@@ -35,26 +35,25 @@ def app():
     os.environ["GOOGLE_APPS_SCRIPT_FEEDBACK_URL"] = "http://test.feedback.url"
     os.environ["GOOGLE_SHEET_PUBLIC_URL"] = "http://test.sheet.url"
 
-    app_instance = create_app()
-
-    # Restore original environment
-    os.environ.clear()
-    os.environ.update(original_env)
-
-    # Explicitly update app.config AFTER creation for test-specific settings
-    app_instance.config.update(
+    # DATABASE_URL is read from the environment, the rest is set directly
+    app_instance = create_app(
         {
             "TESTING": True,
-            "SQLALCHEMY_DATABASE_URI": test_db_uri,
             "WTF_CSRF_ENABLED": False,
             "SECRET_KEY": "pytest-secret-key",
             "SERVER_NAME": "localhost.test",
             "DEBUG": False,
             "GOOGLE_APPS_SCRIPT_FEEDBACK_URL": "http://test.feedback.url",
             "GOOGLE_SHEET_PUBLIC_URL": "http://test.sheet.url",
+            # Import reports and exports, kept out of the real data directory
+            "JOBS_DIR": str(tmp_path_factory.mktemp("jobs")),
         }
     )
 
+    # Restore original environment
+    os.environ.clear()
+    os.environ.update(original_env)
+
     with app_instance.app_context():
         main_db.create_all()
 
@@ -62,12 +61,16 @@ def app():
 
     with app_instance.app_context():
         main_db.drop_all()
-
-    try:
-        if db_path.exists():
-            os.remove(db_path)
-    except OSError as e:
-        print(f"Error removing test database {db_path}: {e}")
+        # Closing every connection lets SQLite remove its WAL files
+        for engine in main_db.engines.values():
+            engine.dispose()
+
+    # The database, the jobs database beside it and their WAL files
+    for path in TEST_DATA_DIR.glob(f"{db_path.stem}*"):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Error removing test database {path}: {e}")
 
 
 @pytest.fixture()
@@ -199,6 +199,29 @@ def test_delete_item_success(client, db_session):
     assert deleted_item is None
 
 
+def test_edit_item_form_conditional_get(client, db_session):
+    """Test the edit form answers 304 until the item changes."""
+    item = WatchlistItem(title="Cache Me", type="movie")
+    db_session.add(item)
+    db_session.commit()
+    url = url_for("items.edit_item_form", item_id=item.id)
+
+    response = client.get(url, headers={"HX-Request": "true"})
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    response = client.get(url, headers={"HX-Request": "true", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    item.title = "Cache Me Again"
+    db_session.commit()
+    response = client.get(url, headers={"HX-Request": "true", "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert b'value="Cache Me Again"' in response.data
+
+
 def test_delete_non_existent_item(client):
     """Test deleting a non-existent item."""
     response = client.delete(
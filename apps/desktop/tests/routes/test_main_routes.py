@@ -3,9 +3,11 @@ import pytest
 from flask import url_for, session as flask_session
 from src.core.models import WatchlistItem
 from src.core import db as main_db, config
+from src.core.routing import read_engine
 from datetime import date, datetime, timezone
 from tests.conftest import add_test_item
 from unittest.mock import patch
+from sqlalchemy import event
 
 
 def test_index_page_loads(client):
@@ -18,6 +20,56 @@ def test_index_page_loads(client):
     assert b'<div id="watchlist-content"' in response.data
 
 
+def test_index_renders_watchlist_with_one_list_query(client, db_session):
+    """The first page is rendered inline instead of fetched again by HTMX."""
+    add_test_item(db_session, title="Inline Item")
+    db_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(read_engine(main_db), "before_cursor_execute", record)
+    try:
+        response = client.get(url_for("main.index"))
+    finally:
+        event.remove(read_engine(main_db), "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert b"Inline Item" in response.data
+    assert b"load delay" not in response.data
+    assert b"loadWatchlist from:body" in response.data
+    list_queries = [s for s in statements if "FROM watchlist_items" in s]
+    assert len(list_queries) == 1
+
+
+def test_list_query_leaves_text_columns_unloaded(client, db_session):
+    """The list never renders overview/notes, so it should not fetch them."""
+    add_test_item(db_session, title="Wordy", overview="o" * 5000, notes="n" * 5000)
+    db_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(read_engine(main_db), "before_cursor_execute", record)
+    try:
+        response = client.get(
+            url_for("main.load_watchlist"), headers={"HX-Request": "true"}
+        )
+    finally:
+        event.remove(read_engine(main_db), "before_cursor_execute", record)
+
+    assert b"Wordy" in response.data
+    list_queries = [s for s in statements if "FROM watchlist_items" in s]
+    assert list_queries
+    for statement in list_queries:
+        assert "watchlist_items.overview" not in statement
+        assert "watchlist_items.notes" not in statement
+
+
 def test_load_watchlist_htmx(client, db_session):
     """Test the /load_watchlist route via HTMX request."""
     item = add_test_item(db_session, title="Test Item for HTMX")
@@ -36,6 +88,33 @@ def test_load_watchlist_htmx(client, db_session):
     main_db.session.commit()
 
 
+def test_load_watchlist_conditional_get(client, db_session):
+    """Test /load_watchlist answers 304 without querying until data changes."""
+    add_test_item(db_session, title="Unchanged Item")
+    db_session.commit()
+    url = url_for("main.load_watchlist", filter_status="Watched")
+
+    response = client.get(url, headers={"HX-Request": "true"})
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    headers = {"HX-Request": "true", "If-None-Match": etag}
+    with patch("src.core.routes.main._query_watchlist") as mock_query:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 304
+    mock_query.assert_not_called()
+
+    # A different view of the same data gets its own tag
+    other = client.get(url_for("main.load_watchlist"), headers=headers)
+    assert other.status_code == 200
+
+    add_test_item(db_session, title="New Item")
+    db_session.commit()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert b"New Item" in response.data
+
+
 def test_load_watchlist_htmx_empty(client):
     """Test the /load_watchlist route via HTMX when no items exist."""
     # Clear the watchlist
@@ -266,3 +345,44 @@ def test_500_error_page_on_index_route(client, app):
         assert response.status_code == 500
         assert b"Internal Server Error" in response.data
         assert b"500" in response.data
+
+
+def test_load_watchlist_search(client, db_session):
+    """Test that searching matches word prefixes in title, overview and notes."""
+    add_test_item(db_session, title="Interstellar", date_watched=date(2023, 1, 1))
+    add_test_item(
+        db_session,
+        title="Gravity",
+        notes="Like interstellar but shorter",
+        date_watched=date(2023, 1, 2),
+    )
+    add_test_item(db_session, title="Heat", date_watched=date(2023, 1, 3))
+
+    response = client.get(
+        url_for("main.load_watchlist", search="inter"),
+        headers={"HX-Request": "true"},
+    )
+    content = response.data.decode()
+    assert "Heat" not in content
+    # Relevance order by default: the title match comes before the notes match
+    assert content.find("Interstellar") < content.find("Gravity")
+
+    response = client.get(
+        url_for("main.load_watchlist", search="inter", sort="date_watched"),
+        headers={"HX-Request": "true"},
+    )
+    content = response.data.decode()
+    assert content.find("Gravity") < content.find("Interstellar")
+
+
+def test_load_watchlist_search_without_words(client, db_session):
+    """Test that a search term with nothing to tokenize falls back to a substring match."""
+    add_test_item(db_session, title="What?!")
+    add_test_item(db_session, title="Heat")
+
+    response = client.get(
+        url_for("main.load_watchlist", search="?!"),
+        headers={"HX-Request": "true"},
+    )
+    assert b"What?!" in response.data
+    assert b"Heat" not in response.data
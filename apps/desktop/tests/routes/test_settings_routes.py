@@ -7,6 +7,7 @@ from src.core import db as main_db
 from src.core.routes.settings import allowed_file
 import json
 import io
+import gzip
 from tests.conftest import add_test_item
 
 
@@ -311,7 +312,7 @@ def test_import_data_json_invalid_file_type(client, app):
         )
 
     assert response.status_code == 200
-    assert b"Invalid file type. Please upload a .json file." in response.data
+    assert b"Please upload a .json, .ndjson or .csv file" in response.data
 
 
 def test_import_data_json_malformed_json(client, app):
@@ -331,6 +332,129 @@ def test_import_data_json_malformed_json(client, app):
     assert b"Invalid JSON file. Please upload a valid backup." in response.data
 
 
+def test_import_data_json_batches_records(client, db_session, app, monkeypatch):
+    """Test a large import goes in several batches and keeps every record."""
+    monkeypatch.setattr("src.core.importing.IMPORT_BATCH_SIZE", 3)
+    new_data = [{"title": f"Batch Movie {i}", "type": "movie"} for i in range(10)]
+    bytes_io = io.BytesIO(json.dumps(new_data, indent=2).encode("utf-8"))
+    data = {"backup_file": (bytes_io, "batched.json")}
+
+    with app.test_request_context():
+        response = client.post(
+            url_for("settings.import_data_json"),
+            data=data,
+            content_type="multipart/form-data",
+            follow_redirects=True,
+        )
+
+    assert b"10 items imported successfully." in response.data
+    titles = [item.title for item in WatchlistItem.query.order_by(WatchlistItem.id)]
+    assert titles == [f"Batch Movie {i}" for i in range(10)]
+
+
+def test_import_data_json_truncated_keeps_existing(client, db_session, app, monkeypatch):
+    """Test a file that breaks after some batches were written changes nothing."""
+    monkeypatch.setattr("src.core.importing.IMPORT_BATCH_SIZE", 2)
+    add_test_item(db_session, title="Survivor")
+    db_session.commit()
+    new_data = [{"title": f"Partial {i}", "type": "movie"} for i in range(6)]
+    truncated = json.dumps(new_data)[:-20]
+    data = {"backup_file": (io.BytesIO(truncated.encode("utf-8")), "broken.json")}
+
+    with app.test_request_context():
+        response = client.post(
+            url_for("settings.import_data_json"),
+            data=data,
+            content_type="multipart/form-data",
+            follow_redirects=True,
+        )
+
+    assert b"Invalid JSON file. Please upload a valid backup." in response.data
+    assert [item.title for item in WatchlistItem.query] == ["Survivor"]
+
+
+def test_import_data_json_merge_mode(client, db_session, app):
+    """Test merge mode updates matched items, adds new ones and deletes nothing."""
+    add_test_item(db_session, title="Kept", type="tv")
+    add_test_item(db_session, title="Heat", imdb_id="tt0113277", rating=7)
+    add_test_item(db_session, title="Alien", year=1979)
+    db_session.commit()
+    backup = [
+        {"title": "Heat", "type": "movie", "imdb_id": "tt0113277", "rating": 9},
+        {"title": "alien", "type": "movie", "year": 1979, "status": "Watched"},
+        {"title": "New One", "type": "movie"},
+        {"type": "movie"},
+    ]
+    data = {
+        "backup_file": (io.BytesIO(json.dumps(backup).encode("utf-8")), "merge.json"),
+        "mode": "merge",
+    }
+
+    with app.test_request_context():
+        response = client.post(
+            url_for("settings.import_data_json"),
+            data=data,
+            content_type="multipart/form-data",
+            follow_redirects=True,
+        )
+
+    assert b"1 items added, 2 updated and 0 unchanged." in response.data
+    assert b"1 items were skipped" in response.data
+    items = {item.title: item for item in WatchlistItem.query}
+    assert sorted(items) == ["Heat", "Kept", "New One", "alien"]
+    assert items["Heat"].rating == 9
+
+
+@pytest.mark.parametrize(
+    "export_format, mimetype",
+    [
+        ("ndjson", "application/x-ndjson"),
+        ("csv", "text/csv"),
+        ("csv.gz", "application/gzip"),
+    ],
+)
+def test_export_data_formats(client, db_session, export_format, mimetype):
+    """Test the sibling export routes stream each format with its own file name."""
+    add_test_item(db_session, title="Format Movie")
+    db_session.commit()
+
+    url = url_for("settings.export_data", export_format=export_format)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == mimetype
+    assert response.headers["Content-Disposition"].endswith(f".{export_format}")
+    data = response.data
+    if export_format.endswith(".gz"):
+        data = gzip.decompress(data)
+    assert b"Format Movie" in data
+
+
+def test_export_data_unknown_format(client):
+    """Test an unknown export format is a 404."""
+    response = client.get(url_for("settings.export_data", export_format="xml"))
+    assert response.status_code == 404
+
+
+def test_import_data_gzipped_csv(client, db_session, app):
+    """Test a gzipped CSV backup imports like the JSON one."""
+    content = "title,type,year,rating\nCSV Movie,movie,1999,8\nCSV Show,tv,,\n"
+    data = {"backup_file": (io.BytesIO(gzip.compress(content.encode())), "b.csv.gz")}
+
+    with app.test_request_context():
+        response = client.post(
+            url_for("settings.import_data_json"),
+            data=data,
+            content_type="multipart/form-data",
+            follow_redirects=True,
+        )
+
+    assert b"2 items imported successfully." in response.data
+    movie = WatchlistItem.query.filter_by(title="CSV Movie").one()
+    assert (movie.year, movie.rating) == (1999, 8)
+    assert WatchlistItem.query.filter_by(title="CSV Show").one().year is None
+
+
 def test_import_data_json_missing_required_fields(client, db_session, app):
     """Test importing data where items are missing required fields (title, type)."""
     WatchlistItem.query.delete()
@@ -385,3 +509,8 @@ def test_allowed_file_helper():
     assert allowed_file("backupjson") is False
     assert allowed_file(".json") is False
     assert allowed_file("noextension") is False
+    assert allowed_file("backup.ndjson") is True
+    assert allowed_file("backup.jsonl") is True
+    assert allowed_file("backup.csv.gz") is True
+    assert allowed_file("backup.gz") is False
+    assert allowed_file(".csv.gz") is False
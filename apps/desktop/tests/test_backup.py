@@ -0,0 +1,193 @@
+# apps/desktop/tests/test_backup.py
+import csv
+import gzip
+import io
+import json
+import pytest
+import tracemalloc
+from datetime import date, datetime
+from flask import url_for
+from sqlalchemy import insert
+from src.core import backup
+from src.core.models import WatchlistItem
+from tests.conftest import add_test_item
+
+
+def _legacy_export(items):
+    """The export format as json.dumps(..., indent=2) wrote it before streaming."""
+    return json.dumps([backup.export_record(item) for item in items], indent=2)
+
+
+def _bulk_insert(db_session, count, notes_size):
+    now = datetime(2024, 1, 1)
+    db_session.execute(
+        insert(WatchlistItem),
+        [
+            {
+                "title": f"Bulk {i}",
+                "type": "movie",
+                "status": "Watched",
+                "notes": "n" * notes_size,
+                "date_added": now,
+                "date_modified": now,
+            }
+            for i in range(count)
+        ],
+    )
+    db_session.commit()
+
+
+def _peak_export_memory():
+    tracemalloc.start()
+    for _ in backup.iter_export_json(backup.iter_export_rows()):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_export_is_byte_compatible(db_session, monkeypatch):
+    monkeypatch.setattr(backup, "EXPORT_BATCH_SIZE", 2)  # Several chunks
+    add_test_item(
+        db_session,
+        title='Amélie "Le Fabuleux"',
+        year=2001,
+        rating=9,
+        notes="Line one\nLine two",
+        date_watched=date(2023, 5, 1),
+    )
+    for i in range(4):
+        add_test_item(db_session, title=f"Item {i}", type="tv")
+    db_session.commit()
+
+    streamed = b"".join(backup.iter_export_json(backup.iter_export_rows()))
+    items = WatchlistItem.query.order_by(WatchlistItem.id).all()
+    assert streamed == _legacy_export(items).encode("utf-8")
+
+
+def test_empty_export_is_byte_compatible(db_session):
+    streamed = b"".join(backup.iter_export_json(backup.iter_export_rows()))
+    assert streamed == _legacy_export([]).encode("utf-8")
+
+
+def test_export_memory_stays_flat(db_session, monkeypatch):
+    monkeypatch.setattr(backup, "EXPORT_BATCH_SIZE", 50)
+    _bulk_insert(db_session, 200, notes_size=5000)
+    small = _peak_export_memory()
+    _bulk_insert(db_session, 1800, notes_size=5000)
+    large = _peak_export_memory()
+    # Ten times the rows (~10 MB of notes) must not mean ten times the memory
+    assert large < small * 2
+
+
+def test_export_route_streams_backup(client, db_session):
+    add_test_item(db_session, title="Streamed Item")
+    db_session.commit()
+    response = client.get(url_for("settings.export_data_json"))
+    assert response.is_streamed
+    assert json.loads(response.data)[0]["title"] == "Streamed Item"
+
+
+@pytest.mark.parametrize("read_size", [1, 3, 64])
+def test_json_array_reader_matches_json_loads(read_size):
+    document = json.dumps(
+        [{"title": "Amélie", "rating": 12345}, [], "a, b]", 1.5e3, None, True],
+        indent=2,
+    )
+    stream = io.BytesIO(document.encode("utf-8"))
+    assert list(backup.iter_json_array(stream, read_size)) == json.loads(document)
+
+
+@pytest.mark.parametrize(
+    "document", ["", "{}", "[1,]", "[,1]", "[1 2]", "[{}", "[1] x", '[{"a":}]']
+)
+def test_json_array_reader_rejects_malformed_input(document):
+    stream = io.BytesIO(document.encode("utf-8"))
+    with pytest.raises(json.JSONDecodeError):
+        list(backup.iter_json_array(stream, 2))
+
+
+def test_batched():
+    assert list(backup.batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(backup.batched([], 2)) == []
+
+
+def _export(export_format, compress=False):
+    return b"".join(
+        backup.iter_export(export_format, backup.iter_export_rows(), compress)
+    )
+
+
+def _add_export_items(db_session):
+    add_test_item(
+        db_session,
+        title='Amélie "Le Fabuleux", part 1',
+        year=2001,
+        rating=9,
+        notes="Line one\nLine two",
+        date_watched=date(2023, 5, 1),
+    )
+    add_test_item(db_session, title="Plain", type="tv")
+    db_session.commit()
+
+
+def test_ndjson_export_has_one_record_per_line(db_session):
+    _add_export_items(db_session)
+    lines = _export("ndjson").decode("utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert records == json.loads(_export("json"))
+
+
+def test_csv_export_round_trips_through_import_reader(db_session):
+    _add_export_items(db_session)
+    exported = _export("csv")
+    header = next(csv.reader(io.StringIO(exported.decode("utf-8"))))
+    assert header == backup.EXPORT_FIELDS
+
+    records = list(backup.iter_backup_records(io.BytesIO(exported), "b.csv"))
+    assert records[0]["title"] == 'Amélie "Le Fabuleux", part 1'
+    assert records[0]["notes"] == "Line one\nLine two"
+    assert records[0]["year"] == "2001"
+    assert "rating" not in records[1]  # Empty cells read as missing
+
+
+def test_empty_csv_export_has_header(db_session):
+    assert _export("csv") == (",".join(backup.EXPORT_FIELDS) + "\r\n").encode()
+
+
+@pytest.mark.parametrize("export_format", ["json", "ndjson", "csv"])
+def test_gzip_export_decompresses_to_plain_export(db_session, export_format):
+    _add_export_items(db_session)
+    assert gzip.decompress(_export(export_format, True)) == _export(export_format)
+
+    filename = backup.export_filename("b", export_format, True)
+    stream = io.BytesIO(_export(export_format, True))
+    records = list(backup.iter_backup_records(stream, filename))
+    assert [record["title"] for record in records] == [
+        'Amélie "Le Fabuleux", part 1',
+        "Plain",
+    ]
+
+
+def test_backup_format():
+    assert backup.backup_format("a.JSON") == ("json", False)
+    assert backup.backup_format("a.jsonl.gz") == ("ndjson", True)
+    assert backup.backup_format("a.csv.GZ") == ("csv", True)
+    assert backup.backup_format("a.txt") is None
+    assert backup.backup_format("a.gz") is None
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("b.ndjson", b'{"title": "A"}\n{"title": '),
+        ("b.csv", b'title,type\n"Unclosed,movie'),
+        ("b.csv", b"title,type\nA,movie,extra\n"),
+        ("b.json.gz", b"not gzip at all"),
+        ("b.json.gz", gzip.compress(b'[{"title": "A"}]')[:-12]),
+        ("b.json", b'["\xff"]'),
+    ],
+)
+def test_malformed_backups_raise_invalid_backup(filename, content):
+    with pytest.raises(backup.InvalidBackupError):
+        list(backup.iter_backup_records(io.BytesIO(content), filename))
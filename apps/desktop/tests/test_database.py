@@ -0,0 +1,74 @@
+# apps/desktop/tests/test_database.py
+import pytest
+from pathlib import Path
+from sqlalchemy.engine import make_url
+from src.core import create_app, database, db as main_db
+from src.core.models import WatchlistItem
+from src.core.routing import READ_BIND
+
+
+def test_settings_from_env():
+    environ = {
+        "DATABASE_URL": "sqlite:////fast/disk/watchlist.db",
+        "DATABASE_POOL_RECYCLE": "3600",
+        "READ_POOL_SIZE": " 8 ",
+        "DATABASE_POOL_SIZE": "",
+        "IMPORT_WORKERS": "1",
+    }
+    assert database.settings_from_env(environ) == {
+        "SQLALCHEMY_DATABASE_URI": "sqlite:////fast/disk/watchlist.db",
+        "DATABASE_POOL_RECYCLE": 3600,
+        "READ_POOL_SIZE": 8,
+        "IMPORT_WORKERS": 1,
+    }
+    with pytest.raises(ValueError, match="READ_POOL_SIZE"):
+        database.settings_from_env({"READ_POOL_SIZE": "many"})
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///./data/db.sqlite", "sqlite:////root/project/data/db.sqlite"),
+        ("sqlite:////elsewhere/db.sqlite", "sqlite:////elsewhere/db.sqlite"),
+        ("sqlite:///:memory:", database.MEMORY_DATABASE_URL),
+        ("sqlite://", database.MEMORY_DATABASE_URL),
+        ("postgresql://user:pw@host/db", "postgresql://user:pw@host/db"),
+    ],
+)
+def test_resolve_url(url, expected):
+    assert database.resolve_url(url, Path("/root/project")) == expected
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:////data/database.db", "/data/database-jobs.db"),
+        (database.MEMORY_DATABASE_URL, "file:seriesscape-jobs"),
+        ("postgresql://user:pw@host/db", "db"),
+    ],
+)
+def test_jobs_url(url, expected):
+    assert make_url(database.jobs_url(url)).database == expected
+
+
+def test_app_options_come_from_config(app):
+    options = app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+    assert options["connect_args"]["cached_statements"] == 128
+    with app.app_context():
+        assert main_db.engine.pool._recycle == -1
+        assert main_db.engine.pool._timeout == app.config["DATABASE_POOL_TIMEOUT"]
+        assert main_db.engines[READ_BIND].pool.size() == app.config["READ_POOL_SIZE"]
+
+
+def test_in_memory_database_is_shared_by_the_app():
+    memory_app = create_app(
+        {"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "DATABASE_POOL_RECYCLE": 60}
+    )
+    with memory_app.app_context():
+        assert READ_BIND not in main_db.engines
+        main_db.create_all(bind_key=None)  # Other apps have a read bind
+        main_db.session.add(WatchlistItem(title="In RAM", type="movie"))
+        main_db.session.commit()
+        main_db.session.remove()
+        assert [item.title for item in WatchlistItem.query] == ["In RAM"]
+        main_db.engine.dispose()
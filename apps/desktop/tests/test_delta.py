@@ -0,0 +1,151 @@
+# apps/desktop/tests/test_delta.py
+import io
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from flask import url_for
+from sqlalchemy import select, text
+from src.core import db as main_db, delta
+from src.core.models import WatchlistItem
+from tests.conftest import add_test_item
+
+
+def _delta(client, **args):
+    response = client.get(
+        url_for("settings.export_delta", export_format="ndjson", **args)
+    )
+    assert response.status_code == 200, response.data
+    records = [json.loads(line) for line in response.data.splitlines()]
+    return records, response.headers["X-Export-Token"]
+
+
+def _full_export_token(client):
+    response = client.get(url_for("settings.export_data_json"))
+    assert response.status_code == 200
+    return response.headers["X-Export-Token"]
+
+
+def test_delta_since_token_has_changes_and_tombstones(client, db_session):
+    kept = add_test_item(db_session, title="Kept")
+    edited = add_test_item(db_session, title="Edited")
+    gone = add_test_item(db_session, title="Gone", imdb_id="tt0000001")
+    db_session.commit()
+    token = _full_export_token(client)
+
+    edited.rating = 8
+    db_session.delete(gone)
+    add_test_item(db_session, title="Added")
+    db_session.commit()
+
+    records, next_token = _delta(client, token=token)
+    assert records[0]["deleted"] is True
+    assert (records[0]["title"], records[0]["imdb_id"]) == ("Gone", "tt0000001")
+    assert [record["title"] for record in records[1:]] == ["Edited", "Added"]
+    assert records[1]["rating"] == 8
+    assert kept.title not in [record["title"] for record in records]
+
+    # Nothing changed since the delta just made
+    assert _delta(client, token=next_token)[0] == []
+
+
+def test_delta_since_timestamp(client, db_session):
+    add_test_item(db_session, title="Before")
+    db_session.commit()
+    since = datetime.now(timezone.utc)
+    add_test_item(db_session, title="After")
+    db_session.commit()
+
+    records, _ = _delta(client, since=since.isoformat())
+    assert [record["title"] for record in records] == ["After"]
+
+
+def test_delta_reimports_with_merge(client, db_session, app):
+    item = add_test_item(db_session, title="Heat", imdb_id="tt0113277")
+    add_test_item(db_session, title="Alien", year=1979)
+    db_session.commit()
+    backup = client.get(url_for("settings.export_data_json"))
+    token = backup.headers["X-Export-Token"]
+
+    item.rating = 9
+    WatchlistItem.query.filter_by(title="Alien").delete()
+    db_session.commit()
+    changes = client.get(
+        url_for("settings.export_delta", export_format="json", token=token)
+    ).data
+
+    # Full backup plus delta, merged into an empty watchlist, gives today's
+    # watchlist back
+    WatchlistItem.query.delete()
+    db_session.commit()
+    for name, content in [("full.json", backup.data), ("delta.json", changes)]:
+        client.post(
+            url_for("settings.import_data_json"),
+            data={"backup_file": (io.BytesIO(content), name), "mode": "merge"},
+            content_type="multipart/form-data",
+        )
+    assert [(i.title, i.rating) for i in WatchlistItem.query] == [("Heat", 9)]
+
+
+def test_replace_import_ignores_tombstones(client, db_session):
+    records = [
+        {"title": "Gone", "type": "movie", "deleted": True},
+        {"title": "Here", "type": "movie"},
+    ]
+    response = client.post(
+        url_for("settings.import_data_json"),
+        data={"backup_file": (io.BytesIO(json.dumps(records).encode()), "d.json")},
+        content_type="multipart/form-data",
+        follow_redirects=True,
+    )
+    assert b"1 items imported successfully." in response.data
+    assert [item.title for item in WatchlistItem.query] == ["Here"]
+
+
+@pytest.mark.parametrize(
+    "args, status",
+    [
+        ({}, 400),
+        ({"token": "forged"}, 400),
+        ({"since": "yesterday"}, 400),
+        ({"since": "2024-01-01T00:00:00"}, 400),  # No timezone
+        ({"since": "2000-01-01T00:00:00Z"}, 410),
+    ],
+)
+def test_delta_rejects_bad_marks(client, args, status):
+    url = url_for("settings.export_delta", export_format="json", **args)
+    assert client.get(url).status_code == status
+
+
+def test_delta_has_no_csv_format(client):
+    url = url_for("settings.export_delta", export_format="csv", since="2024-01-01")
+    assert client.get(url).status_code == 404
+
+
+def test_old_tombstones_are_pruned(app, db_session):
+    db_session.execute(
+        text(
+            f"INSERT INTO {delta.TOMBSTONES_TABLE}"
+            "(item_id, title, type, deleted_at) "
+            "VALUES (1, 'Ancient', 'movie', :deleted_at)"
+        ),
+        {"deleted_at": datetime.now() - timedelta(days=365)},
+    )
+    db_session.commit()
+    delta.prune_tombstones()
+    titles = db_session.execute(
+        text(f"SELECT title FROM {delta.TOMBSTONES_TABLE}")
+    ).scalars()
+    assert "Ancient" not in list(titles)
+
+
+def test_changed_rows_are_a_range_scan(db_session):
+    query = select(WatchlistItem.id).where(
+        WatchlistItem.date_modified > datetime(2024, 1, 1)
+    )
+    compiled = query.compile(
+        dialect=main_db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = [
+        row.detail for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    ]
+    assert any("ix_watchlist_items_date_modified (date_modified>?)" in s for s in plan)
@@ -0,0 +1,138 @@
+# apps/desktop/tests/test_facets.py
+from flask import url_for
+from sqlalchemy import text
+from src.core import db as main_db, facets, schema
+from src.core.models import WatchlistItem
+from src.core.routes.main import NO_FILTERS
+from tests.conftest import add_test_item
+
+
+def _seed(db_session):
+    add_test_item(db_session, title="A", year=2023, rating=8, status="Watched")
+    add_test_item(db_session, title="B", year=2023, type="tv", status="Plan to Watch")
+    add_test_item(db_session, title="C", year=1999, rating=8)
+    add_test_item(db_session, title="D")
+    db_session.commit()
+
+
+def test_facets_follow_inserts(db_session):
+    _seed(db_session)
+
+    counts = facets.get_facets()
+    assert counts["status"] == {"Plan to Watch": 1, "Watched": 3}
+    assert counts["type"] == {"movie": 3, "tv": 1}
+    assert counts["year"] == {2023: 2, 1999: 1}
+    assert list(counts["year"]) == [2023, 1999]  # Newest first
+    assert counts["rating"] == {8: 2}
+
+
+def test_facets_follow_updates(db_session):
+    _seed(db_session)
+    item = WatchlistItem.query.filter_by(title="C").one()
+    item.year = 2023
+    item.rating = None
+    item.status = "Plan to Watch"
+    db_session.commit()
+
+    counts = facets.get_facets()
+    assert counts["year"] == {2023: 3}
+    assert counts["rating"] == {8: 1}
+    assert counts["status"] == {"Plan to Watch": 2, "Watched": 2}
+
+
+def test_facets_follow_deletes(db_session):
+    _seed(db_session)
+    db_session.delete(WatchlistItem.query.filter_by(title="C").one())
+    db_session.commit()
+    assert facets.get_facets()["year"] == {2023: 2}
+
+    WatchlistItem.query.delete()
+    db_session.commit()
+    assert facets.get_facets() == {"status": {}, "type": {}, "year": {}, "rating": {}}
+
+
+def test_rebuild_matches_incremental_counts(db_session):
+    _seed(db_session)
+    incremental = facets.get_facets()
+
+    facets.rebuild_facets(db_session.connection())
+    assert facets.get_facets() == incremental
+
+
+def test_count_facets_excludes_own_filter(db_session):
+    _seed(db_session)
+    filters = dict(NO_FILTERS, status="Watched", years=[2023])
+
+    counts = facets.count_facets(WatchlistItem.query, filters)
+    # Status counts ignore the status filter but honour the year filter
+    assert counts["status"] == {"Plan to Watch": 1, "Watched": 1}
+    assert counts["type"] == {"movie": 1}
+    # Year counts ignore the year filter but honour the status filter
+    assert counts["year"] == {2023: 1, 1999: 1}
+    assert counts["rating"] == {8: 1}
+
+
+def test_count_facets_without_filters_matches_rollup(db_session):
+    _seed(db_session)
+    assert facets.count_facets(WatchlistItem.query, NO_FILTERS) == facets.get_facets()
+
+
+def test_count_facets_uses_covering_index(db_session):
+    query = WatchlistItem.query.filter(WatchlistItem.title.ilike("%a%"))
+    columns = [getattr(WatchlistItem, d) for d in facets.FACET_DIMENSIONS]
+    statement = query.with_entities(*columns).group_by(*columns).statement
+    compiled = statement.compile(
+        dialect=main_db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = [
+        row.detail for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    ]
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert any("ix_watchlist_items_facets" in step for step in plan), plan
+
+
+def test_ensure_auxiliary_schema_restores_missing_objects(app, db_session):
+    _seed(db_session)
+    with main_db.engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE {facets.FACETS_TABLE}"))
+        connection.execute(text(f"DROP TRIGGER {facets.FACETS_TABLE}_ai"))
+
+    schema.ensure_auxiliary_schema()
+
+    assert facets.get_facets()["year"] == {2023: 2, 1999: 1}
+    add_test_item(db_session, title="E", year=1999)
+    db_session.commit()
+    assert facets.get_facets()["year"] == {2023: 2, 1999: 2}
+
+
+def test_include_name_hides_auxiliary_tables():
+    assert not schema.include_name(facets.FACETS_TABLE, "table", {})
+    assert not schema.include_name("watchlist_items_fts_data", "table", {})
+    assert schema.include_name("watchlist_items", "table", {})
+
+
+def test_filter_dropdown_shows_counts(client, db_session):
+    _seed(db_session)
+    response = client.get(
+        url_for("main.load_watchlist"), headers={"HX-Request": "true"}
+    )
+    content = response.data.decode()
+    assert "2023 (2)" in content
+    assert "1999 (1)" in content
+    assert "Watched (3)" in content
+    assert "TV Shows (1)" in content
+    assert "8 ⭐ (2)" in content
+
+
+def test_filter_dropdown_counts_follow_search(client, db_session):
+    _seed(db_session)
+    add_test_item(db_session, title="Zebra", year=2023, type="tv")
+    db_session.commit()
+    response = client.get(
+        url_for("main.load_watchlist", search="zebra"), headers={"HX-Request": "true"}
+    )
+    content = response.data.decode()
+    assert "2023 (1)" in content
+    assert "1999 (0)" in content  # Still listed so it can be picked
+    assert "Movies (0)" in content
+    assert "TV Shows (1)" in content
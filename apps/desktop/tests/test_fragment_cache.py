@@ -0,0 +1,91 @@
+# apps/desktop/tests/test_fragment_cache.py
+import pytest
+from flask import url_for
+from src.core.fragment_cache import FragmentCache, get_fragment_cache
+from src.core.models import WatchlistItem
+from tests.conftest import add_test_item
+
+
+@pytest.fixture()
+def cache(app, db_session):
+    fragment_cache = get_fragment_cache()
+    fragment_cache.bump_generation()
+    fragment_cache.hits = fragment_cache.misses = 0
+    return fragment_cache
+
+
+def _load(client, **args):
+    return client.get(
+        url_for("main.load_watchlist", **args), headers={"HX-Request": "true"}
+    )
+
+
+def test_lru_evicts_by_size():
+    fragment_cache = FragmentCache(max_bytes=10)
+    fragment_cache.put("a", "aaaa")
+    fragment_cache.put("b", "bbbb")
+    assert fragment_cache.get("a") == "aaaa"  # "b" is now least recently used
+    fragment_cache.put("c", "cccc")
+
+    assert fragment_cache.get("b") is None
+    assert fragment_cache.get("a") == "aaaa"
+    assert fragment_cache.get("c") == "cccc"
+    assert fragment_cache.stats()["bytes"] == 8
+    assert (fragment_cache.hits, fragment_cache.misses) == (3, 1)
+
+
+def test_oversized_fragment_is_not_cached():
+    fragment_cache = FragmentCache(max_bytes=4)
+    fragment_cache.put("a", "aaaaa")
+    assert fragment_cache.get("a") is None
+
+
+def test_repeated_view_is_served_from_cache(client, cache):
+    first = _load(client, filter_status="Watched")
+    second = _load(client, filter_status="Watched")
+    assert first.data == second.data
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    _load(client, filter_status="Plan to Watch")
+    assert cache.misses == 2
+
+
+def test_save_item_invalidates_cache(client, cache):
+    _load(client)
+    generation = cache.generation
+
+    client.post(
+        url_for("items.save_item"),
+        data={"title": "Fresh Item", "type": "movie", "status": "Watched"},
+        headers={"HX-Request": "true"},
+    )
+    assert cache.generation > generation
+    assert b"Fresh Item" in _load(client).data
+    assert cache.hits == 0
+
+
+def test_delete_item_invalidates_cache(client, db_session, cache):
+    item = add_test_item(db_session, title="Doomed Item")
+    db_session.commit()
+    assert b"Doomed Item" in _load(client).data
+
+    client.delete(
+        url_for("items.delete_item", item_id=item.id), headers={"HX-Request": "true"}
+    )
+    assert b"Doomed Item" not in _load(client).data
+
+
+def test_bulk_delete_invalidates_cache(db_session, cache):
+    generation = cache.generation
+    WatchlistItem.query.delete()
+    db_session.commit()
+    assert cache.generation == generation + 1
+
+
+def test_rolled_back_write_keeps_cache(db_session, cache):
+    generation = cache.generation
+    add_test_item(db_session, title="Never Saved")
+    db_session.flush()
+    db_session.rollback()
+    db_session.commit()
+    assert cache.generation == generation
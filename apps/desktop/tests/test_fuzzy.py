@@ -0,0 +1,137 @@
+# apps/desktop/tests/test_fuzzy.py
+from flask import url_for
+from sqlalchemy import event, select, text
+from src.core import db as main_db, fuzzy
+from src.core.routing import read_engine
+from src.core.models import WatchlistItem
+from tests.conftest import add_test_item
+
+
+def _indexed_trigrams(db_session, item_id):
+    rows = db_session.execute(
+        text(f"SELECT trigram FROM {fuzzy.TRIGRAMS_TABLE} WHERE item_id = :id"),
+        {"id": item_id},
+    )
+    return {row.trigram for row in rows}
+
+
+def _fuzzy_ids(db_session, term):
+    matches = fuzzy.match_subquery(term)
+    rows = db_session.execute(select(matches.c.item_id).order_by(matches.c.rank))
+    return [row.item_id for row in rows]
+
+
+def test_trigrams_follow_title_changes(db_session):
+    item = add_test_item(db_session, title="Alien")
+    db_session.commit()
+    assert _indexed_trigrams(db_session, item.id) == fuzzy._trigrams("Alien")
+
+    item.title = "Aliens"
+    db_session.commit()
+    assert _indexed_trigrams(db_session, item.id) == fuzzy._trigrams("Aliens")
+
+    db_session.delete(item)
+    db_session.commit()
+    assert _indexed_trigrams(db_session, item.id) == set()
+
+
+def test_rebuild_matches_incremental_trigrams(db_session):
+    item = add_test_item(db_session, title="The Grand Budapest Hotel")
+    db_session.commit()
+    incremental = _indexed_trigrams(db_session, item.id)
+
+    fuzzy.rebuild_trigrams(db_session.connection())
+    assert _indexed_trigrams(db_session, item.id) == incremental
+
+
+def test_similar_titles_rank_first(db_session):
+    shawshank = add_test_item(db_session, title="The Shawshank Redemption")
+    redemption = add_test_item(db_session, title="Redemption Day")
+    add_test_item(db_session, title="Casablanca")
+    db_session.commit()
+
+    assert _fuzzy_ids(db_session, "Shawshank Redmption") == [shawshank.id]
+    assert _fuzzy_ids(db_session, "Redemtion")[:2] == [redemption.id, shawshank.id]
+    assert fuzzy.match_subquery("   ") is None
+
+
+def test_fuzzy_lookup_seeks_trigram_index(db_session):
+    matches = fuzzy.match_subquery("Shawshank")
+    compiled = select(matches).compile(
+        dialect=main_db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = [
+        row.detail for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    ]
+    assert any(
+        step.startswith(f"SEARCH {fuzzy.TRIGRAMS_TABLE}") and "trigram=?" in step
+        for step in plan
+    ), plan
+    assert not any(step.startswith(f"SCAN {fuzzy.TRIGRAMS_TABLE}") for step in plan)
+
+
+def test_search_falls_back_to_similar_titles(client, db_session):
+    add_test_item(db_session, title="The Shawshank Redemption")
+    db_session.commit()
+
+    response = client.get(
+        url_for("main.load_watchlist", search="Shawshank Redmption"),
+        headers={"HX-Request": "true"},
+    )
+    content = response.data.decode()
+    assert "The Shawshank Redemption" in content
+    assert "Showing similar titles" in content
+
+
+def test_exact_matches_skip_fuzzy_fallback(client, db_session):
+    add_test_item(db_session, title="Heat")
+    add_test_item(db_session, title="Heal")
+    db_session.commit()
+
+    response = client.get(
+        url_for("main.load_watchlist", search="heat"), headers={"HX-Request": "true"}
+    )
+    content = response.data.decode()
+    assert "Heat" in content
+    assert "Heal" not in content
+    assert "Showing similar titles" not in content
+    assert WatchlistItem.query.count() == 2
+
+
+def test_filtered_out_matches_skip_fuzzy_fallback(client, db_session):
+    add_test_item(db_session, title="Alpha 3", year=2001)
+    add_test_item(db_session, title="Alpha 1", year=2005)
+    add_test_item(db_session, title="Alpha 5", year=2005)
+    db_session.commit()
+
+    response = client.get(
+        url_for("main.load_watchlist", search="alpha 3", filter_years=2005),
+        headers={"HX-Request": "true"},
+    )
+    content = response.data.decode()
+    assert "Alpha 1" not in content
+    assert "Alpha 5" not in content
+    assert "Showing similar titles" not in content
+
+
+def test_search_with_results_runs_no_fallback_probe(client, db_session):
+    add_test_item(db_session, title="Heat")
+    db_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(read_engine(main_db), "before_cursor_execute", record)
+    try:
+        response = client.get(
+            url_for("main.load_watchlist", search="heat"),
+            headers={"HX-Request": "true"},
+        )
+    finally:
+        event.remove(read_engine(main_db), "before_cursor_execute", record)
+
+    assert "Heat" in response.data.decode()
+    list_queries = [s for s in statements if "FROM watchlist_items" in s]
+    assert len(list_queries) == 2  # The page and its facet counts
@@ -0,0 +1,233 @@
+# apps/desktop/tests/test_importing.py
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from flask import url_for
+from sqlalchemy import text
+from src.core import db as main_db, facets, fuzzy, importing, search, schema
+from src.core.models import WatchlistItem
+
+DESKTOP_ROOT = Path(__file__).resolve().parent.parent
+
+# Imports 40 records in batches of 3 with two spawned workers. Spawned
+# workers import the script again, as __mp_main__.
+LAUNCHER = """
+import sys
+sys.path.insert(0, {root!r})
+from sqlalchemy import text
+from src.core import db as main_db, facets, fuzzy, importing, search, schema
+importing.IMPORT_BATCH_SIZE = 3
+importing.SERIAL_IMPORT_BATCHES = 1
+
+def main():
+    records = [{{"title": f"Title {{i}}", "type": "movie"}} for i in range(40)]
+    batches = importing.iter_processed_batches(records, 2)
+    print(sum(len(rows) for rows, report in batches))
+"""
+
+
+def _records(count):
+    records = []
+    for i in range(count):
+        record = {
+            "title": f"Title {i}",
+            "type": "movie",
+            "year": 1990 + i % 40,
+            "rating": i % 12,  # 0 and 11 are out of range
+            "date_added": "2024-01-01T00:00:00",
+            "date_watched": "2024-02-30" if i % 5 == 0 else "2024-02-01",
+        }
+        if i % 7 == 0:
+            del record["type"]  # Skipped
+        records.append(record)
+    return records
+
+
+@pytest.fixture()
+def small_batches(monkeypatch):
+    """Batches of 3 records and a pool from the second batch on."""
+    monkeypatch.setattr(importing, "IMPORT_BATCH_SIZE", 3)
+    monkeypatch.setattr(importing, "SERIAL_IMPORT_BATCHES", 1)
+
+
+def test_parallel_validation_matches_serial(small_batches):
+    records = _records(40)
+    serial = list(importing.iter_processed_batches(iter(records), workers=1))
+    parallel = list(importing.iter_processed_batches(iter(records), workers=2))
+    assert [rows for rows, _ in parallel] == [rows for rows, _ in serial]
+    assert [vars(report) for _, report in parallel] == [
+        vars(report) for _, report in serial
+    ]
+    assert sum(report.records for _, report in parallel) == 40
+    assert sum(report.skipped for _, report in parallel) == 6
+    titles = [row["title"] for rows, _ in parallel for row in rows]
+    assert titles == [r["title"] for r in records if "type" in r]
+
+
+def test_process_record_reports_problems():
+    report = importing.ImportReport()
+    row = importing.process_record(
+        {"title": "Heat", "type": "movie", "rating": "x", "year": 3000}, report
+    )
+    assert (row["rating"], row["year"]) == (None, None)
+    assert importing.process_record({"title": "No type"}, report) is None
+    assert {k: v for k, v in report.problems.items() if v} == {
+        "rating_invalid": 1,
+        "year_out_of_range": 1,
+        "missing_title_or_type": 1,
+    }
+    assert report.skipped == 1
+
+
+def test_report_keeps_capped_samples(monkeypatch):
+    monkeypatch.setattr(importing, "REPORT_SAMPLE_SIZE", 2)
+    report = importing.ImportReport()
+    for i in range(3):
+        batch = importing.ImportReport()
+        batch.records = 10
+        batch.add("year_invalid", f"Title {i}")
+        batch.add("year_invalid", f"Other {i}")
+        report.update(batch)
+    assert report.problems["year_invalid"] == 6
+    assert report.samples["year_invalid"] == ["Title 0", "Other 0"]
+    assert report.summary() == (
+        "30 records read, 0 skipped.\n"
+        "Invalid year, set to none: 6\n"
+        "  e.g. 'Title 0', 'Other 0' ..."
+    )
+
+
+def test_parallel_import_keeps_order_and_skip_count(
+    client, db_session, app, monkeypatch, small_batches
+):
+    monkeypatch.setitem(app.config, "IMPORT_WORKERS", 2)
+    records = _records(40)
+    response = client.post(
+        url_for("settings.import_data_json"),
+        data={"backup_file": (io.BytesIO(json.dumps(records).encode()), "big.json")},
+        content_type="multipart/form-data",
+        follow_redirects=True,
+    )
+    assert b"34 items imported successfully." in response.data
+    assert b"6 items were skipped" in response.data
+    titles = [item.title for item in WatchlistItem.query.order_by(WatchlistItem.id)]
+    assert titles == [r["title"] for r in records if "type" in r]
+
+
+def test_import_problems_are_logged_once_and_downloadable(client, db_session, caplog):
+    records = _records(40)
+    response = client.post(
+        url_for("settings.import_data_json"),
+        data={"backup_file": (io.BytesIO(json.dumps(records).encode()), "big.json")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 302
+    warnings = [r for r in caplog.records if r.levelname == "WARNING"]
+    assert len(warnings) == 1
+    assert "Skipped, missing title or type: 6" in warnings[0].getMessage()
+
+    page = client.get(response.headers["Location"])
+    assert b"Download report" in page.data
+    report_id = response.headers["Location"].rsplit("report=", 1)[1]
+    report = client.get(url_for("settings.download_import_report", report_id=report_id))
+    assert b"40 records read, 6 skipped." in report.data
+    assert b"Invalid date watched, set to none: 6" in report.data
+    report.close()
+
+
+def test_import_report_route_rejects_unknown_ids(client):
+    for report_id in ["0" * 32, "..%2Fdatabase"]:
+        url = f"/settings/import_reports/{report_id}"
+        assert client.get(url).status_code == 404
+
+
+def _run_launcher(tmp_path, guarded):
+    source = LAUNCHER.format(root=str(DESKTOP_ROOT))
+    source += 'if __name__ == "__main__":\n    main()\n' if guarded else "main()\n"
+    script = tmp_path / "launcher.py"
+    script.write_text(source)
+    return subprocess.run(
+        [sys.executable, str(script)],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+
+
+def test_pooled_import_from_guarded_script(tmp_path):
+    result = _run_launcher(tmp_path, guarded=True)
+    assert result.stdout.split() == ["40"]
+    assert "worker pool stopped" not in result.stderr
+
+
+def test_broken_pool_falls_back_to_this_process(tmp_path):
+    # Unguarded, each worker runs the import again and dies starting its own
+    result = _run_launcher(tmp_path, guarded=False)
+    assert result.stdout.split()[-1] == "40"
+    assert "worker pool stopped" in result.stderr
+
+
+def test_run_script_starts_nothing_when_imported():
+    run_script = DESKTOP_ROOT.parent.parent / "scripts" / "run.py"
+    code = (
+        "import runpy, sys\n"
+        "runpy.run_path(sys.argv[1], run_name='__mp_main__')\n"
+        "print('imported')\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(run_script)],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    assert result.stdout.split() == ["imported"]
+
+
+def _trigger_and_index_names():
+    rows = main_db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type IN ('trigger', 'index')")
+    )
+    return set(rows.scalars())
+
+
+def _import(client, records, filename="backup.json", mode="replace"):
+    return client.post(
+        url_for("settings.import_data_json"),
+        data={
+            "backup_file": (io.BytesIO(json.dumps(records).encode()), filename),
+            "mode": mode,
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def test_replace_import_rebuilds_derived_tables(client, db_session):
+    schema_objects = _trigger_and_index_names()
+    _import(client, [{"title": "Stalker", "type": "movie", "year": 1979}])
+    _import(client, [{"title": "Solaris", "type": "movie", "year": 1972}])
+
+    assert _trigger_and_index_names() == schema_objects
+    fts = search.match_subquery("solaris")
+    assert len(db_session.execute(fts.select()).all()) == 1
+    assert len(db_session.execute(search.match_subquery("stalker").select()).all()) == 0
+    indexed = db_session.execute(
+        text(f"SELECT count(*) FROM {fuzzy.TRIGRAMS_TABLE}")
+    ).scalar()
+    assert indexed == len(fuzzy._trigrams("Solaris"))
+    assert facets.get_facets()["year"] == {1972: 1}
+
+    # The triggers are back for writes after the import
+    _import(client, [{"title": "Mirror", "type": "movie"}], mode="merge")
+    assert len(db_session.execute(search.match_subquery("mirror").select()).all()) == 1
+
+
+def test_failed_import_keeps_triggers(client, db_session):
+    schema_objects = _trigger_and_index_names()
+    response = _import(client, "not a list of records")
+    assert response.status_code == 302
+    assert _trigger_and_index_names() == schema_objects
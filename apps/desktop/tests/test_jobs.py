@@ -0,0 +1,243 @@
+# apps/desktop/tests/test_jobs.py
+import gzip
+import io
+import json
+import os
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+from flask import url_for
+from sqlalchemy import insert
+from src.core import db as main_db, jobs
+from src.core.fragment_cache import get_fragment_cache
+from src.core.models import Job, WatchlistItem
+from tests.conftest import add_test_item
+
+
+@pytest.fixture()
+def jobs_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "JOBS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _started_job_id(response):
+    assert response.status_code == 302
+    return parse_qs(urlparse(response.headers["Location"]).query)["job"][0]
+
+
+def _finished_job(job_id):
+    jobs.get_job_runner().wait(job_id, timeout=10)
+    main_db.session.expire_all()
+    return main_db.session.get(Job, job_id)
+
+
+def test_export_job_produces_download(client, db_session, jobs_dir):
+    add_test_item(db_session, title="Exported Item")
+    db_session.commit()
+
+    job_id = _started_job_id(client.post(url_for("settings.start_export_job")))
+    job = _finished_job(job_id)
+    assert job.status == "succeeded"
+    assert job.rows_processed == 1
+
+    status = client.get(url_for("settings.job_status", job_id=job_id))
+    assert b"1 items exported." in status.data
+    assert b"every 1s" not in status.data  # Finished jobs stop polling
+    download_url = url_for("settings.download_job_artifact", job_id=job_id)
+    assert download_url.encode() in status.data
+
+    download = client.get(download_url)
+    assert download.status_code == 200
+    assert "attachment" in download.headers["Content-Disposition"]
+    assert json.loads(download.data)[0]["title"] == "Exported Item"
+    download.close()
+
+
+def test_export_job_in_gzipped_ndjson(client, db_session, jobs_dir):
+    add_test_item(db_session, title="Compressed Item")
+    db_session.commit()
+
+    response = client.post(
+        url_for("settings.start_export_job"), data={"format": "ndjson.gz"}
+    )
+    job = _finished_job(_started_job_id(response))
+    assert job.artifact_path.endswith(".ndjson.gz")
+
+    download = client.get(url_for("settings.download_job_artifact", job_id=job.id))
+    assert download.headers["Content-Disposition"].endswith(".ndjson.gz")
+    record = json.loads(gzip.decompress(download.data).splitlines()[0])
+    assert record["title"] == "Compressed Item"
+    download.close()
+
+
+def test_import_job_replaces_items(client, db_session, jobs_dir):
+    add_test_item(db_session, title="Old Item")
+    db_session.commit()
+    backup = [{"title": "New A", "type": "movie"}, {"type": "tv"}]
+    data = {"backup_file": (io.BytesIO(json.dumps(backup).encode()), "b.json")}
+
+    job_id = _started_job_id(
+        client.post(
+            url_for("settings.start_import_job"),
+            data=data,
+            content_type="multipart/form-data",
+        )
+    )
+    job = _finished_job(job_id)
+    assert job.status == "succeeded"
+    assert job.message == (
+        "1 items imported successfully. "
+        "1 items were skipped due to missing/invalid data."
+    )
+    assert job.rows_processed == 2
+    assert [item.title for item in WatchlistItem.query] == ["New A"]
+    # The upload is removed, a report of the skipped record is kept
+    assert list(jobs_dir.iterdir()) == [jobs_dir / f"{job_id}-import-report.txt"]
+
+    page = client.get(url_for("settings.show_settings", job=job_id))
+    assert b"1 items imported successfully." in page.data
+    report_url = url_for("settings.download_import_report", report_id=job_id)
+    assert report_url.encode() in page.data
+    report = client.get(report_url)
+    assert b"Skipped, missing title or type: 1" in report.data
+    report.close()
+
+
+def test_failed_import_job_keeps_items(client, db_session, jobs_dir):
+    add_test_item(db_session, title="Survivor")
+    db_session.commit()
+    data = {"backup_file": (io.BytesIO(b'[{"title": "Broken"'), "b.json")}
+
+    job_id = _started_job_id(
+        client.post(
+            url_for("settings.start_import_job"),
+            data=data,
+            content_type="multipart/form-data",
+        )
+    )
+    job = _finished_job(job_id)
+    assert job.status == "failed"
+    assert job.message == "Invalid JSON file. Please upload a valid backup."
+    assert [item.title for item in WatchlistItem.query] == ["Survivor"]
+
+    status = client.get(url_for("settings.job_status", job_id=job_id))
+    assert b"Import failed: Invalid JSON file." in status.data
+    download = client.get(url_for("settings.download_job_artifact", job_id=job_id))
+    assert download.status_code == 404
+
+
+def test_running_job_reports_live_progress(app, client, jobs_dir):
+    release = threading.Event()
+
+    def slow_job(progress):
+        progress.add(42)
+        release.wait(10)
+        return "Done.", None
+
+    with app.app_context():
+        runner = jobs.get_job_runner()
+        job_id = runner.submit("export", slow_job)
+        try:
+            for _ in range(100):  # Until the job has picked up its thread
+                progress = runner.progress(job_id)
+                if progress is not None and progress.rows_processed:
+                    break
+                threading.Event().wait(0.01)
+            status = client.get(url_for("settings.job_status", job_id=job_id))
+            assert b"42 rows processed" in status.data
+            assert b'hx-trigger="every 1s"' in status.data
+        finally:
+            release.set()
+            runner.wait(job_id, timeout=10)
+
+
+def test_job_bookkeeping_keeps_fragment_cache(app, db_session, jobs_dir):
+    cache = get_fragment_cache()
+    generation = cache.generation
+    job_id = jobs.get_job_runner().submit("export", lambda progress: ("Done.", None))
+    assert _finished_job(job_id).status == "succeeded"
+    assert cache.generation == generation
+
+
+def test_jobs_run_while_an_import_holds_the_writer(app, client, db_session, jobs_dir):
+    add_test_item(db_session, title="Exported Item")
+    db_session.commit()
+    holding = threading.Event()
+    release = threading.Event()
+
+    def long_import(progress):
+        # Flushing takes the single writer connection until the commit
+        main_db.session.add(WatchlistItem(title="Imported", type="movie"))
+        main_db.session.flush()
+        holding.set()
+        release.wait(10)
+        main_db.session.commit()
+        return "Imported.", None
+
+    runner = jobs.get_job_runner()
+    import_id = runner.submit("import", long_import)
+    try:
+        assert holding.wait(10)
+        export_id = _started_job_id(client.post(url_for("settings.start_export_job")))
+        export = _finished_job(export_id)
+        assert export.status == "succeeded"
+        assert export.rows_processed == 1
+        assert main_db.session.get(Job, import_id).status == "running"
+    finally:
+        release.set()
+        runner.wait(import_id, timeout=10)
+    assert _finished_job(import_id).status == "succeeded"
+
+
+def test_interrupted_jobs_fail_on_startup(app, db_session):
+    db_session.execute(
+        insert(Job.__table__).values(id="interrupted", kind="import", status="running")
+    )
+    db_session.commit()
+
+    jobs.recover_interrupted_jobs()
+    db_session.expire_all()
+    job = db_session.get(Job, "interrupted")
+    assert job.status == "failed"
+    assert job.message == "Interrupted by an application restart."
+    db_session.delete(job)
+    db_session.commit()
+
+
+def test_finished_jobs_are_pruned_after_retention(app, db_session, jobs_dir):
+    now = datetime.now(timezone.utc)
+    old_artifact = jobs_dir / "old.json"
+    recent_artifact = jobs_dir / "recent.json"
+    stray_report = jobs_dir / "stray-import-report.txt"
+    for path in (old_artifact, recent_artifact, stray_report):
+        path.write_text("{}")
+    day_ago = time.time() - 25 * 3600
+    os.utime(stray_report, (day_ago, day_ago))
+    for job_id, finished_at, path in [
+        ("old", now - timedelta(hours=25), old_artifact),
+        ("recent", now - timedelta(hours=1), recent_artifact),
+    ]:
+        db_session.execute(
+            insert(Job.__table__).values(
+                id=job_id,
+                kind="export",
+                status="succeeded",
+                artifact_path=str(path),
+                finished_at=finished_at,
+            )
+        )
+    db_session.commit()
+
+    jobs.recover_interrupted_jobs()
+    db_session.expire_all()
+    assert db_session.get(Job, "old") is None
+    assert db_session.get(Job, "recent") is not None
+    assert sorted(path.name for path in jobs_dir.iterdir()) == ["recent.json"]
+    db_session.query(Job).delete()
+    db_session.commit()
+
+
+def test_unknown_job_is_404(client):
+    assert client.get(url_for("settings.job_status", job_id="nope")).status_code == 404
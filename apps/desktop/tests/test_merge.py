@@ -0,0 +1,113 @@
+# apps/desktop/tests/test_merge.py
+import pytest
+from datetime import date, datetime
+from sqlalchemy import select, text
+from src.core import db as main_db, merge
+from src.core.merge import ImportMerger
+from src.core.models import WatchlistItem
+from tests.conftest import add_test_item
+
+
+def _row(**values):
+    row = {field: None for field in merge.MERGED_FIELDS}
+    row.update(type="movie", status="Watched", date_added=datetime(2024, 1, 1))
+    row.update(values)
+    return row
+
+
+def _merge(db_session, *batches):
+    merger = ImportMerger()
+    for rows in batches:
+        merger.merge(rows)
+    db_session.commit()
+    db_session.expire_all()
+    return merger.inserted, merger.updated, merger.unchanged
+
+
+def test_title_key_folds_like_sqlite():
+    assert merge.title_key("  The MATRIX ") == "the matrix"
+    assert merge.title_key("ÉCOLE") == "École"  # SQLite's lower() is ASCII only
+
+
+def test_matches_on_external_ids(db_session):
+    by_imdb = add_test_item(db_session, title="Heat", imdb_id="tt0113277")
+    by_tmdb = add_test_item(db_session, title="Alien", tmdb_id="348")
+    by_boxd = add_test_item(db_session, title="Ran", boxd_id="29Ns")
+    db_session.commit()
+
+    counts = _merge(
+        db_session,
+        [
+            _row(title="Heat (1995)", imdb_id="tt0113277"),
+            _row(title="Alien", tmdb_id="348", rating=9),
+            _row(title="Ran", boxd_id="29Ns"),
+            # TMDb IDs are only unique per type
+            _row(title="Some Show", type="tv", tmdb_id="348"),
+        ],
+    )
+    assert counts == (1, 2, 1)
+    assert by_imdb.title == "Heat (1995)"
+    assert by_tmdb.rating == 9
+    assert by_boxd.title == "Ran"
+    assert WatchlistItem.query.count() == 4
+
+
+def test_matches_on_normalized_title_year_and_type(db_session):
+    item = add_test_item(db_session, title="The Matrix", year=1999)
+    add_test_item(db_session, title="The Matrix", year=1999, type="tv")
+    db_session.commit()
+
+    counts = _merge(
+        db_session,
+        [_row(title=" the matrix ", year=1999, date_watched=date(2024, 2, 2))],
+    )
+    assert counts == (0, 1, 0)
+    assert item.title == " the matrix "
+    assert item.date_watched == date(2024, 2, 2)
+    assert WatchlistItem.query.count() == 2
+
+
+def test_unchanged_rows_are_not_written(db_session):
+    item = add_test_item(db_session, title="Heat", year=1995, imdb_id="tt0113277")
+    db_session.commit()
+    modified = item.date_modified
+
+    counts = _merge(
+        db_session,
+        [_row(title="Heat", year=1995, imdb_id="tt0113277", status="Watched")],
+    )
+    assert counts == (0, 0, 1)
+    assert item.date_modified == modified
+
+
+def test_duplicates_in_one_import_collapse(db_session):
+    counts = _merge(
+        db_session,
+        [
+            _row(title="Heat", imdb_id="tt0113277"),
+            _row(title="Heat", imdb_id="tt0113277", rating=8),
+        ],
+        [_row(title="Heat", imdb_id="tt0113277", rating=8)],
+    )
+    assert counts == (1, 1, 1)
+    assert [(i.title, i.rating) for i in WatchlistItem.query] == [("Heat", 8)]
+
+
+@pytest.mark.parametrize(
+    "expression, index",
+    [
+        (WatchlistItem.imdb_id, "ix_watchlist_items_imdb_id"),
+        (WatchlistItem.tmdb_id, "ix_watchlist_items_tmdb_id"),
+        (WatchlistItem.boxd_id, "ix_watchlist_items_boxd_id"),
+        (merge._TITLE_KEY, "ix_watchlist_items_title_key"),
+    ],
+)
+def test_lookups_use_match_indexes(db_session, expression, index):
+    query = select(WatchlistItem.id).where(expression.in_(["a", "b"]))
+    compiled = query.compile(
+        dialect=main_db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = [
+        row.detail for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    ]
+    assert any(step.startswith("SEARCH") and index in step for step in plan), plan
@@ -0,0 +1,124 @@
+# apps/desktop/tests/test_pagination.py
+import pytest
+from datetime import date, datetime, timezone
+from flask import url_for
+from src.core.models import WatchlistItem
+from src.core.pagination import decode_cursor, encode_cursor, keyset_paginate
+from src.core.routes.main import _apply_sorting_to_query
+from src.core.sorting import get_sort_expression
+from tests.conftest import add_test_item
+
+SORTS = [
+    (sort_by, sort_order)
+    for sort_by in ["date_watched", "date_added", "title", "year", "rating"]
+    for sort_order in ["asc", "desc"]
+]
+
+
+@pytest.fixture()
+def seeded_items(db_session):
+    """Seven items with duplicate and missing sort values to exercise ties."""
+    rows = [
+        ("Echo", 2001, 7, date(2023, 5, 1)),
+        ("alpha", None, None, None),
+        ("Delta", 2001, 7, date(2023, 5, 1)),
+        ("Bravo", 1999, 9, date(2022, 1, 1)),
+        ("charlie", None, 3, None),
+        ("Foxtrot", 2010, None, date(2024, 2, 2)),
+        ("Golf", 1999, 9, date(2022, 1, 1)),
+    ]
+    for i, (title, year, rating, watched) in enumerate(rows):
+        add_test_item(
+            db_session,
+            title=title,
+            year=year,
+            rating=rating,
+            date_watched=watched,
+            date_added=datetime(2024, 1, 1 + i % 3, tzinfo=timezone.utc),
+        )
+    db_session.commit()
+
+
+def _walk(sort_by, sort_order, per_page):
+    """Follows next cursors to the end, then prev cursors back to the start."""
+    sort_expression, descending = get_sort_expression(sort_by, sort_order)
+
+    def fetch(cursor):
+        return keyset_paginate(
+            WatchlistItem.query,
+            sort_expression,
+            descending,
+            sort_by,
+            sort_order,
+            per_page,
+            decode_cursor(cursor, sort_by, sort_order),
+        )
+
+    forward = [fetch(None)]
+    while forward[-1].has_next:
+        forward.append(fetch(forward[-1].next_cursor))
+    backward = [forward[-1]]
+    while backward[-1].has_prev:
+        backward.append(fetch(backward[-1].prev_cursor))
+    return forward, backward[::-1]
+
+
+@pytest.mark.parametrize("sort_by, sort_order", SORTS)
+def test_keyset_pages_match_offset_order(db_session, seeded_items, sort_by, sort_order):
+    expected = [
+        item.id
+        for item in _apply_sorting_to_query(
+            WatchlistItem.query, sort_by, sort_order
+        ).all()
+    ]
+    forward, backward = _walk(sort_by, sort_order, per_page=3)
+
+    assert [item.id for page in forward for item in page.items] == expected
+    assert [page.page for page in forward] == [1, 2, 3]
+    assert not forward[0].has_prev
+    # Walking back lands on exactly the same pages
+    assert [[i.id for i in p.items] for p in backward] == [
+        [i.id for i in p.items] for p in forward
+    ]
+
+
+def test_decode_cursor_rejects_other_sort(app):
+    with app.app_context():
+        token = encode_cursor("title", "asc", ("abc", 5), "next", 2)
+        assert decode_cursor(token, "title", "asc") == (("abc", 5), "next", 2)
+        assert decode_cursor(token, "title", "desc") is None
+        assert decode_cursor(token, "year", "asc") is None
+
+
+def test_decode_cursor_rejects_tampering(app):
+    with app.app_context():
+        token = encode_cursor("year", "desc", (2001, 5), "next", 2)
+        assert decode_cursor(token[:-2] + "xx", "year", "desc") is None
+        assert decode_cursor("garbage", "year", "desc") is None
+
+
+def test_load_watchlist_follows_cursor(client, db_session, seeded_items):
+    with client.session_transaction() as sess:
+        sess["pagination_size"] = 10
+    for i in range(5):
+        add_test_item(db_session, title=f"Extra {i}")
+    db_session.commit()
+
+    response = client.get(
+        url_for("main.load_watchlist", sort="title", order="asc"),
+        headers={"HX-Request": "true"},
+    )
+    content = response.data.decode()
+    assert "Page 1" in content
+    assert "Foxtrot" not in content
+    cursor = content.split("?cursor=")[1].split("&")[0]
+
+    response = client.get(
+        url_for("main.load_watchlist", sort="title", order="asc", cursor=cursor),
+        headers={"HX-Request": "true"},
+    )
+    content = response.data.decode()
+    assert "Page 2" in content
+    assert "Foxtrot" in content
+    assert "Golf" in content
+    assert "alpha" not in content
@@ -0,0 +1,35 @@
+# apps/desktop/tests/test_pragmas.py
+import pytest
+from sqlalchemy import text
+from src.core import db as main_db
+from src.core.pragmas import pragmas_from_env
+
+
+def test_profile_is_applied_to_connections(app):
+    with main_db.engine.connect() as connection:
+
+        def pragma(name):
+            return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("temp_store") == 2  # MEMORY
+        assert pragma("busy_timeout") == int(
+            app.config["SQLITE_PRAGMAS"]["busy_timeout"]
+        )
+        assert pragma("cache_size") == int(app.config["SQLITE_PRAGMAS"]["cache_size"])
+
+
+def test_env_overrides_profile():
+    defaults = {"journal_mode": "WAL", "cache_size": -2000}
+    environ = {"SQLITE_CACHE_SIZE": " -131072 ", "SQLITE_JOURNAL": "DELETE"}
+    assert pragmas_from_env(defaults, environ) == {
+        "journal_mode": "WAL",
+        "cache_size": "-131072",
+    }
+
+
+@pytest.mark.parametrize("value", ["", "1; DROP TABLE watchlist_items", "'wal'"])
+def test_env_values_must_be_plain(value):
+    with pytest.raises(ValueError, match="journal_mode"):
+        pragmas_from_env({"journal_mode": "WAL"}, {"SQLITE_JOURNAL_MODE": value})
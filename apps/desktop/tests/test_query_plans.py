@@ -0,0 +1,70 @@
+# apps/desktop/tests/test_query_plans.py
+import pytest
+from datetime import date, datetime
+from sqlalchemy import text
+from src.core import db as main_db
+from src.core.models import WatchlistItem
+from src.core.pagination import seek_query
+from src.core.routes.main import _apply_sorting_to_query
+from src.core.sorting import SORT_COLUMNS, get_sort_expression
+
+# Year and rating filters are left out: they match ranges or lists of values,
+# which no index can combine with the sort order, and select few rows anyway
+VIEWS = [
+    (sort_by, sort_order, status, item_type)
+    for sort_by in SORT_COLUMNS
+    for sort_order in ["desc", "asc"]
+    for status in [None, "Watched", "Plan to Watch"]
+    for item_type in [None, "movie"]
+]
+
+# A boundary key of the right type for each sort, as a cursor would carry
+BOUNDARY_VALUES = {
+    "date_watched": date(2023, 1, 1),
+    "date_added": datetime(2023, 1, 1, 12, 0),
+    "title": "m",
+    "year": 2000,
+    "rating": 5,
+}
+
+
+def _query_plan(query):
+    compiled = query.statement.compile(
+        dialect=main_db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = main_db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    return [row.detail for row in rows]
+
+
+def _base_query(status, item_type):
+    query = WatchlistItem.query
+    if status is not None:
+        query = query.filter(WatchlistItem.status == status)
+    if item_type is not None:
+        query = query.filter(WatchlistItem.type == item_type)
+    return query
+
+
+@pytest.mark.parametrize("sort_by, sort_order, status, item_type", VIEWS)
+def test_list_query_uses_sort_index(db_session, sort_by, sort_order, status, item_type):
+    query = _apply_sorting_to_query(_base_query(status, item_type), sort_by, sort_order)
+    plan = _query_plan(query.limit(15))
+
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert any("USING INDEX" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("sort_by, sort_order, status, item_type", VIEWS)
+def test_keyset_query_seeks_sort_index(
+    db_session, sort_by, sort_order, status, item_type
+):
+    sort_expression, descending = get_sort_expression(sort_by, sort_order)
+    key = (BOUNDARY_VALUES[sort_by], 42)
+    query = seek_query(_base_query(status, item_type), sort_expression, descending, key)
+    plan = _query_plan(query.limit(16))
+
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    # The boundary becomes a range constraint, not a scan from the start
+    assert any(
+        step.startswith("SEARCH") and ("<" in step or ">" in step) for step in plan
+    ), plan
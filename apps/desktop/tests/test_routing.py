@@ -0,0 +1,80 @@
+# apps/desktop/tests/test_routing.py
+import pytest
+from flask import url_for
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.exc import OperationalError
+from src.core import db as main_db
+from src.core.database import BUSY_MESSAGE
+from src.core.models import WatchlistItem
+from src.core.routing import READ_BIND, read_engine
+from tests.conftest import add_test_item
+
+
+def _engines_used(db_session, work):
+    used = []
+
+    def record(conn, *args):
+        used.append("read" if conn.engine is read_engine(main_db) else "write")
+
+    for engine in main_db.engines.values():
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        work()
+    finally:
+        for engine in main_db.engines.values():
+            event.remove(engine, "before_cursor_execute", record)
+    return used
+
+
+def test_reads_use_readers_until_the_transaction_writes(db_session):
+    def work():
+        db_session.execute(select(WatchlistItem.id)).all()
+        add_test_item(db_session, title="Written")
+        db_session.flush()
+        # Reads its own uncommitted write
+        titles = db_session.execute(select(WatchlistItem.title)).scalars().all()
+        assert titles == ["Written"]
+        db_session.commit()
+        db_session.execute(select(WatchlistItem.id)).all()
+
+    assert _engines_used(db_session, work) == ["read", "write", "write", "read"]
+
+
+def test_readers_cannot_write(app):
+    with read_engine(main_db).connect() as connection:
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(insert(WatchlistItem.__table__), {"title": "x"})
+
+
+def test_single_writer_connection(app):
+    assert main_db.engine.pool.size() == 1
+    assert READ_BIND in main_db.engines
+
+
+def test_pages_load_while_a_write_is_in_flight(client, db_session):
+    add_test_item(db_session, title="Committed")
+    db_session.commit()
+    with main_db.engine.connect() as writer:
+        writer.execute(text("BEGIN IMMEDIATE"))  # Holds the write lock
+        writer.execute(
+            insert(WatchlistItem.__table__),
+            {"title": "Uncommitted", "type": "movie", "status": "Watched"},
+        )
+        response = client.get(url_for("main.load_watchlist"))
+        writer.rollback()
+    assert response.status_code == 200
+    assert b"Committed" in response.data
+    assert b"Uncommitted" not in response.data
+
+
+def test_writes_report_busy_while_the_writer_is_taken(client, db_session, monkeypatch):
+    monkeypatch.setattr(main_db.engine.pool, "_timeout", 0.1)  # DATABASE_POOL_TIMEOUT
+    with main_db.engine.connect():  # Takes the single writer connection
+        response = client.post(
+            url_for("items.save_item"),
+            data={"title": "Queued", "type": "movie", "status": "Watched"},
+            headers={"HX-Request": "true"},
+        )
+    assert response.status_code == 503
+    assert response.headers["X-HX-Alert"] == BUSY_MESSAGE
+    assert WatchlistItem.query.count() == 0
@@ -0,0 +1,101 @@
+# apps/desktop/tests/test_schema_version.py
+import subprocess
+import sys
+from pathlib import Path
+import flask_migrate
+from sqlalchemy import text
+from src.core import schema_version
+
+FIRST = '''"""Initial migration
+
+Revision ID: 1a2b3c
+Revises:
+"""
+revision = '1a2b3c'
+down_revision = None
+'''
+
+SECOND = '''"""Add notes
+
+Revision ID: 4d5e6f
+Revises: 1a2b3c
+"""
+from typing import Sequence, Union
+
+revision: str = "4d5e6f"
+down_revision: Union[str, None] = "1a2b3c"
+'''
+
+BRANCH = """revision = '7a8b9c'
+down_revision = '1a2b3c'
+"""
+
+MERGE = """revision = 'aabbcc'
+down_revision = ('4d5e6f', '7a8b9c')
+"""
+
+
+def _scripts(tmp_path, *sources):
+    versions = tmp_path / "versions"
+    versions.mkdir()
+    for i, source in enumerate(sources):
+        (versions / f"{i}_script.py").write_text(source)
+    return tmp_path
+
+
+def test_head_revisions(tmp_path):
+    assert schema_version.head_revisions(tmp_path) == set()
+    directory = _scripts(tmp_path, FIRST, SECOND, BRANCH)
+    assert schema_version.head_revisions(directory) == {"4d5e6f", "7a8b9c"}
+    (directory / "versions" / "9_merge.py").write_text(MERGE)
+    assert schema_version.head_revisions(directory) == {"aabbcc"}
+    (directory / "versions" / "10_odd.py").write_text("REVISION = make_id()\n")
+    assert schema_version.head_revisions(directory) is None
+
+
+def test_upgrade_only_runs_when_revisions_differ(
+    app, db_session, tmp_path, monkeypatch
+):
+    upgrades = []
+    monkeypatch.setattr(flask_migrate, "upgrade", lambda directory: upgrades.append(1))
+    monkeypatch.setitem(app.config, "MIGRATIONS_DIR", str(tmp_path))
+    _scripts(tmp_path, FIRST, SECOND)
+
+    assert schema_version.stored_revisions() == set()
+    assert schema_version.upgrade_if_needed() is True
+    assert len(upgrades) == 1
+
+    db_session.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+    db_session.execute(text("INSERT INTO alembic_version VALUES ('4d5e6f')"))
+    db_session.commit()
+    try:
+        assert schema_version.stored_revisions() == {"4d5e6f"}
+        assert schema_version.upgrade_if_needed() is False
+        assert len(upgrades) == 1
+    finally:
+        db_session.execute(text("DROP TABLE alembic_version"))
+        db_session.commit()
+
+
+def test_create_app_defers_flask_migrate(app):
+    code = (
+        "import sys\n"
+        "from src.core import create_app\n"
+        "create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1]})\n"
+        "print('alembic' in sys.modules, 'flask_migrate' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, app.config["SQLALCHEMY_DATABASE_URI"]],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_db_commands_load_flask_migrate(app):
+    result = app.test_cli_runner().invoke(args=["db", "--help"])
+    assert result.exit_code == 0
+    assert "upgrade" in result.output
+    assert "migrate" in app.extensions
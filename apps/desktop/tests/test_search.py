@@ -0,0 +1,93 @@
+# apps/desktop/tests/test_search.py
+from sqlalchemy import text
+from src.core import db as main_db, search
+from src.core.models import WatchlistItem
+from tests.conftest import add_test_item
+
+
+def _matching_ids(search_term):
+    matches = search.match_subquery(search_term)
+    rows = main_db.session.execute(
+        main_db.select(matches.c.item_id).order_by(matches.c.rank)
+    )
+    return [row.item_id for row in rows]
+
+
+def test_build_match_expression_prefix_tokens():
+    assert search.build_match_expression("Shaw Red") == '"shaw"* "red"*'
+
+
+def test_build_match_expression_quotes_operators():
+    # FTS5 syntax typed by the user must not be interpreted
+    assert search.build_match_expression('star AND "wars') == '"star"* "and"* "wars"*'
+
+
+def test_build_match_expression_empty():
+    assert search.build_match_expression("  ") is None
+    assert search.build_match_expression("?!") is None
+
+
+def test_match_prefix_in_title(db_session):
+    item = add_test_item(db_session, title="The Shawshank Redemption")
+    add_test_item(db_session, title="Heat")
+    db_session.commit()
+
+    assert _matching_ids("shawsh") == [item.id]
+    assert _matching_ids("redemp shaw") == [item.id]
+
+
+def test_match_overview_and_notes(db_session):
+    by_overview = add_test_item(db_session, title="Alien", overview="Space horror")
+    by_notes = add_test_item(db_session, title="Aliens", notes="Better in space")
+    db_session.commit()
+
+    assert sorted(_matching_ids("space")) == sorted([by_overview.id, by_notes.id])
+
+
+def test_title_match_ranks_above_notes_match(db_session):
+    in_notes = add_test_item(db_session, title="Arrival", notes="Reminded me of Dune")
+    in_title = add_test_item(db_session, title="Dune")
+    db_session.commit()
+
+    assert _matching_ids("dune") == [in_title.id, in_notes.id]
+
+
+def test_index_follows_updates_and_deletes(db_session):
+    item = add_test_item(db_session, title="Old Title")
+    db_session.commit()
+
+    item.title = "New Title"
+    db_session.commit()
+    assert _matching_ids("old") == []
+    assert _matching_ids("new") == [item.id]
+
+    db_session.delete(item)
+    db_session.commit()
+    assert _matching_ids("new") == []
+
+
+def test_index_follows_bulk_delete(db_session):
+    add_test_item(db_session, title="Bulk Deleted")
+    db_session.commit()
+
+    WatchlistItem.query.delete()
+    db_session.commit()
+    assert _matching_ids("bulk") == []
+
+
+def test_rebuild_command(runner, db_session):
+    item = add_test_item(db_session, title="Rebuilt Item")
+    db_session.commit()
+    # Simulate an index that has drifted from the table
+    db_session.execute(
+        text(
+            f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES ('delete-all')"
+        )
+    )
+    db_session.commit()
+    assert _matching_ids("rebuilt") == []
+
+    result = runner.invoke(args=["search", "rebuild"])
+    assert result.exit_code == 0
+    assert "1 items indexed" in result.output
+    assert _matching_ids("rebuilt") == [item.id]
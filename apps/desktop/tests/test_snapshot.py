@@ -0,0 +1,135 @@
+# apps/desktop/tests/test_snapshot.py
+import io
+import sqlite3
+import pytest
+from contextlib import closing
+from flask import url_for
+from src.core import snapshot
+from src.core.fragment_cache import get_fragment_cache
+from src.core.models import WatchlistItem
+from src.core.suggest import get_title_index
+from tests.conftest import add_test_item
+
+
+def _snapshot_titles(path):
+    with closing(sqlite3.connect(path)) as connection:
+        rows = connection.execute("SELECT title FROM watchlist_items ORDER BY id")
+        return [row[0] for row in rows]
+
+
+def test_snapshot_is_consistent_copy(db_session, tmp_path):
+    add_test_item(db_session, title="Snapshotted")
+    db_session.commit()
+
+    path = snapshot.create_snapshot(tmp_path / "copy.db")
+    assert _snapshot_titles(path) == ["Snapshotted"]
+    assert list(tmp_path.iterdir()) == [path]  # No partial file left behind
+    snapshot.validate_snapshot(path)
+
+    # Overwrites an existing file
+    add_test_item(db_session, title="Second")
+    db_session.commit()
+    snapshot.create_snapshot(path)
+    assert _snapshot_titles(path) == ["Snapshotted", "Second"]
+
+
+def test_restore_replaces_database_and_caches(db_session, tmp_path):
+    add_test_item(db_session, title="Original")
+    db_session.commit()
+    path = snapshot.create_snapshot(tmp_path / "copy.db")
+
+    WatchlistItem.query.delete()
+    add_test_item(db_session, title="Changed")
+    db_session.commit()
+    title_index = get_title_index()
+    assert title_index.suggest("cha", 8) == ["Changed"]
+    generation = get_fragment_cache().generation
+
+    snapshot.restore_snapshot(path)
+    assert [item.title for item in WatchlistItem.query] == ["Original"]
+    assert get_fragment_cache().generation > generation
+    assert title_index.suggest("cha", 8) == []
+    assert title_index.suggest("ori", 8) == ["Original"]
+
+
+def test_validate_rejects_other_files(app, tmp_path):
+    not_sqlite = tmp_path / "notes.db"
+    not_sqlite.write_bytes(b"just some text, not a database" * 100)
+    with pytest.raises(snapshot.InvalidSnapshotError, match="not a SQLite"):
+        snapshot.validate_snapshot(not_sqlite)
+
+    other_schema = tmp_path / "other.db"
+    with closing(sqlite3.connect(other_schema)) as connection:
+        connection.execute("CREATE TABLE watchlist_items (id INTEGER, title TEXT)")
+    with pytest.raises(snapshot.InvalidSnapshotError, match="missing"):
+        snapshot.validate_snapshot(other_schema)
+
+
+def test_validate_rejects_other_page_size(db_session, tmp_path):
+    path = snapshot.create_snapshot(tmp_path / "copy.db")
+    with closing(sqlite3.connect(path)) as connection:
+        connection.execute("PRAGMA page_size = 65536")
+        connection.execute("VACUUM")
+    with pytest.raises(snapshot.InvalidSnapshotError, match="page size of 65536"):
+        snapshot.validate_snapshot(path)
+
+
+def test_snapshot_routes_round_trip(client, db_session):
+    add_test_item(db_session, title="Downloaded")
+    db_session.commit()
+
+    response = client.get(url_for("settings.download_snapshot"))
+    assert response.status_code == 200
+    assert response.headers["Content-Disposition"].endswith(".db")
+    content = response.data
+    response.close()
+    assert content.startswith(b"SQLite format 3\x00")
+    assert list(snapshot.database_path().parent.glob(".download-*")) == []
+
+    WatchlistItem.query.delete()
+    db_session.commit()
+    response = client.post(
+        url_for("settings.restore_snapshot_upload"),
+        data={"snapshot_file": (io.BytesIO(content), "snapshot.db")},
+        content_type="multipart/form-data",
+        follow_redirects=True,
+    )
+    assert b"Database restored from snapshot." in response.data
+    assert [item.title for item in WatchlistItem.query] == ["Downloaded"]
+    leftovers = snapshot.database_path().parent.glob(".restore-*")
+    assert list(leftovers) == []
+
+
+def test_restore_route_rejects_invalid_snapshot(client, db_session):
+    add_test_item(db_session, title="Kept")
+    db_session.commit()
+    response = client.post(
+        url_for("settings.restore_snapshot_upload"),
+        data={"snapshot_file": (io.BytesIO(b"garbage" * 200), "snapshot.db")},
+        content_type="multipart/form-data",
+        follow_redirects=True,
+    )
+    assert b"Snapshot not restored: The file is not a SQLite database." in response.data
+    assert [item.title for item in WatchlistItem.query] == ["Kept"]
+
+
+def test_snapshot_cli(runner, db_session, tmp_path):
+    add_test_item(db_session, title="From CLI")
+    db_session.commit()
+    path = tmp_path / "cli.db"
+
+    result = runner.invoke(args=["snapshot", "create", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "Snapshot written to" in result.output
+
+    WatchlistItem.query.delete()
+    db_session.commit()
+    result = runner.invoke(args=["snapshot", "restore", str(path)])
+    assert result.exit_code == 0, result.output
+    db_session.expire_all()
+    assert [item.title for item in WatchlistItem.query] == ["From CLI"]
+
+    (tmp_path / "bad.db").write_bytes(b"x" * 512)
+    result = runner.invoke(args=["snapshot", "restore", str(tmp_path / "bad.db")])
+    assert result.exit_code != 0
+    assert "not a SQLite database" in result.output
@@ -0,0 +1,110 @@
+# apps/desktop/tests/test_suggest.py
+import math
+import pytest
+from flask import url_for
+from src.core.models import WatchlistItem
+from src.core.suggest import TitleIndex, get_title_index, normalize_title
+from tests.conftest import add_test_item
+
+
+@pytest.fixture()
+def title_index(app, db_session):
+    index = get_title_index()
+    index.reset()
+    return index
+
+
+def test_normalize_title():
+    assert normalize_title("  Amélie   ÉCOLE ") == "amelie ecole"
+
+
+def test_suggests_word_prefixes(db_session, title_index):
+    add_test_item(db_session, title="The Shawshank Redemption")
+    add_test_item(db_session, title="Shaun of the Dead")
+    add_test_item(db_session, title="Amélie")
+    add_test_item(db_session, title="New York, New York")
+    db_session.commit()
+
+    assert title_index.suggest("sha", 8) == [
+        "Shaun of the Dead",
+        "The Shawshank Redemption",
+    ]
+    assert title_index.suggest("red", 8) == ["The Shawshank Redemption"]
+    assert title_index.suggest("ame", 8) == ["Amélie"]
+    # Each title once, even when several of its words match
+    assert title_index.suggest("new", 8) == ["New York, New York"]
+    assert title_index.suggest("the", 8) == [
+        "Shaun of the Dead",  # "the dead" sorts before "the shawshank..."
+        "The Shawshank Redemption",
+    ]
+    assert title_index.suggest("sha", 1) == ["Shaun of the Dead"]
+    assert title_index.suggest("   ", 8) == []
+
+
+def test_index_is_patched_on_save_and_delete(db_session, title_index):
+    item = add_test_item(db_session, title="Alien")
+    db_session.commit()
+    assert title_index.suggest("ali", 8) == ["Alien"]
+
+    built_entries = title_index._entries
+    item.title = "Aliens"
+    add_test_item(db_session, title="Alice in Wonderland")
+    db_session.commit()
+    assert title_index._entries is built_entries  # Patched, not rebuilt
+    assert title_index.suggest("ali", 8) == ["Alice in Wonderland", "Aliens"]
+
+    db_session.delete(item)
+    db_session.commit()
+    assert title_index.suggest("ali", 8) == ["Alice in Wonderland"]
+
+
+def test_bulk_delete_rebuilds_index(db_session, title_index):
+    add_test_item(db_session, title="Heat")
+    db_session.commit()
+    assert title_index.suggest("he", 8) == ["Heat"]
+
+    WatchlistItem.query.delete()
+    db_session.commit()
+    assert title_index.suggest("he", 8) == []
+
+
+def test_rolled_back_save_leaves_index(db_session, title_index):
+    assert title_index.suggest("gh", 8) == []
+    add_test_item(db_session, title="Ghost")
+    db_session.flush()
+    db_session.rollback()
+    assert title_index.suggest("gh", 8) == []
+
+
+class _CountingList(list):
+    """A list counting its element reads, bisect's included."""
+
+    reads = 0
+
+    def __getitem__(self, i):
+        self.reads += 1
+        return super().__getitem__(i)
+
+
+def test_lookup_reads_logarithmically_many_entries():
+    index = TitleIndex()
+    index._titles = {i: f"Movie Title Number {i}" for i in range(10000)}
+    index._entries = _CountingList(
+        sorted(
+            (normalize_title(title), item_id, title)
+            for item_id, title in index._titles.items()
+        )
+    )
+    assert index.suggest("movie title number 4242", 8) == ["Movie Title Number 4242"]
+    # A binary search over 10,000 entries, then one read past the match
+    assert index._entries.reads <= math.ceil(math.log2(10000)) + 2
+
+
+def test_suggest_endpoint(client, db_session, title_index):
+    add_test_item(db_session, title="Pulp Fiction")
+    db_session.commit()
+    response = client.get(
+        url_for("main.search_suggest", search="pul"), headers={"HX-Request": "true"}
+    )
+    assert response.status_code == 200
+    assert b'<option value="Pulp Fiction">' in response.data
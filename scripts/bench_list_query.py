@@ -0,0 +1,110 @@
+# scripts/bench_list_query.py
+"""
+Compares loading one watchlist page with every column against the
+column-projected list query, for rows that carry large overview/notes text.
+
+Usage: python scripts/bench_list_query.py [--rows N] [--per-page N] [--text-size N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, load_only
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "apps" / "desktop"))
+
+from src.core import db  # noqa: E402
+from src.core.models import WatchlistItem  # noqa: E402
+from src.core.routes.main import LIST_COLUMNS  # noqa: E402
+
+REPEATS = 20
+
+
+def _seed(engine, rows, text_size):
+    db.metadata.create_all(engine, tables=[WatchlistItem.__table__])
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(WatchlistItem.__table__),
+            [
+                {
+                    "title": f"Title {i}",
+                    "type": "movie",
+                    "year": 1950 + i % 70,
+                    "status": "Watched",
+                    "rating": i % 10 + 1,
+                    "overview": "o" * text_size,
+                    "notes": "n" * text_size,
+                    "date_added": now,
+                    "date_modified": now,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def _page_statement(projected, per_page):
+    statement = select(WatchlistItem)
+    if projected:
+        statement = statement.options(load_only(*LIST_COLUMNS))
+    return statement.order_by(WatchlistItem.date_added.desc()).limit(per_page)
+
+
+def _bytes_read(engine, statement):
+    """Size of the column values SQLite hands back for one page."""
+    with engine.connect() as connection:
+        rows = connection.execute(statement).all()
+    return sum(len(str(value).encode("utf-8")) for row in rows for value in row)
+
+
+def _measure(engine, projected, per_page):
+    statement = _page_statement(projected, per_page)
+    bytes_read = _bytes_read(engine, statement)
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        with Session(engine) as session:
+            session.scalars(statement).all()
+    elapsed = (time.perf_counter() - start) / REPEATS
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        items = session.scalars(statement).all()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(items) == per_page
+
+    return bytes_read, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--text-size", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        _seed(engine, args.rows, args.text_size)
+
+        print(
+            f"{args.rows} rows, {args.per_page} per page, "
+            f"{args.text_size} chars each of overview and notes\n"
+        )
+        print(f"{'query':<12}{'bytes read':>14}{'peak memory':>14}{'ms/page':>10}")
+        for label, projected in (("all columns", False), ("projected", True)):
+            bytes_read, peak, elapsed = _measure(engine, projected, args.per_page)
+            print(f"{label:<12}{bytes_read:>14,}{peak:>14,}{elapsed * 1000:>10.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# scripts/bench_sqlite_pragmas.py
+"""
+Compares SQLite's default settings with the SQLITE_PRAGMAS profile: commits
+per second for single-item writes, and page reads per second while a writer
+keeps committing in the background.
+
+Usage: python scripts/bench_sqlite_pragmas.py [--rows N] [--writes N]
+                                              [--readers N] [--seconds S]
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.exc import OperationalError
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "apps" / "desktop"))
+
+from src.core import config, db  # noqa: E402
+from src.core.models import WatchlistItem  # noqa: E402
+from src.core.pragmas import apply_pragmas, pragmas_from_env  # noqa: E402
+
+PER_PAGE = 15
+
+
+def _engine(path, pragmas):
+    engine = create_engine(f"sqlite:///{path}")
+    if pragmas:
+        event.listen(engine, "connect", partial(apply_pragmas, pragmas=pragmas))
+    return engine
+
+
+def _item(i):
+    now = datetime.now(timezone.utc)
+    return {
+        "title": f"Title {i}",
+        "type": "movie",
+        "year": 1950 + i % 70,
+        "status": "Watched",
+        "rating": i % 10 + 1,
+        "date_added": now,
+        "date_modified": now,
+    }
+
+
+def _seed(engine, rows):
+    db.metadata.create_all(engine, tables=[WatchlistItem.__table__])
+    with engine.begin() as connection:
+        connection.execute(
+            insert(WatchlistItem.__table__), [_item(i) for i in range(rows)]
+        )
+
+
+def _commits_per_second(engine, writes):
+    """Single-item transactions, like adding items one at a time."""
+    start = time.perf_counter()
+    for i in range(writes):
+        with engine.begin() as connection:
+            connection.execute(insert(WatchlistItem.__table__), [_item(i)])
+    return writes / (time.perf_counter() - start)
+
+
+def _reads_under_writes(engine, readers, seconds):
+    """Page reads per second and failed reads, while one thread writes."""
+    page = (
+        select(WatchlistItem.id, WatchlistItem.title, WatchlistItem.rating)
+        .order_by(WatchlistItem.date_added.desc())
+        .limit(PER_PAGE)
+    )
+    stop = threading.Event()
+    reads = [0] * readers
+    failures = [0] * readers
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            # A long transaction, like an import writing its batches
+            with engine.begin() as connection:
+                for _ in range(200):
+                    connection.execute(insert(WatchlistItem.__table__), [_item(i)])
+                    i += 1
+
+    def read(n):
+        while not stop.is_set():
+            try:
+                with engine.connect() as connection:
+                    connection.execute(page).all()
+                reads[n] += 1
+            except OperationalError:  # database is locked
+                failures[n] += 1
+
+    threads = [threading.Thread(target=write)]
+    threads += [threading.Thread(target=read, args=(n,)) for n in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / seconds, sum(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    profiles = [
+        ("default", {}),
+        ("profile", pragmas_from_env(config.SQLITE_PRAGMAS)),
+    ]
+    print(f"{args.rows} rows, {args.readers} readers for {args.seconds}s\n")
+    print(f"{'settings':<10}{'commits/s':>12}{'reads/s':>12}{'failed reads':>14}")
+    for label, pragmas in profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = _engine(Path(tmp) / "bench.db", pragmas)
+            _seed(engine, args.rows)
+            commits = _commits_per_second(engine, args.writes)
+            reads, failures = _reads_under_writes(engine, args.readers, args.seconds)
+            engine.dispose()
+        print(f"{label:<10}{commits:>12,.0f}{reads:>12,.0f}{failures:>14,}")
+
+
+if __name__ == "__main__":
+    main()
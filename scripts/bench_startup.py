@@ -0,0 +1,191 @@
+# scripts/bench_startup.py
+"""
+Measures how long the app takes to start, each time in a fresh process:
+importing src.core, create_app(), and the time to the first byte of the
+first request to /, plus the -X importtime breakdown by package. Then
+measures the rows per second of a backup import replacing the watchlist.
+Exits with status 1 if a measurement is over its budget in
+scripts/startup_budget.json (under it, for import throughput), or if a
+module the budget lists as deferred was loaded on the way.
+
+Usage: python scripts/bench_startup.py [--runs N] [--rows N] [--top N]
+                                       [--import-rows N] [--budget PATH]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+
+project_root = Path(__file__).resolve().parent.parent
+desktop_root = project_root / "apps" / "desktop"
+sys.path.insert(0, str(desktop_root))
+
+from src.core import db  # noqa: E402
+from src.core.models import WatchlistItem  # noqa: E402
+
+DEFAULT_BUDGET = Path(__file__).resolve().parent / "startup_budget.json"
+
+# Run in each fresh process; prints the timings in ms and what got imported
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from src.core import create_app
+imported = time.perf_counter()
+app = create_app({"SQLALCHEMY_DATABASE_URI": sys.argv[1], "TESTING": True})
+created = time.perf_counter()
+response = app.test_client().get("/", buffered=False)
+next(iter(response.response), b"")
+first_byte = time.perf_counter()
+response.close()
+print(json.dumps({
+    "status": response.status_code,
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_byte_ms": (first_byte - created) * 1000,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+# Imports a backup of argv[2] records twice, into an empty watchlist and then
+# replacing it, and prints the rows per second of the second import
+IMPORT_CHILD = """
+import io, json, sys, time
+from src.core import create_app, db
+app = create_app({"SQLALCHEMY_DATABASE_URI": sys.argv[1], "TESTING": True})
+with app.app_context():
+    db.create_all()
+records = json.dumps([
+    {"title": f"Title {i}", "type": "movie", "year": 1950 + i % 70,
+     "rating": i % 10 + 1, "status": "Watched", "overview": "Overview " * 10}
+    for i in range(int(sys.argv[2]))
+]).encode()
+client = app.test_client()
+for _ in range(2):
+    start = time.perf_counter()
+    response = client.post(
+        "/settings/import_data",
+        data={"backup_file": (io.BytesIO(records), "backup.json")},
+        content_type="multipart/form-data",
+    )
+    elapsed = time.perf_counter() - start
+print(json.dumps({"rows_per_s": int(sys.argv[2]) / elapsed}))
+"""
+
+# "import time:  self [us] | cumulative | imported package", as -X importtime
+# writes it, the name indented by nesting depth
+_IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _seed(url, rows):
+    engine = create_engine(url)
+    db.metadata.create_all(engine, tables=[WatchlistItem.__table__])
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(WatchlistItem.__table__),
+            [
+                {
+                    "title": f"Title {i}",
+                    "type": "movie",
+                    "year": 1950 + i % 70,
+                    "status": "Watched",
+                    "rating": i % 10 + 1,
+                    "date_added": now,
+                    "date_modified": now,
+                }
+                for i in range(rows)
+            ],
+        )
+    engine.dispose()
+
+
+def _run(url, *python_args, child=CHILD, args=()):
+    result = subprocess.run(
+        [sys.executable, *python_args, "-c", child, url, *args],
+        cwd=desktop_root,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    return json.loads(result.stdout), result.stderr
+
+
+def _import_breakdown(stderr):
+    """Self time of every module imported, in ms, summed by top-level package."""
+    packages = Counter()
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            packages[match.group(4).split(".")[0]] += int(match.group(1)) / 1000
+    return packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--import-rows", type=int, default=20000)
+    parser.add_argument("--budget", type=Path, default=DEFAULT_BUDGET)
+    args = parser.parse_args()
+    budget = json.loads(args.budget.read_text(encoding="utf-8"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        _seed(url, args.rows)
+        _run(url)  # Warms the OS file cache and Python's bytecode cache
+        runs = [_run(url)[0] for _ in range(args.runs)]
+        traced, stderr = _run(url, "-X", "importtime")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'import.db'}"
+        imported, _ = _run(url, child=IMPORT_CHILD, args=[str(args.import_rows)])
+
+    if any(run["status"] != 200 for run in runs):
+        sys.exit(f"GET / answered {runs[0]['status']}, not 200.")
+
+    print(f"Import time by package ({args.top} slowest, self time summed):")
+    for package, ms in _import_breakdown(stderr).most_common(args.top):
+        print(f"  {package:<24}{ms:>8.1f} ms")
+
+    print(f"\nMedian of {args.runs} runs, {args.rows} rows:")
+    print(f"  {'measurement':<16}{'ms':>8}{'budget':>10}")
+    failures = []
+    for key in ["import_ms", "create_app_ms", "first_byte_ms"]:
+        median = statistics.median(run[key] for run in runs)
+        limit = budget[key]
+        marker = "" if median <= limit else "  over budget"
+        print(f"  {key:<16}{median:>8.1f}{limit:>10.1f}{marker}")
+        if median > limit:
+            failures.append(f"{key} is {median:.1f} ms, budget {limit} ms")
+
+    rows_per_s = imported["rows_per_s"]
+    minimum = budget["import_rows_per_s"]
+    marker = "" if rows_per_s >= minimum else "  under budget"
+    print(f"\nReplacing import of {args.import_rows} rows:")
+    print(f"  {'rows/s':<16}{rows_per_s:>8,.0f}{minimum:>10,}{marker}")
+    if rows_per_s < minimum:
+        failures.append(f"import ran at {rows_per_s:,.0f} rows/s, budget {minimum:,}")
+
+    loaded = set(traced["modules"])
+    for module in budget["deferred_modules"]:
+        if module in loaded:
+            failures.append(f"{module} was imported at startup")
+
+    if failures:
+        print("\nOutside budget:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nWithin budget.")
+
+
+if __name__ == "__main__":
+    main()